@@ -2,6 +2,8 @@
 import customtkinter as ctk
 import tkinter as tk
 import os
+import time
+from typing import Dict, Optional
 # Code editor selection:
 # 1. PythonEditor - full editor with syntax highlighting and autocompletion (may have copy issues)
 # 2. PythonEditorCTk - editor based on CTkTextbox (reliable copy/paste, no syntax highlighting)
@@ -15,13 +17,30 @@ from components.output_markdown import MarkdownOutputDisplay  # New implementati
 # Alternative implementation: from components.output_console import ConsoleOutputDisplay
 from components.output_interface import IOutputDisplay
 from components.plots_display import PlotsDisplay
+from components.variable_explorer import VariableExplorer
 from components.toolbar import Toolbar
 from components.file_panel import FilePanel
 from components.hotkeys_help_dialog import HotkeysHelpDialog
+from components.log_viewer import LogViewer
 from components.notification import Notification
-from utils.data_manager import DataManager
-from utils.code_executor import CodeExecutor
+from utils.cells import find_cell, has_cell_markers, split_cells
+from utils.data_manager import DataManager, get_run_history_file
+from utils.execution_kernel import ExecutionKernel
+from utils.worker_pool import WorkerPool
+from utils.figure_transport import RenderedFigure
 from utils.hotkey_manager import HotkeyManager
+from utils.output_stream import omission_marker, remove_spill_files
+from utils.profiling import format_profile, save_profile
+from utils.run_scheduler import CANCEL_RUNNING, DUPLICATE, RunRequest, RunScheduler
+from utils.sweep import find_sweep_parameters, format_sweep_table
+from utils.telemetry import StageTimer, append_run_record, build_run_record, format_run_summary, load_run_history
+
+
+# Interval for polling execution kernel events (ms)
+KERNEL_POLL_INTERVAL = 30
+
+# Records of the run history read at startup (to compare run times with)
+RUN_HISTORY_TAIL = 500
 
 
 class PythonCalculatorApp:
@@ -42,9 +61,29 @@ class PythonCalculatorApp:
         
         # Initialize managers
         self.data_manager = DataManager()
-        self.code_executor = CodeExecutor()
         self.hotkey_manager = HotkeyManager(self.root)
 
+        # Code execution settings (persistent session etc.)
+        self.execution_settings = self.data_manager.load_execution_settings()
+
+        # User code runs in separate processes so the window stays responsive.
+        # Isolated runs take a warm worker from the pool; session runs (persistent,
+        # cells, reactive) use one pinned kernel that keeps the namespace.
+        self.worker_pool = WorkerPool(
+            size=self.execution_settings["worker_pool_size"],
+            max_runs=self.execution_settings["worker_max_runs"],
+            max_rss_mb=self.execution_settings["worker_max_rss_mb"]
+        )
+        self.worker_pool.start()
+        self.session_kernel = None
+        # Kernel executing the current run (None - nothing is running)
+        self._running_kernel = None
+        # Runs requested while code runs wait here, at most one per file
+        self.run_scheduler = RunScheduler(
+            debounce=self.execution_settings["run_debounce"],
+            cancel_running=self.execution_settings["cancel_superseded_runs"]
+        )
+
         # Load saved data
         saved_data = self.data_manager.load_data()
         window_size = self.data_manager.get_window_size()
@@ -55,6 +94,23 @@ class PythonCalculatorApp:
 
         # Editor is empty by default (no file selected)
         self.editor.clear()
+
+        # Report of the last run with the function profiler (for export)
+        self._last_profile = None
+        # Current run: stage timer, start time, file and mode (telemetry) and the code that runs
+        self._run_timer: Optional[StageTimer] = None
+        self._run_started = 0.0
+        self._run_context: Dict = {}
+        # Last run history record of each file (to show the change of run time)
+        self._last_run_records: Dict[Optional[str], Dict] = {
+            record.get('file'): record for record in load_run_history(get_run_history_file(), limit=RUN_HISTORY_TAIL)
+        }
+        # Full logs of the last run's streams that outgrew the output limits (removed by the next run)
+        self._output_spills: Dict[str, Dict] = {}
+        # Kernel holding the namespace of the last run (None - variables can't be expanded)
+        self._variables_kernel: Optional[ExecutionKernel] = None
+        # Start polling kernel events
+        self.root.after(KERNEL_POLL_INTERVAL, self._poll_kernel)
     
     def _create_ui(self):
         """Create the user interface."""
@@ -67,11 +123,22 @@ class PythonCalculatorApp:
             on_select_directory=self.handle_select_directory,
             on_delete=self.handle_delete_file,
             on_create_folder=self.handle_create_folder,
-            on_help=self.show_hotkeys_help
+            on_help=self.show_hotkeys_help,
+            on_toggle_session=self.handle_toggle_session,
+            on_mode_change=self.handle_execution_mode_change,
+            on_checkpoint=self.handle_checkpoint,
+            on_stop=self.handle_stop,
+            on_profile=self.handle_profile_run,
+            on_line_profile=self.handle_line_profile_run,
+            on_memory_profile=self.handle_memory_profile_run,
+            on_sweep=self.handle_sweep_run,
+            on_variables=self.handle_toggle_variables
         )
         # Save and delete buttons are disabled by default
         self.toolbar.set_save_enabled(False)
         self.toolbar.set_delete_enabled(False)
+        self.toolbar.set_session_active(self.execution_settings["persistent_session"])
+        self.toolbar.set_execution_mode(self.execution_settings["execution_mode"])
         
         # Main container for file panel and work area
         main_container = ctk.CTkFrame(self.root)
@@ -124,6 +191,8 @@ class PythonCalculatorApp:
         self.editor = PythonEditor(editor_container)
         # Set callbacks for hotkeys
         self.editor.set_run_code_callback(self.handle_run_code)
+        self.editor.set_force_run_code_callback(self.handle_force_run_code)
+        self.editor.set_run_selection_callback(self.handle_run_selection)
         self.editor.set_file_action_callbacks(
             create_callback=self.handle_create_file,
             save_callback=self.handle_save_file,
@@ -164,6 +233,22 @@ class PythonCalculatorApp:
             description='Show hotkeys help'
         )
         
+        # Stop running code
+        self.hotkey_manager.register(
+            '<Control-F2>',
+            lambda e: self.handle_stop(),
+            component='PythonCalculatorApp',
+            description='Stop execution'
+        )
+
+        # Export of the last cProfile report
+        self.hotkey_manager.register(
+            '<Control-P>',
+            lambda e: self.handle_export_profile(),
+            component='PythonCalculatorApp',
+            description='Export profile'
+        )
+
         # Global hotkeys for file operations
         self.hotkey_manager.register_case_insensitive(
             '<Control-n>',
@@ -182,23 +267,179 @@ class PythonCalculatorApp:
         self.plots_panel = ctk.CTkFrame(main_container)
         # Don't pack the panel immediately - it will appear only when there are plots
         self.plots_display = PlotsDisplay(self.plots_panel, on_close=self._on_plots_panel_close)
+
+        # Variables panel (right side) - hidden until toggled from the toolbar
+        self.variables_panel = ctk.CTkFrame(main_container)
+        self.variable_explorer = VariableExplorer(self.variables_panel, on_expand=self._on_expand_variable)
     
-    def handle_run_code(self):
-        """Handle code execution."""
+    def handle_run_code(self, profile: Optional[str] = None):
+        """
+        Handle code execution.
+
+        Args:
+            profile: Profiler kind (see utils.profiling, None - run without profiling)
+        """
         code = self.editor.get_code()
+        if self._has_checkpoint():
+            # Variant run: only cells below the checkpoint, in a forked copy of its state
+            self._start_run(code, persistent=False, fork=True, profile=profile)
+            return
+        mode = self.execution_settings["execution_mode"]
+        self._start_run(
+            code,
+            persistent=self.execution_settings["persistent_session"],
+            use_cells=mode == "cells",
+            reactive=mode == "reactive",
+            profile=profile
+        )
 
-        # Clear previous plots and hide panel
-        self.plots_display.clear()
-        self.plots_display.hide()
+    def handle_profile_run(self):
+        """Handle code execution with the function profiler."""
+        self.handle_run_code(profile="cpu")
 
-        # Clear matplotlib plots before executing new code
-        import matplotlib.pyplot as plt
-        # Save information about current plots before clearing (for debugging)
-        old_figures = plt.get_fignums()
-        if old_figures:
-            print(f"DEBUG: Closing {len(old_figures)} old figures before execution")
-        plt.close('all')
+    def handle_line_profile_run(self):
+        """Handle code execution with the line profiler (heatmap in the editor gutter)."""
+        self.handle_run_code(profile="lines")
+
+    def handle_memory_profile_run(self):
+        """Handle code execution with the memory profiler (compared with the previous run in the session)."""
+        self.handle_run_code(profile="memory")
+
+    def handle_sweep_run(self):
+        """Handle parameter sweep: variants of `# @sweep` constants in worker processes of a fresh kernel."""
+        code = self.editor.get_code()
+        try:
+            if not find_sweep_parameters(code):
+                Notification.show(self.root, "No sweep parameters: mark constants with # @sweep [values]",
+                                  duration=3000)
+                return
+        except ValueError as e:
+            Notification.show(self.root, str(e), duration=3000)
+            return
+        self._start_run(code, persistent=False, sweep={
+            'mode': self.execution_settings["sweep_mode"],
+            'samples': self.execution_settings["sweep_samples"],
+            'seed': self.execution_settings["sweep_seed"],
+            'jobs': self.execution_settings["sweep_jobs"]
+        })
+
+    def handle_export_profile(self):
+        """Handle export of the last function profile as a .prof file."""
+        if self._last_profile is None:
+            Notification.show(self.root, "No profile yet: run code with the profiler first", duration=2500)
+            return
+        file_path = Toolbar.save_profile_dialog()
+        if not file_path:
+            return
+        try:
+            save_profile(self._last_profile, file_path)
+            Notification.show(self.root, f"Profile saved: {os.path.basename(file_path)}", duration=2000)
+        except OSError as e:
+            Notification.show(self.root, f"Error saving profile: {str(e)}", duration=4000)
+
+    def handle_force_run_code(self):
+        """Handle code execution with all cells / statements recomputed."""
+        # Caches are dropped right away, not after the running or queued runs
+        if not self.run_scheduler.is_idle:
+            Notification.show(self.root, "Code is already running", duration=2000)
+            return
+        if self.session_kernel is not None:
+            self.session_kernel.clear_cell_cache()
+            if self.execution_settings["execution_mode"] == "reactive":
+                # Reactive state lives in the session namespace
+                self.session_kernel.reset_session()
+        self.handle_run_code()
+
+    def handle_run_selection(self):
+        """Handle execution of selected code or current block in the persistent session."""
+        code = self.editor.get_selection_or_block()
+        if not code.strip():
+            return
+        # Partial runs only make sense against the state left by previous runs
+        self._start_run(code, persistent=True)
+
+    def handle_stop(self):
+        """Handle stop request: drop queued runs and interrupt running code (a repeated request kills it)."""
+        dropped = self.run_scheduler.clear()
+        self._update_run_state()
+        if self._running_kernel is None:
+            if dropped:
+                Notification.show(self.root, "Queued run cancelled", duration=1500)
+            return
+        self._running_kernel.interrupt()
+        Notification.show(self.root, "Stopping execution...", duration=1500)
+
+    def handle_checkpoint(self):
+        """Handle checkpoint toggle: create checkpoint after the current cell or drop it."""
+        # The checkpoint captures the session state, so no other run may be running or queued
+        if not self.run_scheduler.is_idle:
+            Notification.show(self.root, "Code is already running", duration=2000)
+            return
+
+        if self._has_checkpoint():
+            self.session_kernel.clear_checkpoint()
+            self.toolbar.set_checkpoint_active(False)
+            Notification.show(self.root, "Checkpoint removed", duration=2000)
+            return
+
+        code = self.editor.get_code()
+        if not has_cell_markers(code):
+            Notification.show(self.root, "Split the code into # %% cells to create a checkpoint", duration=3000)
+            return
+        cell = find_cell(split_cells(code), self.editor.get_cursor_line())
+        self._start_run(code, persistent=False, checkpoint_cell=cell.index)
+
+    def _has_checkpoint(self) -> bool:
+        """Check whether the session kernel holds a checkpoint."""
+        return self.session_kernel is not None and self.session_kernel.checkpoint_cell is not None
+
+    def handle_toggle_session(self):
+        """Handle persistent session toggle."""
+        enabled = not self.execution_settings["persistent_session"]
+        self.execution_settings["persistent_session"] = enabled
+        self.data_manager.save_execution_settings({"persistent_session": enabled})
+        self.toolbar.set_session_active(enabled)
+
+        # Both switching on and off start from a clean namespace
+        if self.session_kernel is not None:
+            self.session_kernel.reset_session()
+        state = "enabled" if enabled else "disabled"
+        Notification.show(self.root, f"Persistent session {state}", duration=2000)
+
+    def handle_execution_mode_change(self, mode: str):
+        """
+        Handle execution mode change.
+
+        Args:
+            mode: New execution mode ("script", "cells" or "reactive")
+        """
+        previous_mode = self.execution_settings["execution_mode"]
+        self.execution_settings["execution_mode"] = mode
+        self.data_manager.save_execution_settings({"execution_mode": mode})
+        if self.session_kernel is None:
+            return
+        # Results cached in the previous mode are not reused
+        self.session_kernel.clear_cell_cache()
+        if "reactive" in (mode, previous_mode):
+            # Reactive mode tracks what the session namespace contains, start it clean
+            self.session_kernel.reset_session()
+
+    def _start_run(self, code: str, persistent: bool, use_cells: bool = False, reactive: bool = False,
+                   checkpoint_cell: Optional[int] = None, fork: bool = False, profile: Optional[str] = None,
+                   sweep: Optional[dict] = None):
+        """
+        Request execution of code: it starts now or is queued behind the running code.
 
+        Args:
+            code: Code to execute
+            persistent: Execute in the persistent session namespace
+            use_cells: Execute `# %%` cells reusing cached results
+            reactive: Execute only changed statements and their dependents
+            checkpoint_cell: Execute cells up to this one and keep the state as the checkpoint
+            fork: Execute cells below the checkpoint in a forked copy of its state
+            profile: Profiler kind (see utils.profiling)
+            sweep: Parameter sweep settings (see utils.sweep)
+        """
         # Determine working directory for code execution
         if self.current_file:
             # If a file is open, execute in its directory
@@ -207,33 +448,313 @@ class PythonCalculatorApp:
             # If no file is open, use selected directory
             current_directory = self.file_panel.get_current_directory()
 
-        result = self.code_executor.execute(code, working_directory=current_directory)
-
-        # Display results
-        self.output.display_result(
-            stdout=result['stdout'],
-            stderr=result['stderr'],
-            exception=result['exception']
+        # A file has at most one queued run: newer code replaces it (see utils.run_scheduler)
+        outcome = self.run_scheduler.submit(
+            self.current_file, code, working_directory=current_directory, persistent=persistent,
+            use_cells=use_cells, reactive=reactive, checkpoint_cell=checkpoint_cell, fork=fork,
+            profile=profile, sweep=sweep
         )
+        if outcome == DUPLICATE:
+            Notification.show(self.root, "Same code is already running or queued", duration=2000)
+        elif outcome == CANCEL_RUNNING:
+            self._running_kernel.interrupt()
+            Notification.show(self.root, "Code changed: restarting execution...", duration=1500)
+        self._start_next_run()
+        # The queue changed even if nothing started
+        self._update_run_state()
+
+    def _start_next_run(self):
+        """Start the next queued run if nothing is running and it is due."""
+        request = self.run_scheduler.take()
+        if request is None:
+            return
+        try:
+            self._launch_run(request)
+        except Exception:
+            # The run never started: don't block the queue
+            self.run_scheduler.finish()
+            raise
+        finally:
+            self._update_run_state()
+
+    def _update_run_state(self):
+        """Show whether code is running and how many runs wait on the toolbar."""
+        self.toolbar.set_running(self._running_kernel is not None, self.run_scheduler.pending_count)
+
+    def _launch_run(self, request: RunRequest):
+        """
+        Send queued code to the execution kernel.
+
+        Args:
+            request: Run taken from the run scheduler (options are the arguments of _start_run)
+        """
+        code = request.code
+        options = request.options
+        persistent = options['persistent']
+        use_cells = options['use_cells']
+        reactive = options['reactive']
+        checkpoint_cell = options['checkpoint_cell']
+        fork = options['fork']
+        sweep = options['sweep']
+
+        # Telemetry: wall time is counted from here to the displayed results
+        self._run_timer = StageTimer()
+        self._run_started = time.perf_counter()
+        if sweep is not None:
+            mode = "sweep"
+        elif checkpoint_cell is not None:
+            mode = "checkpoint"
+        elif fork:
+            mode = "variant"
+        elif reactive:
+            mode = "reactive"
+        elif use_cells:
+            mode = "cells"
+        else:
+            mode = "session" if persistent else "script"
+        self._run_context = {'file': request.document, 'mode': mode, 'code': code}
+
+        # Clear previous plots and hide panel
+        with self._run_timer.stage('clear_plots'):
+            self.plots_display.clear()
+            self.plots_display.hide()
+
+        # Output is streamed into the panel while code runs
+        self.output.clear()
+        remove_spill_files(self._output_spills)
+        self._output_spills = {}
+        self.editor.clear_line_heat()
+        # The kernel releases the previous namespace when the run starts
+        self.variable_explorer.set_variables([], expandable=False)
+
+        # State kept between runs lives in the session kernel, other runs get a fresh worker
+        if persistent or use_cells or reactive or fork or checkpoint_cell is not None:
+            kernel = self._get_session_kernel()
+        else:
+            kernel = self.worker_pool.acquire()
+        # Only the session kernel keeps the namespace after a run: pool workers are
+        # recycled, variant runs execute in a forked copy that exits
+        self._variables_kernel = kernel if kernel is self.session_kernel and not fork and sweep is None else None
+
+        # Execution is asynchronous: results arrive through _poll_kernel
+        timeout = self.execution_settings["run_timeout"] or None
+        limits = {
+            'memory_mb': self.execution_settings["memory_limit_mb"],
+            'rss_mb': self.execution_settings["rss_limit_mb"],
+            'cpu_seconds': self.execution_settings["cpu_time_limit"]
+        }
+        if checkpoint_cell is not None:
+            kernel.create_checkpoint(code, checkpoint_cell, working_directory=options['working_directory'],
+                                     timeout=timeout, limits=limits)
+        else:
+            kernel.submit(code, working_directory=options['working_directory'], persistent=persistent,
+                          use_cells=use_cells, reactive=reactive, fork=fork, timeout=timeout, limits=limits,
+                          profile=options['profile'], sweep=sweep)
+        self._running_kernel = kernel
+
+    def _get_session_kernel(self) -> ExecutionKernel:
+        """Get kernel holding the session namespace, taking it from the pool on first use."""
+        if self.session_kernel is None:
+            self.session_kernel = self.worker_pool.acquire()
+        return self.session_kernel
+
+    def _finish_run(self):
+        """Give the kernel of a finished isolated run back to the pool."""
+        kernel = self._running_kernel
+        self._running_kernel = None
+        self.run_scheduler.finish()
+        self._update_run_state()
+        if kernel is not None and kernel is not self.session_kernel:
+            self.worker_pool.release(kernel)
+
+    def _poll_kernel(self):
+        """Process events from the execution kernels and reschedule polling."""
+        try:
+            kernel = self._running_kernel
+            if kernel is not None:
+                for event in kernel.poll():
+                    self._handle_kernel_event(event)
+            if self.session_kernel is not None and self.session_kernel is not kernel:
+                # Keep session kernel state (ready, restarts) up to date between runs;
+                # between runs it only answers variable explorer requests
+                for event in self.session_kernel.poll():
+                    if event.get('type') == 'variable_page':
+                        self._handle_kernel_event(event)
+            # Queued runs start once the previous one finished and the debounce interval passed
+            self._start_next_run()
+            self.worker_pool.maintain()
+        except Exception as e:
+            print(f"Error processing kernel events: {e}")
+        finally:
+            self.root.after(KERNEL_POLL_INTERVAL, self._poll_kernel)
+
+    def _handle_kernel_event(self, event: dict):
+        """
+        Handle single event from the execution kernel.
+
+        Args:
+            event: Event dictionary (see utils.execution_kernel)
+        """
+        event_type = event.get('type')
 
-        # Display plots if any (in right panel)
-        if result['has_plot']:
-            print(f"DEBUG app: has_plot=True, figure_numbers={result.get('figure_numbers', [])}")
-            figures = self.code_executor.get_all_figures()
-            print(f"DEBUG app: get_all_figures returned {len(figures)} figures")
-            if figures:
-                print(f"DEBUG app: Displaying {len(figures)} figures")
-                # Display all plots in right panel (panel will show automatically)
-                self.plots_display.display_plots(figures)
+        if event_type == 'stream':
+            if event['name'] == 'stderr':
+                self.output.append_stderr(event['text'])
             else:
-                print(f"DEBUG app: No figures from get_all_figures, trying get_figure()")
-                # If plots not obtained but has_plot=True, try to get current plot
-                figure = self.code_executor.get_figure()
-                print(f"DEBUG app: get_figure() returned {figure is not None}")
-                if figure:
-                    self.plots_display.display_plots([figure])
+                self.output.append_stdout(event['text'])
+        elif event_type == 'figure':
+            # Figures arrive as the code shows them: the panel fills while it runs
+            try:
+                with (self._run_timer or StageTimer()).stage('display_plots'):
+                    self.plots_display.add_plot(RenderedFigure(event['figure']))
+            except Exception as e:
+                print(f"Error receiving figure: {e}")
+        elif event_type == 'result':
+            self._finish_run()
+            # Checkpoint is gone if its creation failed or the kernel restarted
+            self.toolbar.set_checkpoint_active(self._has_checkpoint())
+            self._display_run_result(event['result'])
+        elif event_type == 'variable_page':
+            self.variable_explorer.add_page(
+                event['path'], event['start'], event.get('total', 0), event.get('items', []), event.get('error')
+            )
+
+    def _display_run_result(self, result: dict):
+        """
+        Display results of a finished run.
+
+        Args:
+            result: Result dictionary from the execution kernel
+        """
+        timer = self._run_timer or StageTimer()
+        timer.add(result.get('timings'))
+
+        # Display results (replaces streamed text with formatted output)
+        with timer.stage('display_result'):
+            limit_message = result.get('limit_message')
+            self.output.display_result(
+                stdout=result['stdout'],
+                stderr=result['stderr'],
+                # Exceeded limit is explained by its own message
+                exception=None if limit_message else result['exception']
+            )
+            if limit_message:
+                self.output.display_limit_error(limit_message)
+
+            # Value of the trailing expression of the script
+            if result.get('display'):
+                self.output.display_value(result['display'])
+
+            # Omitted middle of long output opens the full log
+            self._output_spills = result.get('output_spill') or {}
+            for name, spill in self._output_spills.items():
+                self.output.link_text(
+                    omission_marker(name, spill['omitted_lines']).strip(),
+                    lambda path=spill['path'], name=name: LogViewer(self.root, path, title=f"Full {name}")
+                )
+
+            # Profile table below the output
+            profile = result.get('profile')
+            if profile:
+                self.output.append_text("\n" + format_profile(profile))
+                if profile['kind'] == "cpu":
+                    self._last_profile = profile
+                elif profile['kind'] == "lines":
+                    # Line numbers refer to the code that ran, which may have been edited meanwhile
+                    self.editor.set_line_heat({line: line_time for line, _, line_time in profile['lines']},
+                                              code=self._run_context.get('code'))
+            # Comparison table of the sweep variants
+            sweep = result.get('sweep')
+            if sweep and sweep['points']:
+                self.output.append_text("\n" + format_sweep_table(sweep))
+            # Rendering happens on idle, it has to be drawn to be measured
+            self.root.update_idletasks()
+
+        # Report cells taken from the cache
+        cells = result.get('cells')
+        if cells:
+            cached_count = sum(1 for cell in cells if cell['cached'])
+            if cached_count:
+                Notification.show(self.root, f"{cached_count} of {len(cells)} cells reused from cache", duration=2000)
+
+        # Report statements executed in reactive mode
+        reactive = result.get('reactive')
+        if reactive:
+            Notification.show(
+                self.root,
+                f"{reactive['executed']} of {reactive['total']} statements executed",
+                duration=2000
+            )
+
+        # Report checkpoint creation
+        checkpoint = result.get('checkpoint')
+        if checkpoint and not checkpoint['variant'] and result['exception'] is None:
+            Notification.show(
+                self.root,
+                f"Checkpoint created after cell {checkpoint['cell'] + 1} (line {checkpoint['start_line']})",
+                duration=3000
+            )
+
+        self.variable_explorer.set_variables(
+            result.get('variables', []),
+            expandable=self._variables_kernel is not None and self._variables_kernel.is_alive()
+        )
+
+        self._record_run(result, timer)
+
+    def _record_run(self, result: dict, timer: StageTimer):
+        """
+        Append telemetry of a finished run to the run history and show its summary.
+
+        Args:
+            result: Result dictionary from the execution kernel
+            timer: Stages of the run
+        """
+        record = build_run_record(
+            result,
+            timer.stages,
+            wall_time=time.perf_counter() - self._run_started,
+            file=self._run_context.get('file'),
+            mode=self._run_context.get('mode')
+        )
+        self._run_timer = None
+
+        previous = self._last_run_records.get(record['file'])
+        self._last_run_records[record['file']] = record
+        summary = format_run_summary(record, previous)
+        # Local files the script depends on (see utils.import_tracker)
+        local_modules = result.get('local_modules') or []
+        details = ""
+        if local_modules:
+            summary += f" · {len(local_modules)} local modules"
+            base = os.path.dirname(self._run_context['file']) if self._run_context.get('file') else None
+            details = "Local modules: " + ", ".join(
+                os.path.relpath(module['path'], base) if base else os.path.basename(module['path'])
+                for module in local_modules
+            )
+        self.toolbar.set_status(summary, details)
+        append_run_record(get_run_history_file(), record)
+
+    def handle_toggle_variables(self):
+        """Show or hide the variables panel."""
+        if self.variable_explorer.is_visible():
+            self.variable_explorer.hide()
         else:
-            print(f"DEBUG app: has_plot=False, no plots to display")
+            self.variable_explorer.show()
+
+    def _on_expand_variable(self, path: list, start: int):
+        """
+        Request a page of children of a variable from the kernel holding the namespace.
+
+        Args:
+            path: Variable name followed by child keys (see utils.variables)
+            start: Index of the first child
+        """
+        kernel = self._variables_kernel
+        if kernel is None or kernel is not self.session_kernel or not kernel.is_alive():
+            self.variable_explorer.add_page(path, start, 0, [], error="Namespace of the last run is gone")
+            return
+        kernel.inspect_variable(path, start)
 
     def _on_plots_panel_close(self):
         """Handle plots panel closing."""
@@ -570,6 +1091,16 @@ class PythonCalculatorApp:
         # Save splitter position separately
         self.data_manager.save_splitter_position(splitter_position)
         
+        # Stop execution kernels
+        try:
+            for kernel in (self._running_kernel, self.session_kernel):
+                if kernel is not None:
+                    kernel.shutdown()
+            self.worker_pool.shutdown()
+        except Exception as e:
+            print(f"Error stopping execution kernels: {e}")
+        remove_spill_files(self._output_spills)
+
         # Clear plots and close all matplotlib figures
         try:
             self.plots_display.clear()
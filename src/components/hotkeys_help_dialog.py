@@ -145,6 +145,10 @@ class HotkeysHelpDialog:
         # Base hotkeys list
         default_hotkeys = [
             ("F5", "Execute code"),
+            ("Shift+F5", "Execute code ignoring cached cells and reactive state"),
+            ("Ctrl+Enter", "Execute selection or current block (persistent session)"),
+            ("Ctrl+F2", "Stop execution (press again to kill it)"),
+            ("Ctrl+Shift+P", "Export last profile as .prof file"),
             ("Ctrl+N", "Create new file"),
             ("Ctrl+S", "Save file"),
             ("Ctrl+C", "Copy selected text"),
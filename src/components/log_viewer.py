@@ -0,0 +1,81 @@
+"""Viewer of full output logs that were too long for the output panel."""
+import customtkinter as ctk
+import tkinter as tk
+from utils.output_stream import LogPager
+
+
+class LogViewer:
+    """Window that shows a spill file page by page (only the current page is read)."""
+
+    def __init__(self, parent: tk.Widget, path: str, title: str = "Full log"):
+        """
+        Initialize viewer.
+
+        Args:
+            parent: Parent widget
+            path: Path of the log file
+            title: Window title
+        """
+        self.parent = parent
+        self.pager = LogPager(path)
+        self.page = 0
+
+        self.window = ctk.CTkToplevel(parent)
+        self.window.title(title)
+        self.window.geometry("900x600")
+        self.window.transient(parent)
+
+        self._create_ui()
+        self.show_page(0)
+        self.window.focus_set()
+
+    def _create_ui(self):
+        """Create viewer interface."""
+        navigation = ctk.CTkFrame(self.window)
+        navigation.pack(fill="x", padx=5, pady=5)
+
+        buttons = [
+            ("⏮", lambda: self.show_page(0)),
+            ("◀", lambda: self.show_page(self.page - 1)),
+            ("▶", lambda: self.show_page(self.page + 1)),
+            ("⏭", lambda: self.show_page(self.pager.page_count - 1)),
+        ]
+        for text, command in buttons:
+            ctk.CTkButton(navigation, text=text, width=40, command=command).pack(side="left", padx=2)
+
+        self.page_label = ctk.CTkLabel(navigation, text="")
+        self.page_label.pack(side="left", padx=10)
+
+        self.textbox = ctk.CTkTextbox(
+            self.window,
+            font=ctk.CTkFont(family="Consolas", size=11),
+            wrap="none",
+            corner_radius=0
+        )
+        self.textbox.pack(fill="both", expand=True)
+
+        self.window.bind("<Prior>", lambda e: self.show_page(self.page - 1))
+        self.window.bind("<Next>", lambda e: self.show_page(self.page + 1))
+        self.window.bind("<Control-Home>", lambda e: self.show_page(0))
+        self.window.bind("<Control-End>", lambda e: self.show_page(self.pager.page_count - 1))
+
+    def show_page(self, page: int):
+        """
+        Show a page of the log.
+
+        Args:
+            page: Page index from 0 (clamped to existing pages)
+        """
+        page = min(max(0, page), self.pager.page_count - 1)
+        try:
+            text = self.pager.read_page(page)
+        except OSError as e:
+            # The log is removed when the next run starts
+            text = f"Log is no longer available: {e}"
+        self.page = page
+        self.textbox.configure(state="normal")
+        self.textbox.delete("1.0", "end")
+        self.textbox.insert("1.0", text)
+        self.textbox.configure(state="disabled")
+        size_mb = self.pager.size / (1024 * 1024)
+        self.page_label.configure(text=f"Page {page + 1} of {self.pager.page_count} ({size_mb:.1f} MB)")
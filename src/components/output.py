@@ -280,6 +280,37 @@ class OutputDisplay(IOutputDisplay):
             # Используем улучшенный парсинг markdown в CTkTextbox
             self._parse_markdown(text)
     
+    def append_stdout(self, text: str):
+        """
+        Добавление фрагмента стандартного вывода во время выполнения кода.
+
+        Args:
+            text: Фрагмент стандартного вывода
+        """
+        self.append_text(text)
+        # Прокручиваем к концу, чтобы был виден последний вывод
+        self.textbox.see("end")
+
+    def append_stderr(self, text: str):
+        """
+        Добавление фрагмента вывода ошибок во время выполнения кода.
+
+        Args:
+            text: Фрагмент вывода ошибок
+        """
+        self.append_text(text, "error")
+        self.textbox.see("end")
+
+    def display_limit_error(self, message: str):
+        """
+        Отображение сообщения о превышении лимита ресурсов.
+
+        Args:
+            message: Описание превышенного лимита
+        """
+        self.append_text(f"\n{message}\n", "error")
+        self.textbox.see("end")
+
     def display_result(self, stdout: str, stderr: str, exception: Optional[str] = None, enable_markdown: bool = True):
         """
         Отображение результатов выполнения кода.
@@ -79,6 +79,37 @@ class ConsoleOutputDisplay(IOutputDisplay):
         # Just insert text as is, without markdown parsing
         self.append_text(text)
     
+    def append_stdout(self, text: str):
+        """
+        Add standard output chunk while code is running.
+
+        Args:
+            text: Standard output chunk
+        """
+        self.append_text(text)
+        # Scroll to the end so the latest output is visible
+        self.textbox.see("end")
+
+    def append_stderr(self, text: str):
+        """
+        Add error output chunk while code is running.
+
+        Args:
+            text: Error output chunk
+        """
+        self.append_text(text, "error")
+        self.textbox.see("end")
+
+    def display_limit_error(self, message: str):
+        """
+        Display message about an exceeded resource limit.
+
+        Args:
+            message: Description of the exceeded limit
+        """
+        self.append_text(f"\n{message}\n", "error")
+        self.textbox.see("end")
+
     def display_result(self, stdout: str, stderr: str, exception: Optional[str] = None, enable_markdown: bool = True):
         """
         Display code execution results.
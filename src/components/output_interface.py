@@ -1,6 +1,6 @@
 """Интерфейс для компонентов вывода результатов выполнения кода."""
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Callable, Optional
 
 
 class IOutputDisplay(ABC):
@@ -43,6 +43,41 @@ class IOutputDisplay(ABC):
         """
         pass
     
+    @abstractmethod
+    def append_stdout(self, text: str):
+        """
+        Добавление фрагмента стандартного вывода во время выполнения кода.
+
+        Фрагменты выводятся как есть, без markdown форматирования:
+        итоговое форматирование выполняет display_result.
+
+        Args:
+            text: Фрагмент стандартного вывода
+        """
+        pass
+
+    @abstractmethod
+    def append_stderr(self, text: str):
+        """
+        Добавление фрагмента вывода ошибок во время выполнения кода.
+
+        Args:
+            text: Фрагмент вывода ошибок
+        """
+        pass
+
+    @abstractmethod
+    def display_limit_error(self, message: str):
+        """
+        Отображение сообщения о превышении лимита ресурсов (памяти или времени CPU).
+
+        Вызывается после display_result, сообщение добавляется в конец вывода.
+
+        Args:
+            message: Описание превышенного лимита
+        """
+        pass
+
     @abstractmethod
     def display_result(self, stdout: str, stderr: str, exception: Optional[str] = None, enable_markdown: bool = True):
         """
@@ -56,3 +91,26 @@ class IOutputDisplay(ABC):
         """
         pass
 
+    def display_value(self, text: str):
+        """
+        Отображение значения последнего выражения скрипта (как Out в IPython).
+
+        Вызывается после display_result.
+
+        Args:
+            text: Текст значения (см. utils.value_repr)
+        """
+        self.append_text(f"Out: {text}\n")
+
+    def link_text(self, text: str, on_click: Callable[[], None]):
+        """
+        Превращение выведенного текста в ссылку (например, маркер пропущенного вывода).
+
+        Необязательный метод: реализации без ссылок оставляют текст как есть.
+
+        Args:
+            text: Текст, уже добавленный в вывод (используется первое вхождение,
+                  текст должен быть уникальным, как маркеры omission_marker)
+            on_click: Обработчик нажатия на ссылку
+        """
+        pass
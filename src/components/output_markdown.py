@@ -1,9 +1,10 @@
 """Реализация OutputDisplay с поддержкой markdown через CTkTextbox."""
 import customtkinter as ctk
 import tkinter as tk
-from typing import Optional
+from typing import Callable, Optional
 from components.output_interface import IOutputDisplay
 from utils.keyboard_utils import copy_to_clipboard, get_selected_text, bind_case_insensitive
+from utils.output_stream import OUTPUT_HEAD_CHARS, STREAM_TAIL_CHARS
 import re
 
 
@@ -35,6 +36,12 @@ class MarkdownOutputDisplay(IOutputDisplay):
         # Переменная для хранения текущего HTML содержимого
         self._current_html = ""
 
+        # Число ссылок в выводе (теги link_1, link_2, ...)
+        self._link_count = 0
+
+        # Число символов потока, показанных во время выполнения (после начала - скользящий конец)
+        self._streamed_chars = 0
+
         # Слушатель изменения темы
         ctk.AppearanceModeTracker.add(self._on_theme_change)
 
@@ -78,6 +85,7 @@ class MarkdownOutputDisplay(IOutputDisplay):
 
         # Настройка тегов (только цвета, без font из-за ограничений CTkTextbox)
         self.textbox.tag_config("error", foreground=colors['error'])
+        self.textbox.tag_config("limit_error", foreground=colors['error'], background=colors['code_bg'])
         self.textbox.tag_config("success", foreground=colors['success'])
         self.textbox.tag_config("md_header1", foreground=colors['header1'])
         self.textbox.tag_config("md_header2", foreground=colors['header2'])
@@ -358,6 +366,12 @@ class MarkdownOutputDisplay(IOutputDisplay):
         """Очистка вывода."""
         if self.textbox:
             self.textbox.delete("1.0", "end")
+            for number in range(1, self._link_count + 1):
+                self.textbox.tag_delete(f"link_{number}")
+            self._link_count = 0
+            if "stream_cut" in self.textbox.mark_names():
+                self.textbox.mark_unset("stream_cut")
+        self._streamed_chars = 0
         self.clear_plot()
 
     def clear_plot(self):
@@ -393,6 +407,101 @@ class MarkdownOutputDisplay(IOutputDisplay):
             # Используем улучшенный парсинг markdown в CTkTextbox
             self._parse_markdown(text)
 
+    def append_stdout(self, text: str):
+        """
+        Добавление фрагмента стандартного вывода во время выполнения кода.
+
+        Args:
+            text: Фрагмент стандартного вывода
+        """
+        self._append_stream(text)
+
+    def _append_stream(self, text: str, tag: Optional[str] = None):
+        """
+        Добавление фрагмента потока во время выполнения.
+
+        После первых OUTPUT_HEAD_CHARS символов показываются только последние
+        STREAM_TAIL_CHARS: более старый текст после начала удаляется, полный
+        вывод показывается по завершении выполнения.
+
+        Args:
+            text: Фрагмент вывода
+            tag: Тег для форматирования
+        """
+        if not self.textbox:
+            return
+        self.append_text(text, tag)
+        self._streamed_chars += len(text)
+        limit = OUTPUT_HEAD_CHARS + STREAM_TAIL_CHARS
+        if self._streamed_chars > limit:
+            if "stream_cut" not in self.textbox.mark_names():
+                notice = "\n… вывод слишком длинный, показан его конец, полный вывод появится по завершении …\n"
+                self.textbox.insert(f"1.0+{OUTPUT_HEAD_CHARS}c", notice)
+                self.textbox.mark_set("stream_cut", f"1.0+{OUTPUT_HEAD_CHARS + len(notice)}c")
+                self.textbox.mark_gravity("stream_cut", "left")
+            self.textbox.delete("stream_cut", f"stream_cut+{self._streamed_chars - limit}c")
+            self._streamed_chars = limit
+        # Прокручиваем к концу, чтобы был виден последний вывод
+        self.textbox.see("end")
+
+    def append_stderr(self, text: str):
+        """
+        Добавление фрагмента вывода ошибок во время выполнения кода.
+
+        Args:
+            text: Фрагмент вывода ошибок
+        """
+        self._append_stream(text, "error")
+
+    def display_limit_error(self, message: str):
+        """
+        Отображение сообщения о превышении лимита ресурсов.
+
+        Args:
+            message: Описание превышенного лимита
+        """
+        self.append_text(f"\n⛔ {message}\n", "limit_error")
+        self.append_text(
+            "Выполнение остановлено, приложение продолжает работу. "
+            "Уменьшите объём данных или увеличьте лимит в настройках выполнения.\n",
+            "error"
+        )
+        self.textbox.see("end")
+
+    def display_value(self, text: str):
+        """
+        Отображение значения последнего выражения скрипта.
+
+        Args:
+            text: Текст значения (см. utils.value_repr)
+        """
+        # Значение выводится как есть: в repr могут быть символы разметки markdown
+        self.append_text("Out: ", "success")
+        self.append_text(text + "\n", "md_codeblock")
+        self.textbox.see("end")
+
+    def link_text(self, text: str, on_click: Callable[[], None]):
+        """
+        Превращение выведенного текста в ссылку.
+
+        Args:
+            text: Текст, уже добавленный в вывод (используется первое вхождение,
+                  текст должен быть уникальным, как маркеры omission_marker)
+            on_click: Обработчик нажатия на ссылку
+        """
+        start = self.textbox.search(text, "1.0", stopindex="end")
+        if not start:
+            return
+        end = f"{start}+{len(text)}c"
+        # Отдельный тег на каждую ссылку: у каждой свой обработчик
+        self._link_count += 1
+        tag = f"link_{self._link_count}"
+        self.textbox.tag_add("md_link", start, end)
+        self.textbox.tag_add(tag, start, end)
+        self.textbox.tag_bind(tag, "<Button-1>", lambda event: on_click())
+        self.textbox.tag_bind(tag, "<Enter>", lambda event: self.textbox.configure(cursor="hand2"))
+        self.textbox.tag_bind(tag, "<Leave>", lambda event: self.textbox.configure(cursor=""))
+
     def display_result(self, stdout: str, stderr: str, exception: Optional[str] = None, enable_markdown: bool = True):
         """
         Отображение результатов выполнения кода.
@@ -1,8 +1,16 @@
 """Component для отображения графиков в правой панели."""
+import base64
 import customtkinter as ctk
+import tkinter as tk
 import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from typing import Optional, List, Callable
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from typing import Optional, List, Callable, Dict, Union
+from utils.figure_transport import RenderedFigure
+
+
+# Подписи кнопки переключения режима графика
+INTERACTIVE_TEXT = "Интерактивный режим"
+IMAGE_TEXT = "Изображение"
 
 
 class PlotsDisplay:
@@ -54,8 +62,9 @@ class PlotsDisplay:
         # Привязка событий прокрутки для обновления canvas
         self._bind_scroll_events()
         
-        # Список canvas для графиков
-        self.plot_canvases: List[FigureCanvasTkAgg] = []
+        # Графики панели: {'frame', 'source', 'photo', 'image', 'canvas', 'toolbar', 'button'}.
+        # Графики из ядра показываются изображениями, canvas создается только в интерактивном режиме
+        self.plots: List[Dict] = []
     
     def _bind_scroll_events(self):
         """Привязка событий прокрутки для обновления canvas."""
@@ -76,7 +85,10 @@ class PlotsDisplay:
     
     def _update_visible_canvases(self):
         """Обновление видимых canvas после прокрутки."""
-        for canvas in self.plot_canvases:
+        for plot in self.plots:
+            canvas = plot['canvas']
+            if canvas is None:
+                continue
             try:
                 widget = canvas.get_tk_widget()
                 if widget.winfo_viewable():
@@ -86,25 +98,14 @@ class PlotsDisplay:
     
     def clear(self):
         """Очистка всех графиков."""
-        # Очищаем все canvas
-        for canvas in self.plot_canvases:
+        # Закрываем интерактивные canvas
+        for plot in self.plots:
             try:
-                # Получаем фигуру перед уничтожением виджета
-                figure = canvas.figure
-                # Уничтожаем виджет
-                widget = canvas.get_tk_widget()
-                # Отвязываем все события перед уничтожением
-                try:
-                    widget.unbind_all("<Button-1>")
-                    widget.unbind_all("<ButtonRelease-1>")
-                except Exception:
-                    pass
-                widget.destroy()
-                # Закрываем фигуру matplotlib после уничтожения виджета
-                plt.close(figure)
+                self._close_canvas(plot)
             except Exception as e:
                 print(f"Error при очистке canvas: {e}")
-        self.plot_canvases.clear()
+        # Изображения освобождаются вместе со списком
+        self.plots.clear()
         
         # Очищаем скроллируемый фрейм
         for widget in self.plots_scrollable_frame.winfo_children():
@@ -113,23 +114,79 @@ class PlotsDisplay:
             except Exception:
                 pass
     
-    def display_plot(self, figure: plt.Figure):
+    def display_plot(self, item: Union[RenderedFigure, plt.Figure]):
         """
-        Отображение графика matplotlib.
+        Отображение графика.
         
         Args:
-            figure: Объект Figure matplotlib
+            item: Изображение графика, отрисованное ядром (RenderedFigure),
+                  или объект Figure matplotlib (отрисовывается здесь же)
         """
-        print(f"DEBUG display_plot: Adding figure {figure}")
+        print(f"DEBUG display_plot: Adding figure {item}")
         # Создаем фрейм для текущего графика
         plot_frame = ctk.CTkFrame(self.plots_scrollable_frame, corner_radius=0)
         plot_frame.pack(anchor="center")
+        plot = {'frame': plot_frame, 'source': item, 'photo': None, 'image': None,
+                'canvas': None, 'toolbar': None, 'button': None}
+        
+        if isinstance(item, RenderedFigure):
+            # Кнопка переключения между изображением и интерактивным графиком
+            plot['button'] = ctk.CTkButton(
+                plot_frame,
+                text=INTERACTIVE_TEXT,
+                width=140,
+                height=24,
+                command=lambda: self.toggle_interactive(plot)
+            )
+            plot['button'].pack(side="top", anchor="e", pady=(2, 2))
+            self._show_image(plot)
+        else:
+            self._show_canvas(plot, item)
+        
+        # Обновляем размеры скроллируемого фрейма после добавления каждого графика
+        self.plots_scrollable_frame.update_idletasks()
+        
+        # Сохраняем график в список
+        self.plots.append(plot)
+        print(f"DEBUG display_plot: Plot added, total plots: {len(self.plots)}")
+    
+    def toggle_interactive(self, plot: Dict):
+        """
+        Переключение графика между изображением и интерактивным canvas.
         
-        # Встраиваем график
+        Args:
+            plot: Запись графика из self.plots
+        """
+        if plot['canvas'] is None:
+            # Figure восстанавливается только по запросу
+            figure = plot['source'].figure()
+            plot['image'].destroy()
+            plot['image'] = None
+            plot['photo'] = None
+            self._show_canvas(plot, figure)
+            plot['button'].configure(text=IMAGE_TEXT)
+        else:
+            self._close_canvas(plot)
+            self._show_image(plot)
+            plot['button'].configure(text=INTERACTIVE_TEXT)
+        self.frame.after(200, self._refresh_scrollable_frame)
+    
+    def _show_image(self, plot: Dict):
+        """Показ изображения графика (без объекта Figure)."""
+        rendered = plot['source']
+        # PhotoImage декодирует PNG сам, base64 - формат data, понятный любой версии Tk
+        plot['photo'] = tk.PhotoImage(master=plot['frame'], data=base64.b64encode(rendered.png))
+        plot['image'] = tk.Label(plot['frame'], image=plot['photo'], borderwidth=0, highlightthickness=0)
+        plot['image'].pack(side="top")
+    
+    def _show_canvas(self, plot: Dict, figure: plt.Figure):
+        """Встраивание Figure в интерактивный canvas с панелью навигации."""
+        plot_frame = plot['frame']
         plot_canvas = FigureCanvasTkAgg(figure, plot_frame)
         
-        # Настраиваем параметры figure для лучшей производительности
-        figure.set_tight_layout(True)
+        # Графики из ядра уже получили компоновку при отрисовке
+        if figure.get_layout_engine() is None:
+            figure.set_layout_engine('tight')
         
         # Используем draw для первоначальной отрисовки
         plot_canvas.draw()
@@ -138,6 +195,13 @@ class PlotsDisplay:
         # Настраиваем параметры виджета для лучшей производительности при прокрутке
         widget.configure(highlightthickness=0, borderwidth=0)
         
+        # Панель навигации (масштаб, сдвиг) только у графиков, открытых по запросу
+        if plot['button'] is not None:
+            toolbar = NavigationToolbar2Tk(plot_canvas, plot_frame, pack_toolbar=False)
+            toolbar.update()
+            toolbar.pack(side="bottom", fill="x")
+            plot['toolbar'] = toolbar
+        
         # Упаковываем виджет - используем pack без fill для правильного определения размеров
         widget.pack(side="top")
         
@@ -147,19 +211,35 @@ class PlotsDisplay:
         # Принудительно обновляем размеры после упаковки
         plot_frame.update_idletasks()
         widget.update_idletasks()
-        # Обновляем размеры скроллируемого фрейма после добавления каждого графика
-        self.plots_scrollable_frame.update_idletasks()
-        
-        # Сохраняем canvas в список
-        self.plot_canvases.append(plot_canvas)
-        print(f"DEBUG display_plot: Canvas added, total canvases: {len(self.plot_canvases)}")
+        plot['canvas'] = plot_canvas
+    
+    def _close_canvas(self, plot: Dict):
+        """Уничтожение интерактивного canvas графика и его Figure."""
+        plot_canvas = plot['canvas']
+        if plot_canvas is None:
+            return
+        figure = plot_canvas.figure
+        if plot['toolbar'] is not None:
+            plot['toolbar'].destroy()
+            plot['toolbar'] = None
+        widget = plot_canvas.get_tk_widget()
+        # Отвязываем все события перед уничтожением
+        try:
+            widget.unbind_all("<Button-1>")
+            widget.unbind_all("<ButtonRelease-1>")
+        except Exception:
+            pass
+        widget.destroy()
+        # Закрываем фигуру matplotlib после уничтожения виджета
+        plt.close(figure)
+        plot['canvas'] = None
     
-    def display_plots(self, figures: List[plt.Figure]):
+    def display_plots(self, figures: List[Union[RenderedFigure, plt.Figure]]):
         """
-        Отображение нескольких графиков matplotlib.
+        Отображение нескольких графиков.
         
         Args:
-            figures: Список объектов Figure matplotlib
+            figures: Список изображений графиков из ядра или объектов Figure matplotlib
         """
         print(f"DEBUG display_plots: Received {len(figures)} figures")
         self.clear()
@@ -185,6 +265,18 @@ class PlotsDisplay:
             self.frame.after(200, self._refresh_scrollable_frame)
             print(f"DEBUG display_plots: Panel should be visible now")
     
+    def add_plot(self, item: Union[RenderedFigure, plt.Figure]):
+        """
+        Добавление графика к уже показанным (графики приходят по мере выполнения кода).
+
+        Args:
+            item: Изображение графика из ядра или объект Figure matplotlib
+        """
+        self.display_plot(item)
+        self.show()
+        # Обновляем размеры скроллируемого фрейма после отрисовки изображения
+        self.frame.after(200, self._refresh_scrollable_frame)
+
     def _refresh_scrollable_frame(self):
         """Обновление размеров скроллируемого фрейма."""
         try:
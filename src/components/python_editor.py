@@ -12,7 +12,8 @@ import customtkinter as ctk
 import tkinter as tk
 from tkinter import scrolledtext
 import re
-from typing import Optional, List, Tuple
+import textwrap
+from typing import Dict, Optional, List, Tuple
 from utils.keyboard_utils import copy_to_clipboard, get_selected_text, get_clipboard_text, bind_case_insensitive
 from utils.bindtag_context import BindTagContext
 from components.notification import Notification
@@ -33,6 +34,11 @@ except ImportError:
     print("Предупреждение: jedi недоступен, автодополнение будет ограничено")
 
 
+# Ширина полосы с номерами строк (пиксели)
+GUTTER_WIDTH = 48
+# Цвет самой "горячей" строки профиля
+HEAT_COLOR = "#e5484d"
+
 
 class PythonEditor:
     """Класс для редактирования Python кода с подсветкой синтаксиса и автодополнением."""
@@ -65,7 +71,31 @@ class PythonEditor:
             undo=True,
             maxundo=50
         )
+        # Полоса слева от текста: номера строк и тепловая карта профилировщика строк
+        self.gutter = tk.Canvas(
+            text_container,
+            width=GUTTER_WIDTH,
+            bg="#252526" if ctk.get_appearance_mode() == "Dark" else "#f3f3f3",
+            highlightthickness=0,
+            bd=0
+        )
+        self.gutter.pack(side="left", fill="y")
         self.text_widget.pack(fill="both", expand=True)
+
+        # Доля времени каждой строки от самой медленной: {номер строки: 0..1}
+        self._line_heat: Dict[int, float] = {}
+        # Число строк текста, к которому относится тепловая карта
+        self._heat_line_count = 0
+        self._gutter_redraw_pending = False
+        # Перерисовка полосы при прокрутке и изменении размера
+        scrollbar_set = self.text_widget.vbar.set
+
+        def on_scroll(first, last):
+            scrollbar_set(first, last)
+            self._schedule_gutter_redraw()
+
+        self.text_widget.configure(yscrollcommand=on_scroll)
+        self.text_widget.bind("<Configure>", lambda e: self._schedule_gutter_redraw(), add="+")
         
         # Настройка подсветки синтаксиса
         if IDLELIB_AVAILABLE:
@@ -98,6 +128,10 @@ class PythonEditor:
         
         # Callback для выполнения кода (устанавливается извне)
         self.run_code_callback = None
+        # Callback для выполнения кода без кэша ячеек (устанавливается извне)
+        self.force_run_code_callback = None
+        # Callback для выполнения выделения / текущего блока (устанавливается извне)
+        self.run_selection_callback = None
         # Callbacks для действий с файлами (устанавливаются извне)
         self.create_file_callback = None
         self.save_file_callback = None
@@ -112,6 +146,8 @@ class PythonEditor:
         self.text_widget.bind("<Tab>", self._on_tab, add="+")
         self.text_widget.bind("<Escape>", self._close_autocomplete, add="+")
         self.text_widget.bind("<F5>", self._on_f5)
+        self.text_widget.bind("<Shift-F5>", self._on_shift_f5)
+        self.text_widget.bind("<Control-Return>", self._on_run_selection)
         
         # ID привязок для навигации (для последующего отвязывания)
         self._nav_bind_ids = []
@@ -435,6 +471,26 @@ class PythonEditor:
             print(f"Error выполнения кода (F5): {e}")
             return None
     
+    def _on_shift_f5(self, event):
+        """Обработка нажатия Shift+F5 для выполнения кода без кэша ячеек и реактивного состояния."""
+        try:
+            if self.force_run_code_callback:
+                self.force_run_code_callback()
+            return "break"
+        except Exception as e:
+            print(f"Error выполнения кода (Shift+F5): {e}")
+            return None
+
+    def _on_run_selection(self, event):
+        """Обработка нажатия Ctrl+Enter для выполнения выделения или текущего блока."""
+        try:
+            if self.run_selection_callback:
+                self.run_selection_callback()
+            return "break"
+        except Exception as e:
+            print(f"Error выполнения выделения (Ctrl+Enter): {e}")
+            return None
+
     def _on_tab(self, event):
         """Обработка Tab для автодополнения."""
         try:
@@ -842,6 +898,42 @@ class PythonEditor:
         """
         return self.text_widget.get("1.0", "end-1c")
     
+    def get_selection_or_block(self) -> str:
+        """
+        Получение кода для частичного выполнения.
+
+        Возвращает выделенный текст, а если выделения нет - текущий блок:
+        непрерывную группу непустых строк вокруг курсора.
+        Общий отступ удаляется, чтобы код можно было выполнить отдельно.
+
+        Returns:
+            Текст кода (пустая строка, если курсор на пустой строке)
+        """
+        if self.text_widget.tag_ranges("sel"):
+            code = self.text_widget.get("sel.first", "sel.last")
+        else:
+            lines = self.get_code().split("\n")
+            current = int(self.text_widget.index("insert").split(".")[0]) - 1
+            if current >= len(lines) or not lines[current].strip():
+                return ""
+            start = current
+            while start > 0 and lines[start - 1].strip():
+                start -= 1
+            end = current
+            while end + 1 < len(lines) and lines[end + 1].strip():
+                end += 1
+            code = "\n".join(lines[start:end + 1])
+        return textwrap.dedent(code)
+
+    def get_cursor_line(self) -> int:
+        """
+        Получение номера строки, на которой стоит курсор.
+
+        Returns:
+            Номер строки (с 1)
+        """
+        return int(self.text_widget.index("insert").split(".")[0])
+
     def set_code(self, code: str):
         """
         Установка кода в редактор.
@@ -868,6 +960,24 @@ class PythonEditor:
             callback: Функция без параметров, которая будет вызвана при нажатии F5
         """
         self.run_code_callback = callback
+
+    def set_force_run_code_callback(self, callback):
+        """
+        Установка callback для выполнения кода без кэша ячеек (Shift+F5).
+
+        Args:
+            callback: Функция без параметров, которая будет вызвана при нажатии Shift+F5
+        """
+        self.force_run_code_callback = callback
+
+    def set_run_selection_callback(self, callback):
+        """
+        Установка callback для выполнения выделения / текущего блока (Ctrl+Enter).
+
+        Args:
+            callback: Функция без параметров, которая будет вызвана при нажатии Ctrl+Enter
+        """
+        self.run_selection_callback = callback
     
     def set_file_action_callbacks(self, create_callback=None, save_callback=None, delete_callback=None):
         """
@@ -1151,6 +1261,92 @@ class PythonEditor:
             self.text_widget.edit_modified(False)
             # Обновляем подсветку синтаксиса
             self._update_syntax_highlighting()
+            # Профиль строк относится к прежнему тексту
+            self._line_heat = {}
+            self._schedule_gutter_redraw()
+
+    def set_line_heat(self, line_times: Dict[int, float], code: Optional[str] = None):
+        """
+        Отображение тепловой карты профиля строк в полосе номеров строк.
+
+        Карта привязана к номерам строк, поэтому она убирается при любом изменении
+        текста (см. _on_text_modified) и не показывается для устаревшего текста.
+
+        Args:
+            line_times: Время выполнения строк {номер строки: секунды}
+            code: Код, для которого собран профиль (None - текущий текст редактора);
+                  если текст уже изменен, карта не показывается
+        """
+        if code is not None and code != self.get_code():
+            self.clear_line_heat()
+            return
+        # Следующее изменение текста снова вызовет <<Modified>> и уберет карту
+        self.text_widget.edit_modified(False)
+        self._heat_line_count = self._line_count()
+        slowest = max(line_times.values(), default=0.0)
+        if slowest > 0:
+            self._line_heat = {line: line_time / slowest for line, line_time in line_times.items() if line_time > 0}
+        else:
+            self._line_heat = {}
+        self._schedule_gutter_redraw()
+
+    def clear_line_heat(self):
+        """Удаление тепловой карты профиля строк."""
+        if self._line_heat:
+            self._line_heat = {}
+            self._schedule_gutter_redraw()
+
+    def _schedule_gutter_redraw(self):
+        """Отложенная перерисовка полосы номеров строк (один раз за цикл событий)."""
+        if not self._gutter_redraw_pending:
+            self._gutter_redraw_pending = True
+            self.gutter.after_idle(self._redraw_gutter)
+
+    def _line_count(self) -> int:
+        """Число строк текста редактора."""
+        return int(self.text_widget.index("end-1c").split(".")[0])
+
+    def _redraw_gutter(self):
+        """Перерисовка номеров видимых строк и тепловой карты."""
+        self._gutter_redraw_pending = False
+        if self._line_heat and self._line_count() != self._heat_line_count:
+            # Строки добавлены или удалены: номера карты больше не соответствуют коду
+            self._line_heat = {}
+        self.gutter.delete("all")
+        is_dark = ctk.get_appearance_mode() == "Dark"
+        number_color = "#858585" if is_dark else "#6e7681"
+        background = self.gutter.cget("bg")
+
+        index = self.text_widget.index("@0,0")
+        while True:
+            info = self.text_widget.dlineinfo(index)
+            if info is None:
+                break
+            y, height = info[1], info[3]
+            line = int(index.split(".")[0])
+            heat = self._line_heat.get(line)
+            if heat:
+                # Длина и насыщенность полосы пропорциональны времени строки
+                self.gutter.create_rectangle(
+                    0, y, max(3, int(GUTTER_WIDTH * heat)), y + height,
+                    fill=self._blend_color(background, HEAT_COLOR, 0.35 + 0.65 * heat), width=0
+                )
+            self.gutter.create_text(
+                GUTTER_WIDTH - 6, y, anchor="ne", text=str(line),
+                fill=number_color, font=("Consolas", 10)
+            )
+            next_index = self.text_widget.index(f"{index}+1line")
+            if next_index == index:
+                break
+            index = next_index
+
+    @staticmethod
+    def _blend_color(start: str, end: str, ratio: float) -> str:
+        """Смешивание двух цветов #rrggbb в пропорции ratio (0 - start, 1 - end)."""
+        start_rgb = [int(start[i:i + 2], 16) for i in (1, 3, 5)]
+        end_rgb = [int(end[i:i + 2], 16) for i in (1, 3, 5)]
+        mixed = [round(a + (b - a) * ratio) for a, b in zip(start_rgb, end_rgb)]
+        return "#" + "".join(f"{channel:02x}" for channel in mixed)
 
 
 
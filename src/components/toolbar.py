@@ -4,6 +4,14 @@ from tkinter import filedialog, messagebox, simpledialog
 from typing import Callable, Optional
 
 
+# Execution modes: setting value -> label in the mode selector
+EXECUTION_MODES = {
+    "script": "Script",
+    "cells": "Cells",
+    "reactive": "Reactive",
+}
+
+
 class Toolbar:
     """Toolbar class with control buttons."""
 
@@ -14,7 +22,16 @@ class Toolbar:
                  on_select_directory: Optional[Callable] = None,
                  on_delete: Optional[Callable] = None,
                  on_create_folder: Optional[Callable] = None,
-                 on_help: Optional[Callable] = None):
+                 on_help: Optional[Callable] = None,
+                 on_toggle_session: Optional[Callable] = None,
+                 on_mode_change: Optional[Callable[[str], None]] = None,
+                 on_checkpoint: Optional[Callable] = None,
+                 on_stop: Optional[Callable] = None,
+                 on_profile: Optional[Callable] = None,
+                 on_line_profile: Optional[Callable] = None,
+                 on_memory_profile: Optional[Callable] = None,
+                 on_sweep: Optional[Callable] = None,
+                 on_variables: Optional[Callable] = None):
         """
         Initialize toolbar.
 
@@ -26,6 +43,16 @@ class Toolbar:
             on_select_directory: Callback for "Select directory" button
             on_delete: Callback for "Delete file" button
             on_create_folder: Callback for "Create folder" button
+            on_help: Callback for "Help" button
+            on_toggle_session: Callback for "Persistent session" toggle button
+            on_mode_change: Callback receiving new execution mode (key of EXECUTION_MODES)
+            on_checkpoint: Callback for "Checkpoint" toggle button
+            on_stop: Callback for "Stop" button
+            on_profile: Callback for "Run with profiler" button
+            on_line_profile: Callback for "Run with line profiler" button
+            on_memory_profile: Callback for "Run with memory profile" button
+            on_sweep: Callback for "Parameter sweep" button
+            on_variables: Callback for "Variables" panel toggle button
         """
         self.frame = ctk.CTkFrame(parent)
         self.frame.pack(fill="x", padx=5, pady=5)
@@ -37,11 +64,23 @@ class Toolbar:
         self.on_delete = on_delete
         self.on_create_folder = on_create_folder
         self.on_help = on_help
+        self.on_toggle_session = on_toggle_session
+        self.on_mode_change = on_mode_change
+        self.on_checkpoint = on_checkpoint
+        self.on_stop = on_stop
+        self.on_profile = on_profile
+        self.on_line_profile = on_line_profile
+        self.on_memory_profile = on_memory_profile
+        self.on_sweep = on_sweep
+        self.on_variables = on_variables
 
         # Button colors - gray theme that adapts to appearance mode
         # Format: (light_theme_color, dark_theme_color)
         button_fg_color = ("gray75", "gray25")  # Light gray for light theme, dark gray for dark theme
         button_hover_color = ("gray65", "gray35")  # Darker on hover
+        self._button_fg_color = button_fg_color
+        # Color of toggle buttons in active state
+        self._active_fg_color = ("#3a7ebf", "#1f538d")
 
         # "Select directory" button
         self.dir_btn = ctk.CTkButton(
@@ -123,6 +162,135 @@ class Toolbar:
         )
         self.run_btn.pack(side="left", padx=2)
 
+        # "Stop" button (enabled while code is running)
+        self.stop_btn = ctk.CTkButton(
+            self.frame,
+            text="⏹",  # Stop icon
+            command=self._handle_stop,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color,
+            state="disabled"
+        )
+        self.stop_btn.pack(side="left", padx=2)
+
+        # Queue indicator: runs requested while code runs (empty - none waiting)
+        self.queue_label = ctk.CTkLabel(
+            self.frame,
+            text="",
+            width=0,
+            font=ctk.CTkFont(size=12),
+            text_color=("gray30", "gray70")
+        )
+        self.queue_label.pack(side="left", padx=(0, 2))
+
+        # "Run with profiler" button
+        self.profile_btn = ctk.CTkButton(
+            self.frame,
+            text="⏱",  # Stopwatch icon
+            command=self._handle_profile,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color
+        )
+        self.profile_btn.pack(side="left", padx=2)
+
+        # "Run with line profiler" button (heatmap in the editor gutter)
+        self.line_profile_btn = ctk.CTkButton(
+            self.frame,
+            text="🔥",  # Heatmap icon
+            command=self._handle_line_profile,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color
+        )
+        self.line_profile_btn.pack(side="left", padx=2)
+
+        # "Run with memory profile" button (tracemalloc allocation sites)
+        self.memory_profile_btn = ctk.CTkButton(
+            self.frame,
+            text="🧮",  # Abacus icon
+            command=self._handle_memory_profile,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color
+        )
+        self.memory_profile_btn.pack(side="left", padx=2)
+
+        # "Parameter sweep" button (variants of `# @sweep` constants in worker processes)
+        self.sweep_btn = ctk.CTkButton(
+            self.frame,
+            text="🎛",  # Control knobs icon
+            command=self._handle_sweep,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color
+        )
+        self.sweep_btn.pack(side="left", padx=2)
+
+        # "Variables" panel toggle button (namespace after the last run)
+        self.variables_btn = ctk.CTkButton(
+            self.frame,
+            text="🧾",  # Receipt icon
+            command=self._handle_variables,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color
+        )
+        self.variables_btn.pack(side="left", padx=2)
+
+        # "Persistent session" toggle button (namespace survives between runs)
+        self.session_btn = ctk.CTkButton(
+            self.frame,
+            text="🔁",  # Session icon
+            command=self._handle_toggle_session,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color
+        )
+        self.session_btn.pack(side="left", padx=2)
+
+        # Execution mode selector
+        self.mode_menu = ctk.CTkOptionMenu(
+            self.frame,
+            values=list(EXECUTION_MODES.values()),
+            command=self._handle_mode_change,
+            width=95,
+            height=35,
+            fg_color=button_fg_color,
+            button_color=button_fg_color,
+            button_hover_color=button_hover_color,
+            text_color=("gray10", "gray90")
+        )
+        self.mode_menu.pack(side="left", padx=2)
+
+        # "Checkpoint" toggle button (freeze state after the current cell, run variants below it)
+        self.checkpoint_btn = ctk.CTkButton(
+            self.frame,
+            text="📌",  # Pin icon
+            command=self._handle_checkpoint,
+            width=40,
+            height=35,
+            font=ctk.CTkFont(size=14),
+            fg_color=button_fg_color,
+            hover_color=button_hover_color
+        )
+        self.checkpoint_btn.pack(side="left", padx=2)
+
         # "Help" button for hotkeys
         self.help_btn = ctk.CTkButton(
             self.frame,
@@ -136,6 +304,17 @@ class Toolbar:
         )
         self.help_btn.pack(side="right", padx=2)
 
+        # Status area: summary of the last run
+        self.status_label = ctk.CTkLabel(
+            self.frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=("gray30", "gray70")
+        )
+        self.status_label.pack(side="right", padx=8)
+        # Details of the status shown on hover
+        self._status_details = ""
+
         # Add tooltips for buttons
         self._add_tooltips()
 
@@ -166,7 +345,53 @@ class Toolbar:
             self.run_btn.bind("<Enter>", lambda e: self._show_tooltip(e, "Run code"))
             self.run_btn.bind("<Leave>", self._hide_tooltip)
 
+            self.stop_btn.bind("<Enter>", lambda e: self._show_tooltip(e, "Stop execution (Ctrl+F2)"))
+            self.stop_btn.bind("<Leave>", self._hide_tooltip)
+
+            self.queue_label.bind(
+                "<Enter>", lambda e: self._show_tooltip(e, "Queued runs (start when the current one finishes)")
+            )
+            self.queue_label.bind("<Leave>", self._hide_tooltip)
+
+            self.profile_btn.bind(
+                "<Enter>", lambda e: self._show_tooltip(e, "Run with profiler (Ctrl+Shift+P - export .prof)")
+            )
+            self.profile_btn.bind("<Leave>", self._hide_tooltip)
+
+            self.line_profile_btn.bind(
+                "<Enter>", lambda e: self._show_tooltip(e, "Run with line profiler (heatmap by the line numbers)")
+            )
+            self.line_profile_btn.bind("<Leave>", self._hide_tooltip)
+
+            self.memory_profile_btn.bind(
+                "<Enter>", lambda e: self._show_tooltip(e, "Run with memory profile (allocations by line)")
+            )
+            self.memory_profile_btn.bind("<Leave>", self._hide_tooltip)
+
+            self.sweep_btn.bind(
+                "<Enter>", lambda e: self._show_tooltip(e, "Parameter sweep (constants marked with # @sweep [values])")
+            )
+            self.sweep_btn.bind("<Leave>", self._hide_tooltip)
+
+            self.variables_btn.bind("<Enter>", lambda e: self._show_tooltip(e, "Variables of the last run"))
+            self.variables_btn.bind("<Leave>", self._hide_tooltip)
+
+            self.session_btn.bind("<Enter>", lambda e: self._show_tooltip(e, "Persistent session"))
+            self.session_btn.bind("<Leave>", self._hide_tooltip)
+
+            self.mode_menu.bind("<Enter>", lambda e: self._show_tooltip(e, "Execution mode"))
+            self.mode_menu.bind("<Leave>", self._hide_tooltip)
+
+            self.checkpoint_btn.bind(
+                "<Enter>", lambda e: self._show_tooltip(e, "Checkpoint after current cell (run variants below it)")
+            )
+            self.checkpoint_btn.bind("<Leave>", self._hide_tooltip)
+
             self.help_btn.bind("<Enter>", lambda e: self._show_tooltip(e, "Hotkeys (F1)"))
+            self.status_label.bind(
+                "<Enter>", lambda e: self._show_tooltip(e, self._status_details) if self._status_details else None
+            )
+            self.status_label.bind("<Leave>", self._hide_tooltip)
             self.help_btn.bind("<Leave>", self._hide_tooltip)
 
         except ImportError:
@@ -237,6 +462,28 @@ class Toolbar:
         else:
             self.save_btn.configure(state="disabled")
 
+    def set_running(self, running: bool, queued: int = 0):
+        """
+        Show run queue state (the stop button is enabled only while something runs or waits).
+
+        Args:
+            running: True while code is running
+            queued: Number of runs waiting to start
+        """
+        self.stop_btn.configure(state="normal" if running or queued else "disabled")
+        self.queue_label.configure(text=f"+{queued}" if queued else "")
+
+    def set_status(self, text: str, details: str = ""):
+        """
+        Show text in the status area.
+
+        Args:
+            text: Status text (empty string clears it)
+            details: Text shown when hovering the status (empty - nothing)
+        """
+        self.status_label.configure(text=text)
+        self._status_details = details
+
     def set_delete_enabled(self, enabled: bool):
         """
         Control delete button state.
@@ -249,6 +496,39 @@ class Toolbar:
         else:
             self.delete_btn.configure(state="disabled")
 
+    def set_session_active(self, active: bool):
+        """
+        Show persistent session state on the toggle button.
+
+        Args:
+            active: True if persistent session is enabled
+        """
+        self.session_btn.configure(fg_color=self._active_fg_color if active else self._button_fg_color)
+
+    def set_checkpoint_active(self, active: bool):
+        """
+        Show checkpoint state on the toggle button.
+
+        Args:
+            active: True if a checkpoint exists
+        """
+        self.checkpoint_btn.configure(fg_color=self._active_fg_color if active else self._button_fg_color)
+
+    def set_execution_mode(self, mode: str):
+        """
+        Show execution mode in the mode selector.
+
+        Args:
+            mode: Execution mode (key of EXECUTION_MODES)
+        """
+        self.mode_menu.set(EXECUTION_MODES.get(mode, EXECUTION_MODES["script"]))
+
+    def _handle_mode_change(self, label: str):
+        """Handle execution mode selection."""
+        mode = next((key for key, value in EXECUTION_MODES.items() if value == label), "script")
+        if self.on_mode_change:
+            self.on_mode_change(mode)
+
     def _handle_save(self):
         """Handle file save button."""
         if self.on_save:
@@ -264,11 +544,64 @@ class Toolbar:
         if self.on_run:
             self.on_run()
     
+    def _handle_stop(self):
+        """Handle stop button."""
+        if self.on_stop:
+            self.on_stop()
+
+    def _handle_profile(self):
+        """Handle run with profiler button."""
+        if self.on_profile:
+            self.on_profile()
+
+    def _handle_line_profile(self):
+        """Handle run with line profiler button."""
+        if self.on_line_profile:
+            self.on_line_profile()
+
+    def _handle_memory_profile(self):
+        """Handle run with memory profile button."""
+        if self.on_memory_profile:
+            self.on_memory_profile()
+
+    def _handle_sweep(self):
+        """Handle parameter sweep button."""
+        if self.on_sweep:
+            self.on_sweep()
+
+    def _handle_variables(self):
+        """Handle variables panel toggle button."""
+        if self.on_variables:
+            self.on_variables()
+
+    def _handle_toggle_session(self):
+        """Handle persistent session toggle button."""
+        if self.on_toggle_session:
+            self.on_toggle_session()
+
+    def _handle_checkpoint(self):
+        """Handle checkpoint toggle button."""
+        if self.on_checkpoint:
+            self.on_checkpoint()
+
     def _handle_help(self):
         """Handle help button."""
         if self.on_help:
             self.on_help()
     
+    @staticmethod
+    def save_profile_dialog() -> Optional[str]:
+        """
+        Open file selection dialog for saving a profile.
+
+        Returns:
+            File path or None if cancelled
+        """
+        return filedialog.asksaveasfilename(
+            defaultextension=".prof",
+            filetypes=[("Profile files", "*.prof"), ("All files", "*.*")]
+        )
+
     @staticmethod
     def save_file_dialog() -> Optional[str]:
         """
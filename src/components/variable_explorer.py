@@ -0,0 +1,274 @@
+"""Component панели переменных (variable explorer)."""
+import customtkinter as ctk
+import tkinter as tk
+from typing import Callable, Dict, List, Optional
+from utils.value_repr import format_size
+
+
+# Высота строки таблицы (пиксели)
+ROW_HEIGHT = 20
+# Отступ вложенных строк (пиксели на уровень)
+INDENT = 14
+# Колонки: (ключ, заголовок, ширина в пикселях)
+COLUMNS = [
+    ("name", "Имя", 170),
+    ("type", "Тип", 90),
+    ("shape", "Размер", 110),
+    ("dtype", "dtype", 70),
+    ("size", "Память", 80),
+    ("preview", "Значение", 200),
+]
+
+
+class VariableExplorer:
+    """
+    Панель со списком переменных, оставшихся после выполнения кода.
+
+    Таблица виртуальная: на Canvas рисуются только видимые строки, поэтому
+    тысячи переменных не создают тысячи виджетов. Значения раскрываются по
+    запросу: дочерние элементы запрашиваются страницами через on_expand
+    и добавляются методом add_page.
+    """
+
+    def __init__(self, parent, on_expand: Optional[Callable[[List, int], None]] = None,
+                 on_close: Optional[Callable] = None):
+        """
+        Инициализация панели.
+
+        Args:
+            parent: Родительский виджет
+            on_expand: Callback (path, start) запроса страницы дочерних элементов
+            on_close: Callback при закрытии панели
+        """
+        self.parent = parent
+        self.on_expand = on_expand
+        self.on_close = on_close
+
+        # Строки таблицы: {'kind': 'value' | 'more' | 'loading' | 'message', 'depth', 'path', 'data', 'expanded'}
+        self.rows: List[Dict] = []
+        # Индекс первой видимой строки
+        self.top_row = 0
+        # Можно ли раскрывать значения (пространство имен еще живо в ядре)
+        self.expandable = False
+
+        self.frame = ctk.CTkFrame(parent)
+        self.frame.pack(fill="both", expand=True)
+
+        header_frame = ctk.CTkFrame(self.frame, corner_radius=0)
+        header_frame.pack(fill="x")
+        ctk.CTkLabel(
+            header_frame,
+            text="Переменные",
+            font=ctk.CTkFont(size=14, weight="bold")
+        ).pack(side="left", padx=5)
+        self.count_label = ctk.CTkLabel(header_frame, text="")
+        self.count_label.pack(side="left", padx=5)
+        ctk.CTkButton(
+            header_frame,
+            text="✕",
+            width=30,
+            height=30,
+            command=self.close,
+            fg_color="transparent",
+            hover_color="gray",
+            text_color=("gray10", "gray90")
+        ).pack(side="right", padx=5)
+
+        body = ctk.CTkFrame(self.frame, corner_radius=0)
+        body.pack(fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas = tk.Canvas(body, highlightthickness=0, width=sum(width for _, _, width in COLUMNS))
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._redraw())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self._scroll(-1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self._scroll(-1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self._scroll(1, "units"))
+
+    def _colors(self) -> Dict[str, str]:
+        """Цвета таблицы для текущей темы."""
+        if ctk.get_appearance_mode() == "Dark":
+            return {'bg': "#1d1e1e", 'fg': "#dce4ee", 'muted': "#8a8f98", 'header': "#2b2b2b", 'stripe': "#242526"}
+        return {'bg': "#f9f9fa", 'fg': "#1a1a1a", 'muted': "#6b6f76", 'header': "#e5e5e5", 'stripe': "#f0f0f2"}
+
+    @property
+    def visible_rows(self) -> int:
+        """Число строк, помещающихся в панель (без заголовка)."""
+        return max(1, self.canvas.winfo_height() // ROW_HEIGHT - 1)
+
+    def set_variables(self, variables: List[Dict], expandable: bool):
+        """
+        Show переменные нового запуска.
+
+        Args:
+            variables: Сводки переменных (см. utils.variables.summarize_namespace)
+            expandable: Можно ли запрашивать дочерние элементы у ядра
+        """
+        self.expandable = expandable
+        self.rows = [
+            {'kind': 'value', 'depth': 0, 'path': [variable['name']], 'data': variable, 'expanded': False}
+            for variable in variables
+        ]
+        self.top_row = 0
+        self.count_label.configure(text=f"{len(variables)}")
+        self._redraw()
+
+    def add_page(self, path: List, start: int, total: int, items: List[Dict], error: Optional[str] = None):
+        """
+        Добавление страницы дочерних элементов раскрытого значения.
+
+        Args:
+            path: Путь раскрытого значения
+            start: Индекс первого элемента страницы
+            total: Общее число дочерних элементов
+            items: Сводки элементов с 'name' и 'key'
+            error: Текст ошибки, если значение больше недоступно
+        """
+        index = self._find_row('loading', path)
+        if index is None:
+            # Значение свернули или список переменных сменился
+            return
+        depth = self.rows[index]['depth']
+        if error:
+            new_rows = [{'kind': 'message', 'depth': depth, 'path': path, 'data': {'name': error}}]
+        else:
+            new_rows = [
+                {'kind': 'value', 'depth': depth, 'path': path + [item['key']], 'data': item, 'expanded': False}
+                for item in items
+            ]
+            shown = start + len(items)
+            if shown < total:
+                new_rows.append({'kind': 'more', 'depth': depth, 'path': path, 'start': shown,
+                                 'data': {'name': f"… еще {total - shown} (показать)"}})
+        self.rows[index:index + 1] = new_rows
+        self._redraw()
+
+    def _find_row(self, kind: str, path: List) -> Optional[int]:
+        """Поиск строки заданного вида с заданным путем."""
+        for index, row in enumerate(self.rows):
+            if row['kind'] == kind and row['path'] == path:
+                return index
+        return None
+
+    def _on_click(self, event):
+        """Раскрытие/сворачивание значения или загрузка следующей страницы."""
+        row_index = self.top_row + event.y // ROW_HEIGHT - 1
+        if event.y < ROW_HEIGHT or not 0 <= row_index < len(self.rows):
+            return
+        row = self.rows[row_index]
+        if row['kind'] == 'more':
+            self.rows[row_index] = {'kind': 'loading', 'depth': row['depth'], 'path': row['path'],
+                                    'data': {'name': "загрузка…"}}
+            self._request(row['path'], row['start'])
+        elif row['kind'] == 'value' and row['data'].get('expandable') and self.expandable:
+            if row['expanded']:
+                row['expanded'] = False
+                end = row_index + 1
+                while end < len(self.rows) and self.rows[end]['depth'] > row['depth']:
+                    end += 1
+                del self.rows[row_index + 1:end]
+            else:
+                row['expanded'] = True
+                self.rows.insert(row_index + 1, {'kind': 'loading', 'depth': row['depth'] + 1,
+                                                 'path': row['path'], 'data': {'name': "загрузка…"}})
+                self._request(row['path'], 0)
+        self._redraw()
+
+    def _request(self, path: List, start: int):
+        """Запрос страницы дочерних элементов у ядра."""
+        if self.on_expand:
+            self.on_expand(path, start)
+
+    def _on_scrollbar(self, action, *args):
+        """Обработка команды полосы прокрутки."""
+        if action == "moveto":
+            self.top_row = int(float(args[0]) * len(self.rows))
+            self._redraw()
+        elif action == "scroll":
+            self._scroll(int(args[0]), args[1])
+
+    def _scroll(self, amount: int, what: str):
+        """Прокрутка на строки или страницы."""
+        step = self.visible_rows if what == "pages" else 3
+        self.top_row += amount * step
+        self._redraw()
+
+    def _redraw(self):
+        """Отрисовка только видимых строк."""
+        colors = self._colors()
+        self.canvas.configure(bg=colors['bg'])
+        self.canvas.delete("all")
+        visible = self.visible_rows
+        self.top_row = max(0, min(self.top_row, len(self.rows) - visible))
+
+        width = max(self.canvas.winfo_width(), sum(column_width for _, _, column_width in COLUMNS))
+        self.canvas.create_rectangle(0, 0, width, ROW_HEIGHT, fill=colors['header'], width=0)
+        x = 4
+        for _, title, column_width in COLUMNS:
+            self.canvas.create_text(x, ROW_HEIGHT // 2, text=title, anchor="w", fill=colors['muted'])
+            x += column_width
+
+        for offset, row in enumerate(self.rows[self.top_row:self.top_row + visible]):
+            y = (offset + 1) * ROW_HEIGHT
+            if (self.top_row + offset) % 2:
+                self.canvas.create_rectangle(0, y, width, y + ROW_HEIGHT, fill=colors['stripe'], width=0)
+            cells = self._row_cells(row)
+            x = 4
+            for key, _, column_width in COLUMNS:
+                text = cells.get(key, "")
+                if key == "name":
+                    indent = row['depth'] * INDENT
+                    self.canvas.create_text(x + indent, y + ROW_HEIGHT // 2, text=text, anchor="w",
+                                            fill=colors['fg'] if row['kind'] == 'value' else colors['muted'],
+                                            width=column_width - indent - 4)
+                else:
+                    self.canvas.create_text(x, y + ROW_HEIGHT // 2, text=text, anchor="w",
+                                            fill=colors['fg'], width=column_width - 4)
+                x += column_width
+
+        total = max(1, len(self.rows))
+        self.scrollbar.set(self.top_row / total, min(1.0, (self.top_row + visible) / total))
+
+    def _row_cells(self, row: Dict) -> Dict[str, str]:
+        """Тексты колонок строки."""
+        data = row['data']
+        if row['kind'] != 'value':
+            return {'name': data['name']}
+        marker = ""
+        if data.get('expandable') and self.expandable:
+            marker = "▾ " if row['expanded'] else "▸ "
+        if data.get('shape') is not None:
+            shape = "×".join(str(dimension) for dimension in data['shape']) or "()"
+        elif data.get('length') is not None:
+            shape = str(data['length'])
+        else:
+            shape = ""
+        return {
+            'name': marker + str(data['name']),
+            'type': data.get('type', ""),
+            'shape': shape,
+            'dtype': data.get('dtype') or "",
+            'size': format_size(data['size']) if data.get('size') is not None else "",
+            'preview': data.get('preview') or "",
+        }
+
+    def is_visible(self) -> bool:
+        """Показана ли панель."""
+        return bool(self.parent.winfo_manager())
+
+    def show(self):
+        """Show панель переменных."""
+        if not self.is_visible():
+            self.parent.pack(side="right", fill="y", padx=(5, 5))
+
+    def hide(self):
+        """Скрыть панель переменных."""
+        self.parent.pack_forget()
+
+    def close(self):
+        """Close панель переменных."""
+        self.hide()
+        if self.on_close:
+            self.on_close()
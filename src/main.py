@@ -1,16 +1,19 @@
 """Entry point for Python Calculator application."""
-import customtkinter as ctk
+import multiprocessing
 import os
 import sys
-from app import PythonCalculatorApp
-
-# Setup CustomTkinter theme
-ctk.set_appearance_mode("dark")
-ctk.set_default_color_theme("blue")
 
 
 def main():
     """Main function to launch the application."""
+    # GUI imports live here: execution kernel processes re-import this module on start
+    import customtkinter as ctk
+    from app import PythonCalculatorApp
+
+    # Setup CustomTkinter theme
+    ctk.set_appearance_mode("dark")
+    ctk.set_default_color_theme("blue")
+
     root = ctk.CTk()
     
     # Set window icon (ICO format)
@@ -48,4 +51,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # Required for execution kernel processes in the PyInstaller build
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1 @@
+"""Command line tools of Pyculator (see utils.batch_runner)."""
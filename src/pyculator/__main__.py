@@ -0,0 +1,14 @@
+"""Entry point of the command line: python -m pyculator run ..."""
+import os
+import sys
+
+# Application modules (utils, components) live next to this package
+_SOURCE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _SOURCE_DIRECTORY not in sys.path:
+    sys.path.insert(0, _SOURCE_DIRECTORY)
+
+from utils.batch_runner import main  # noqa: E402
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Test пакетного запуска скриптов без GUI."""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from utils.batch_runner import collect_scripts, output_names, run_batch
+
+
+SRC_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _write(path: str, text: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_collect_scripts_and_names():
+    """Скрипты собираются из директорий, имена выходных папок не повторяются."""
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, "sub"))
+        for name in ("b.py", "a.py", "notes.txt", os.path.join("sub", "a.py")):
+            _write(os.path.join(directory, name), "")
+        scripts = collect_scripts([directory])
+        assert [os.path.basename(script) for script in scripts] == ["a.py", "b.py"]
+        scripts = collect_scripts([directory, os.path.join(directory, "a.py")], recursive=True)
+        assert len(scripts) == 3
+        assert sorted(output_names(scripts).values()) == ["a", "a_2", "b"]
+
+
+def test_run_batch():
+    """Вывод, графики и сводка записываются для каждого скрипта."""
+    with tempfile.TemporaryDirectory() as directory:
+        _write(os.path.join(directory, "helper.py"), "VALUE = 7\n")
+        _write(os.path.join(directory, "plot.py"),
+               "import helper\nprint(helper.VALUE)\nplt.plot([1, 2])\nplt.show()\n")
+        _write(os.path.join(directory, "fail.py"), "raise ValueError('bad')\n")
+        output = os.path.join(directory, "out")
+
+        summary = run_batch(
+            [os.path.join(directory, "plot.py"), os.path.join(directory, "fail.py")], output, jobs=2
+        )
+        assert summary['counts'] == {'ok': 1, 'error': 1}
+        plot, fail = summary['scripts']
+        assert plot['figures'] == ["figure_1.png"]
+        assert os.path.getsize(os.path.join(output, "plot", "figure_1.png")) > 0
+        with open(os.path.join(output, "plot", "stdout.txt"), encoding="utf-8") as f:
+            assert f.read().strip() == "7"
+        assert fail['exception'] == "bad"
+        with open(os.path.join(output, "summary.json"), encoding="utf-8") as f:
+            assert json.load(f)['counts'] == summary['counts']
+
+
+def test_crash_affects_only_its_script():
+    """Падение процесса одного скрипта не помечает остальные скрипты как упавшие."""
+    with tempfile.TemporaryDirectory() as directory:
+        _write(os.path.join(directory, "crash.py"), "import os\nos._exit(3)\n")
+        for name in ("slow.py", "late.py"):
+            _write(os.path.join(directory, name), "import time\ntime.sleep(1)\nprint('done')\n")
+        scripts = [os.path.join(directory, name) for name in ("slow.py", "crash.py", "late.py")]
+        summary = run_batch(scripts, os.path.join(directory, "out"), jobs=2)
+        print(f"Сводка: {summary['counts']}")
+        assert summary['counts'] == {'ok': 2, 'crashed': 1}
+        assert summary['scripts'][1]['status'] == 'crashed'
+
+
+def test_cli_does_not_import_gui():
+    """Командная строка не загружает customtkinter и tkinter."""
+    code = (
+        "import sys, runpy\n"
+        "sys.argv = ['pyculator', 'run', '--help']\n"
+        "try:\n"
+        "    runpy.run_module('pyculator', run_name='__main__')\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "import utils.batch_runner\n"
+        "utils.batch_runner._init_worker()\n"
+        "print('customtkinter' in sys.modules, 'tkinter' in sys.modules)\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIRECTORY,
+                               capture_output=True, text=True, timeout=120)
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip().splitlines()[-1] == "False False"
+
+
+if __name__ == "__main__":
+    test_collect_scripts_and_names()
+    test_run_batch()
+    test_crash_affects_only_its_script()
+    test_cli_does_not_import_gui()
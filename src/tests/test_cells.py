@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Test выполнения кода по ячейкам `# %%` с кэшированием."""
+from utils.cells import split_cells
+from utils.code_executor import CodeExecutor
+
+
+SCRIPT = """# %% Загрузка
+counter.append(1)
+data = list(range(5))
+print('loaded')
+# %% Обработка
+total = sum(data)
+print(total)
+"""
+
+
+def test_split_cells():
+    """Ключ ячейки зависит от её кода и кода ячеек выше."""
+    cells = split_cells(SCRIPT)
+    print(f"Ячейки: {cells}")
+    assert len(cells) == 2
+    assert cells[1].start_line == 5
+
+    edited = split_cells(SCRIPT.replace("range(5)", "range(6)"))
+    assert edited[0].key != cells[0].key
+    # Ячейка ниже изменённой тоже считается изменённой
+    assert edited[1].key != cells[1].key
+
+    edited = split_cells(SCRIPT.replace("print(total)", "print(total * 2)"))
+    assert edited[0].key == cells[0].key
+    assert edited[1].key != cells[1].key
+
+
+def test_cached_cells_are_replayed():
+    """Неизменённые ячейки не выполняются повторно, но их вывод воспроизводится."""
+    executor = CodeExecutor()
+    counter = []
+    executor.available_modules['counter'] = counter
+
+    result = executor.execute(SCRIPT, use_cells=True)
+    assert result['stdout'] == "loaded\n10\n"
+
+    result = executor.execute(SCRIPT.replace("print(total)", "print(total * 2)"), use_cells=True)
+    print(f"Ячейки: {result['cells']}, stdout: {result['stdout']!r}")
+    assert [cell['cached'] for cell in result['cells']] == [True, False]
+    assert result['stdout'] == "loaded\n20\n"
+    assert counter == [1]
+
+
+def test_failed_cell_is_not_cached():
+    """Ячейка с ошибкой не кэшируется, номер строки соответствует скрипту."""
+    executor = CodeExecutor()
+    code = "# %%\nx = 1\n# %%\nraise ValueError('boom')\n"
+    result = executor.execute(code, use_cells=True)
+    assert result['exception'] == 'boom'
+    assert len(executor.cell_cache) == 1
+
+
+def test_cached_values_are_copied():
+    """Изменение значения на месте в нижней ячейке не попадает в кэш верхней."""
+    executor = CodeExecutor()
+    code = "# %%\narr = np.ones(3)\nalias = arr\n# %%\narr *= 2\nprint(arr.sum())\n"
+    assert executor.execute(code, use_cells=True)['stdout'] == "6.0\n"
+
+    for edit in range(3):
+        result = executor.execute(code + "#" * (edit + 1), use_cells=True)
+        assert [cell['cached'] for cell in result['cells']] == [True, False]
+        assert result['stdout'] == "6.0\n"
+    # Имена одного объекта остаются связаны и в копии
+    assert executor.last_namespace['alias'] is executor.last_namespace['arr']
+
+
+def test_changes_in_place_are_replayed():
+    """Изменение на месте в кэшированной ячейке восстанавливается, если ниже изменён код."""
+    executor = CodeExecutor()
+    code = "# %%\narr = np.ones(3)\n# %%\narr *= 2\n# %%\nprint(arr.sum())\n"
+    assert executor.execute(code, use_cells=True)['stdout'] == "6.0\n"
+    result = executor.execute(code.replace("print(", "print( "), use_cells=True)
+    assert [cell['cached'] for cell in result['cells']] == [True, True, False]
+    assert result['stdout'] == "6.0\n"
+
+    code = "# %%\nd = {}\n# %%\nd['a'] = 1\n# %%\nprint(d)\n"
+    executor.execute(code, use_cells=True)
+    result = executor.execute(code.replace("print(", "print( "), use_cells=True)
+    assert result['stdout'] == "{'a': 1}\n"
+
+
+def test_large_values_are_shared():
+    """Большие массивы восстанавливаются копированием при записи и учитываются в размере кэша."""
+    import numpy as np
+    from utils.cells import CellCache, CellResult
+
+    big = np.arange(1_000_000, dtype=np.float64)
+    entry = CellResult('', '', [], {'big': big, 'np': np}, [])
+    assert entry.changed.nbytes >= big.nbytes
+    restored = entry.changed.restore()
+    assert restored['np'] is np
+    restored['big'][0] = -1
+    # Изменение восстановленного массива не затрагивает снимок
+    assert entry.changed.restore()['big'][0] == 0
+
+    cache = CellCache(max_bytes=int(big.nbytes * 1.5))
+    cache.put('a', entry)
+    cache.put('b', CellResult('', '', [], {'big': big}, []))
+    # Первая запись вытеснена по размеру
+    assert len(cache) == 1 and cache.get('a') is None
+
+
+def test_uncopyable_cell_is_not_cached():
+    """Ячейка, значения которой нельзя скопировать, не кэшируется."""
+    executor = CodeExecutor()
+    code = "# %%\ngen = (i for i in range(3))\n# %%\nx = 1\n"
+    executor.execute(code, use_cells=True)
+    result = executor.execute(code, use_cells=True)
+    assert [cell['cached'] for cell in result['cells']] == [False, True]
+
+
+def test_shown_figures_are_replayed():
+    """Графики, переданные plt.show() в ячейке, воспроизводятся из кэша."""
+    import matplotlib.pyplot as plt
+
+    plt.close('all')
+    executor = CodeExecutor()
+    code = "# %%\nplt.plot([1, 2])\nplt.show()\n# %%\nprint('done')\n"
+    shown = []
+    executor.execute(code, use_cells=True, on_figure=shown.append)
+    assert len(shown) == 1 and not plt.get_fignums()
+
+    result = executor.execute(code.replace("'done'", "'again'"), use_cells=True, on_figure=shown.append)
+    assert [cell['cached'] for cell in result['cells']] == [True, False]
+    # Восстановленный график открыт в pyplot и отправляется после выполнения
+    assert len(executor.get_all_figures()) == 1
+    plt.close('all')
+
+
+if __name__ == "__main__":
+    test_split_cells()
+    test_cached_cells_are_replayed()
+    test_failed_cell_is_not_cached()
+    test_cached_values_are_copied()
+    test_changes_in_place_are_replayed()
+    test_large_values_are_shared()
+    test_uncopyable_cell_is_not_cached()
+    test_shown_figures_are_replayed()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Test запуска вариантов кода от контрольной точки (checkpoint)."""
+import os
+
+import pytest
+
+from test_execution_kernel import _wait_for_result
+from utils.code_executor import CodeExecutor
+from utils.execution_kernel import ExecutionKernel
+
+
+SETUP = """# %% Загрузка
+data = list(range(10))
+print('loaded')
+# %% Анализ
+data.append(len(data))
+print(data[-1])
+"""
+
+
+def test_checkpoint_in_executor():
+    """Контрольная точка хранит пространство имён после ячейки, изменения выше неё её устаревают."""
+    executor = CodeExecutor()
+    result = executor.execute(SETUP, checkpoint_cell=0)
+    assert result['exception'] is None
+    assert result['stdout'] == "loaded\n"
+    assert result['checkpoint'] == {'cell': 0, 'start_line': 1, 'variant': False}
+
+    result = executor.execute(SETUP, from_checkpoint=True)
+    assert result['stdout'] == "10\n"
+
+    result = executor.execute(SETUP.replace("range(10)", "range(5)"), from_checkpoint=True)
+    print(f"Исключение: {result['exception']}")
+    assert "out of date" in result['exception']
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="os.fork is not available")
+def test_fork_runs_do_not_modify_checkpoint():
+    """Каждый вариант видит состояние контрольной точки, а не результат предыдущего варианта."""
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        kernel.create_checkpoint(SETUP, 0)
+        _wait_for_result(kernel)
+        assert kernel.checkpoint_cell == 0
+
+        for _ in range(2):
+            kernel.submit(SETUP, fork=True)
+            events = _wait_for_result(kernel)
+            result = [e for e in events if e['type'] == 'result'][0]['result']
+            print(f"stdout варианта: {result['stdout']!r}")
+            assert result['stdout'] == "10\n"
+
+        # Падение варианта не затрагивает контрольную точку
+        crash = SETUP.split("# %% Анализ")[0] + "# %% Падение\nimport os\nos._exit(5)\n"
+        kernel.submit(crash, fork=True)
+        events = _wait_for_result(kernel)
+        result = [e for e in events if e['type'] == 'result'][0]['result']
+        print(f"Исключение: {result['exception']}")
+        assert "exit code 5" in result['exception']
+
+        kernel.submit(SETUP, fork=True)
+        events = _wait_for_result(kernel)
+        result = [e for e in events if e['type'] == 'result'][0]['result']
+        assert result['stdout'] == "10\n"
+    finally:
+        kernel.shutdown()
+
+
+if __name__ == "__main__":
+    test_checkpoint_in_executor()
+    test_fork_runs_do_not_modify_checkpoint()
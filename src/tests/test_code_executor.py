@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Test выполнения кода через CodeExecutor."""
+from utils.code_executor import CodeExecutor
+
+
+def test_fresh_namespace():
+    """Без сессии переменные не сохраняются между запусками."""
+    executor = CodeExecutor()
+    executor.execute("x = 42")
+    result = executor.execute("print(x)")
+    print(f"Исключение: {result['exception']}")
+    assert result['exception'] is not None
+
+
+def test_persistent_session():
+    """В постоянной сессии переменные доступны в следующих запусках."""
+    executor = CodeExecutor()
+    executor.execute("data = [1, 2, 3]\ndef total():\n    return sum(data)", persistent=True)
+    result = executor.execute("print(total())", persistent=True)
+    print(f"stdout: {result['stdout']!r}")
+    assert result['stdout'] == "6\n"
+
+    executor.reset_session()
+    result = executor.execute("print(data)", persistent=True)
+    assert result['exception'] is not None
+
+
+def test_top_level_await():
+    """await на верхнем уровне выполняется в цикле событий исполнителя, цикл живет вместе с сессией."""
+    executor = CodeExecutor()
+    code = (
+        "import asyncio\n"
+        "async def fetch(name, delay):\n"
+        "    await asyncio.sleep(delay)\n"
+        "    print(name)\n"
+        "    return name\n"
+        "results = await asyncio.gather(fetch('slow', 0.2), fetch('fast', 0.01))\n"
+        "loop = asyncio.get_running_loop()\n"
+    )
+    result = executor.execute(code, persistent=True)
+    print(f"stdout: {result['stdout']!r}")
+    assert result['exception'] is None
+    # Вывод в порядке завершения задач
+    assert result['stdout'] == "fast\nslow\n"
+
+    result = executor.execute("print(results, asyncio.get_running_loop() is loop)\nawait asyncio.sleep(0)",
+                              persistent=True)
+    assert result['stdout'] == "['slow', 'fast'] True\n"
+
+    # Ячейки и код без await
+    result = executor.execute("# %%\nimport asyncio\nx = await asyncio.sleep(0, 5)\n# %%\nprint(x)", use_cells=True)
+    assert result['stdout'] == "5\n"
+    result = executor.execute("import asyncio\nawait asyncio.sleep(0)\nraise ValueError('async failure')")
+    assert result['exception_type'] == "ValueError"
+    executor.reset_session()
+    assert executor.event_loop is None
+
+
+def test_show_hands_over_figures():
+    """plt.show() передает графики сразу и закрывает их, непоказанные остаются открытыми."""
+    import matplotlib
+    import matplotlib.pyplot as plt
+    from utils.mpl_backend import BACKEND
+
+    plt.close('all')
+    executor = CodeExecutor()
+    shown = []
+    code = "plt.plot([1])\nplt.show()\nplt.plot([2])\nplt.title('second')\nplt.show()\nplt.figure()\nplt.plot([3])"
+    result = executor.execute(code, on_figure=lambda figure: shown.append(figure.axes[0].get_title()))
+    print(f"Показаны: {shown}, ошибки: {result['stderr']!r}")
+    assert matplotlib.get_backend() == BACKEND
+    assert shown == ['', 'second']
+    assert len(executor.get_all_figures()) == 1
+    plt.close('all')
+
+    # Без получателя show() ничего не делает, графики собираются после выполнения
+    result = executor.execute(code)
+    assert len(executor.get_all_figures()) == 2
+    plt.close('all')
+
+
+if __name__ == "__main__":
+    test_fresh_namespace()
+    test_persistent_session()
+    test_top_level_await()
+    test_show_hands_over_figures()
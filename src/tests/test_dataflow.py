@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Test реактивного выполнения по зависимостям между инструкциями."""
+from utils.code_executor import CodeExecutor
+from utils.dataflow import analyze
+
+
+SCRIPT = """load_calls.append(1)
+data = list(range(10))
+scale = 2
+scaled = [x * scale for x in data]
+def describe(values):
+    return f"n={len(values)}, max={max(values)}"
+print(describe(scaled))
+"""
+
+
+def test_dependency_graph():
+    """Инструкция зависит от последней инструкции, определяющей используемое имя."""
+    statements = analyze(SCRIPT)
+    print(f"Инструкции: {statements}")
+    assert statements[3].depends_on == {1, 2}
+    assert statements[5].depends_on == {3, 4}
+    # Имена внутри comprehension и функции не являются глобальными определениями
+    assert statements[3].defines == {"scaled"}
+    assert statements[4].defines == {"describe"}
+
+
+def test_only_dependents_are_executed():
+    """После изменения константы выполняются только она и зависящие от неё инструкции."""
+    executor = CodeExecutor()
+    load_calls = []
+    executor.available_modules['load_calls'] = load_calls
+
+    result = executor.execute(SCRIPT, reactive=True)
+    assert result['stdout'] == "n=10, max=18\n"
+    assert result['reactive'] == {'executed': 6, 'total': 6}
+
+    result = executor.execute(SCRIPT.replace("scale = 2", "scale = 3"), reactive=True)
+    print(f"Результат: {result['reactive']}, stdout: {result['stdout']!r}")
+    assert result['reactive']['executed'] == 3
+    assert result['stdout'] == "n=10, max=27\n"
+    assert load_calls == [1]
+
+
+def test_redefinition_and_removal():
+    """Переопределённые ниже имена сохраняют порядок, удалённые имена убираются."""
+    executor = CodeExecutor()
+    executor.execute("x = 1\nx = 10\ny = 5\nprint(x)", reactive=True)
+    result = executor.execute("x = 2\nx = 10\ny = 5\nprint(x)", reactive=True)
+    assert result['stdout'] == "10\n"
+
+    result = executor.execute("x = 2\nx = 10\nprint(y)", reactive=True)
+    print(f"Исключение: {result['exception']}")
+    assert result['exception'] is not None
+
+
+def test_deleted_rebinding():
+    """После удаления переопределения имя снова получает значение из оставшегося определения."""
+    executor = CodeExecutor()
+    executor.execute("x = 1\nx = 5\ny = x\nprint(y)", reactive=True)
+    result = executor.execute("x = 1\ny = x\nprint(y)", reactive=True)
+    print(f"Результат: {result['reactive']}, stdout: {result['stdout']!r}")
+    assert result['stdout'] == "1\n"
+    assert executor.session_namespace['x'] == 1
+
+    # Изменённая инструкция между определениями видит значение из первого из них
+    executor.execute("x = 1\ny = x\nx = 5\nprint(x, y)", reactive=True)
+    result = executor.execute("x = 1\ny = x + 1\nx = 5\nprint(x, y)", reactive=True)
+    assert result['stdout'] == "5 2\n"
+    assert executor.session_namespace['x'] == 5
+
+
+def test_reordered_statements():
+    """Использование имени выше его определения падает, как при обычном запуске."""
+    executor = CodeExecutor()
+    executor.execute("b = 2\nprint(b)", reactive=True)
+    result = executor.execute("print(b)\nb = 2", reactive=True)
+    print(f"Исключение: {result['exception']}")
+    assert result['exception_type'] == 'NameError'
+    assert result['stdout'] == ""
+
+    # Без изменений ошибка повторяется, а не воспроизводится старый вывод
+    result = executor.execute("print(b)\nb = 2", reactive=True)
+    assert result['exception_type'] == 'NameError'
+    result = executor.execute("b = 2\nprint(b)", reactive=True)
+    assert result['exception'] is None and result['stdout'] == "2\n"
+
+
+def test_method_calls_redefine_names():
+    """Вызов метода объекта изменяет его: график, построенный несколькими инструкциями, перестраивается целиком."""
+    import matplotlib.pyplot as plt
+
+    code = "T = 'a'\nfig, ax = plt.subplots()\nax.plot([1, 2, 3])\nax.set_title(T)\nx = np.zeros(3)\n"
+    statements = analyze(code)
+    assert statements[2].defines == {"ax"} and statements[3].depends_on == {0, 2}
+    # Вызовы функций модулей не считаются определениями
+    assert statements[4].defines == {"x"}
+
+    plt.close('all')
+    executor = CodeExecutor()
+    executor.execute(code, reactive=True)
+    plt.close('all')
+    result = executor.execute(code.replace("'a'", "'b'"), reactive=True)
+    assert result['reactive']['executed'] == 4
+    figures = executor.get_all_figures()
+    assert len(figures) == 1
+    axes = figures[0].axes[0]
+    assert len(axes.lines) == 1 and axes.get_title() == 'b'
+
+    # Воспроизведённая инструкция показывает график в итоговом виде
+    plt.close('all')
+    result = executor.execute(code.replace("'a'", "'b'").replace("zeros", "ones"), reactive=True)
+    assert result['reactive']['executed'] == 1
+    axes = executor.get_all_figures()[0].axes[0]
+    assert len(axes.lines) == 1 and axes.get_title() == 'b'
+    plt.close('all')
+
+
+if __name__ == "__main__":
+    test_dependency_graph()
+    test_only_dependents_are_executed()
+    test_redefinition_and_removal()
+    test_deleted_rebinding()
+    test_reordered_statements()
+    test_method_calls_redefine_names()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Test выполнения кода в отдельном процессе (execution kernel)."""
+import io
+import time
+from multiprocessing import shared_memory
+from utils.execution_kernel import ExecutionKernel
+
+
+def _wait_for_result(kernel, timeout=60.0):
+    """Ожидание результата выполнения, возвращает все полученные события."""
+    events = []
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        events.extend(kernel.poll())
+        if any(event['type'] == 'result' for event in events):
+            return events
+        time.sleep(0.05)
+    raise TimeoutError("Kernel did not return result")
+
+
+def test_execution_kernel():
+    """Тестирование выполнения кода и передачи графиков из процесса ядра."""
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        print("Запуск кода в ядре...")
+        kernel.submit("print('hello from kernel')\nplt.plot([1, 2, 3])")
+        events = _wait_for_result(kernel)
+
+        result = [e for e in events if e['type'] == 'result'][0]['result']
+        figures = [e for e in events if e['type'] == 'figure']
+        print(f"stdout: {result['stdout']!r}, графиков: {len(figures)}")
+        assert result['stdout'] == "hello from kernel\n"
+        assert result['exception'] is None
+        assert len(figures) == 1
+        assert not kernel.is_busy
+
+        print("Падение процесса ядра...")
+        kernel.submit("import os\nos._exit(3)")
+        events = _wait_for_result(kernel)
+        result = [e for e in events if e['type'] == 'result'][0]['result']
+        print(f"Исключение: {result['exception']}")
+        assert "died" in result['exception']
+        assert kernel.is_alive()
+    finally:
+        kernel.shutdown()
+
+
+def test_figure_data_in_shared_memory():
+    """Данные большого графика передаются через shared memory и удаляются при перезапуске ядра."""
+    # pyplot импортируется только здесь: при сборе тестов backend выбирает utils.code_executor
+    from utils.figure_transport import RenderedFigure
+
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        kernel.submit("x = np.linspace(0, 1, 2_000_000)\nplt.plot(x, np.sin(x))\nplt.imshow(np.random.rand(500, 500))")
+        events = _wait_for_result(kernel)
+        payload = [e for e in events if e['type'] == 'figure'][0]['figure']
+        names = [buffer['shm'] for buffer in payload['buffers']]
+        print(f"Размер pickle: {len(payload['pickle'])} байт, блоков: {len(names)}")
+        assert len(payload['pickle']) < 1024 * 1024
+        assert names
+
+        # Ядро присылает готовое изображение
+        rendered = RenderedFigure(payload)
+        assert rendered.png.startswith(b"\x89PNG")
+        assert (rendered.width, rendered.height) == (640, 480)
+
+        # Убитое ядро не удаляет свои блоки - это делает клиент
+        kernel.restart()
+        for name in names:
+            try:
+                shared_memory.SharedMemory(name=name).close()
+                raise AssertionError(f"Блок {name} не удален")
+            except FileNotFoundError:
+                pass
+        # Отображенные при получении данные остаются доступны для интерактивного режима
+        figure = rendered.figure()
+        assert len(figure.axes[0].lines[0].get_xdata()) == 2_000_000
+        figure.savefig(io.BytesIO(), format='png')
+    finally:
+        kernel.shutdown()
+
+
+def test_figures_sent_on_show():
+    """График приходит в GUI при plt.show(), до окончания выполнения."""
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        kernel.submit("import time\nplt.plot([1, 2])\nplt.show()\ntime.sleep(3)\nplt.plot([3])")
+        deadline = time.time() + 60
+        events = []
+        while time.time() < deadline and not any(event['type'] == 'figure' for event in events):
+            events.extend(kernel.poll())
+            time.sleep(0.05)
+        assert any(event['type'] == 'figure' for event in events)
+        assert kernel.is_busy
+
+        events.extend(_wait_for_result(kernel))
+        result = [e for e in events if e['type'] == 'result'][0]['result']
+        # Второй график не показан явно и отправлен после выполнения
+        assert result['figure_count'] == 2
+        assert len([e for e in events if e['type'] == 'figure']) == 2
+    finally:
+        kernel.shutdown()
+
+
+if __name__ == "__main__":
+    test_execution_kernel()
+    test_figure_data_in_shared_memory()
+    test_figures_sent_on_show()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test остановки выполнения: прерывание, тайм-аут и принудительное завершение ядра."""
+from test_execution_kernel import _wait_for_result
+from utils import execution_kernel
+from utils.execution_kernel import ExecutionKernel
+
+
+def _result(events):
+    return [e for e in events if e['type'] == 'result'][0]['result']
+
+
+def test_interrupt_keeps_partial_output():
+    """KeyboardInterrupt останавливает код, вывод и графики до остановки сохраняются."""
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        kernel.submit("import time\nprint('started', flush=True)\nplt.plot([1, 2])\ntime.sleep(60)")
+        events = []
+        while not any(e['type'] == 'stream' for e in events):
+            events.extend(kernel.poll())
+        kernel.interrupt()
+        events = _wait_for_result(kernel, timeout=10)
+
+        result = _result(events)
+        print(f"Результат: {result['exception']!r}, stdout: {result['stdout']!r}")
+        assert result['interrupted']
+        assert result['stdout'] == "started\n"
+        assert len([e for e in events if e['type'] == 'figure']) == 1
+    finally:
+        kernel.shutdown()
+
+
+def test_timeout_escalates_to_restart(monkeypatch):
+    """Код, игнорирующий прерывание, завершается вместе с ядром после тайм-аута."""
+    monkeypatch.setattr(execution_kernel, 'INTERRUPT_GRACE_PERIOD', 0.5)
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        old_pid = kernel.pid
+        kernel.submit("import time\nprint('looping', flush=True)\n"
+                      "while True:\n    try:\n        time.sleep(1)\n    except KeyboardInterrupt:\n        pass",
+                      timeout=0.5)
+        result = _result(_wait_for_result(kernel, timeout=10))
+        print(f"Исключение: {result['exception']}")
+        assert "timed out" in result['exception']
+        assert result['stdout'] == "looping\n"
+        assert kernel.is_alive() and kernel.pid != old_pid
+    finally:
+        kernel.shutdown()
+
+
+def test_repeated_interrupt_still_reports_result(monkeypatch):
+    """Повторный запрос остановки после остановки кода не оставляет запуск без результата."""
+    monkeypatch.setattr(execution_kernel, 'INTERRUPT_RETRY_INTERVAL', 0.2)
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        old_pid = kernel.pid
+        # Описание переменных после остановки идет долго, повтор прерывания приходит во время него
+        kernel.submit("import time\nclass Slow:\n    @property\n    def shape(self):\n"
+                      "        time.sleep(2)\n\nslow = Slow()\nprint('started', flush=True)\ntime.sleep(60)")
+        events = []
+        while not any(e['type'] == 'stream' for e in events):
+            events.extend(kernel.poll())
+        kernel.interrupt()
+        result = _result(_wait_for_result(kernel, timeout=10))
+        print(f"Результат: {result['exception']!r}, stdout: {result['stdout']!r}")
+        assert result['interrupted']
+        assert result['stdout'] == "started\n"
+        assert kernel.pid == old_pid
+
+        # Ядро продолжает работать
+        kernel.submit("print('next')")
+        assert _result(_wait_for_result(kernel, timeout=10))['stdout'] == "next\n"
+    finally:
+        kernel.shutdown()
+
+
+if __name__ == "__main__":
+    test_interrupt_keeps_partial_output()
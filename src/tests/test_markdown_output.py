@@ -3,6 +3,7 @@
 
 import customtkinter as ctk
 from components.output_markdown import MarkdownOutputDisplay
+from utils.output_stream import OUTPUT_HEAD_CHARS, STREAM_TAIL_CHARS, omission_marker
 
 def test_markdown_output():
     """Тестирование MarkdownOutputDisplay."""
@@ -87,5 +88,29 @@ Code выполнен успешно!
     # Запускаем главный цикл
     root.mainloop()
 
+def test_streamed_output_tail():
+    """Длинный поток показывает начало и скользящий конец, ссылки маркеров ведут к своим потокам."""
+    root = ctk.CTk()
+    try:
+        output_display = MarkdownOutputDisplay(root)
+        line = "x" * 99 + "\n"
+        for number in range(4000):
+            output_display.append_stdout(f"{number:05d}" + line)
+        text = output_display.textbox.get("1.0", "end-1c")
+        assert text.startswith("00000") and "03999" + line in text
+        assert len(text) < OUTPUT_HEAD_CHARS + STREAM_TAIL_CHARS + 200
+
+        # Одинаковые числа пропущенных строк в stdout и stderr
+        output_display.display_result(stdout="a" + omission_marker("stdout", 5),
+                                      stderr="b" + omission_marker("stderr", 5))
+        for name in ("stdout", "stderr"):
+            output_display.link_text(omission_marker(name, 5).strip(), lambda: None)
+        start, end = output_display.textbox.tag_ranges("link_2")
+        assert "stderr" in output_display.textbox.get(start, end)
+    finally:
+        root.destroy()
+
+
 if __name__ == "__main__":
+    test_streamed_output_tail()
     test_markdown_output()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Test записи локальных импортов и перезагрузки измененных модулей рабочей директории."""
+import os
+import sys
+import tempfile
+
+from utils.code_executor import CodeExecutor
+from utils.import_tracker import LocalImportTracker, source_hash
+from utils.module_reloader import ModuleReloader, parse_imports
+
+
+def _write(path: str, text: str) -> None:
+    """Запись файла с гарантированно новым временем изменения."""
+    stat = os.stat(path) if os.path.exists(path) else None
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    if stat is not None:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def _drop_modules(names):
+    for name in names:
+        sys.modules.pop(name, None)
+
+
+def test_parse_imports():
+    """Импорты собираются из исходника, относительные разрешаются от пакета."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "mod.py")
+        _write(path, "import a.b\nfrom c import d\nfrom . import e\nfrom ..f import g\n")
+        names = parse_imports(path, "pkg.sub.mod")
+        assert {"a", "a.b", "c", "c.d", "pkg.sub", "pkg.sub.e", "pkg", "pkg.f", "pkg.f.g"} <= names
+
+
+def test_reload_changed_and_dependents():
+    """Перезагружаются только измененный модуль и зависящие от него, зависимости первыми."""
+    names = ["rl_base", "rl_middle", "rl_top", "rl_other"]
+    with tempfile.TemporaryDirectory() as directory:
+        _write(os.path.join(directory, "rl_base.py"), "VALUE = 1\n")
+        _write(os.path.join(directory, "rl_middle.py"), "from rl_base import VALUE\nDOUBLE = VALUE * 2\n")
+        _write(os.path.join(directory, "rl_top.py"), "import rl_middle\nRESULT = rl_middle.DOUBLE + 1\n")
+        _write(os.path.join(directory, "rl_other.py"), "X = 0\n")
+        executor = CodeExecutor()
+        try:
+            code = "import rl_top, rl_other\nprint(rl_top.RESULT)"
+            result = executor.execute(code, working_directory=directory)
+            assert result['stdout'].strip() == "3"
+            reloader = executor.module_reloader
+            assert set(names) <= set(reloader.modules)
+            assert reloader.dependencies("rl_top") == {"rl_middle"}
+
+            # Ничего не менялось - ничего не перезагружается
+            assert reloader.reload_changed(directory) == []
+
+            _write(os.path.join(directory, "rl_base.py"), "VALUE = 10\n")
+            assert reloader.reload_order(reloader.changed_modules(directory)) == ["rl_base", "rl_middle", "rl_top"]
+            result = executor.execute(code, working_directory=directory)
+            assert result['stdout'].strip() == "21"
+        finally:
+            _drop_modules(names)
+
+
+def test_deleted_module_forgotten():
+    """Удаленный файл модуля убирается из индекса."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "rl_gone.py")
+        _write(path, "A = 1\n")
+        sys.path.insert(0, directory)
+        try:
+            import rl_gone  # noqa: F401
+            reloader = ModuleReloader()
+            reloader.add_module("rl_gone", os.path.abspath(path))
+            os.remove(path)
+            assert reloader.reload_changed(directory) == []
+            assert "rl_gone" not in reloader.modules
+        finally:
+            sys.path.remove(directory)
+            _drop_modules(["rl_gone"])
+
+
+def test_import_tracker_and_unchanged_content():
+    """Импорты из рабочей директории записываются; файл с тем же содержимым не перезагружается."""
+    names = ["it_helper", "it_unused"]
+    with tempfile.TemporaryDirectory() as directory:
+        _write(os.path.join(directory, "it_helper.py"), "import json\nVALUE = 5\n")
+        _write(os.path.join(directory, "it_unused.py"), "X = 1\n")
+        sys.path.insert(0, directory)
+        try:
+            with LocalImportTracker(directory) as tracker:
+                import it_helper  # noqa: F401
+            assert tracker not in sys.meta_path
+            records = tracker.records()
+            assert [record['name'] for record in records] == ["it_helper"]
+            assert records[0]['hash'] == source_hash(os.path.join(directory, "it_helper.py"))
+        finally:
+            sys.path.remove(directory)
+            _drop_modules(names)
+
+        executor = CodeExecutor()
+        try:
+            result = executor.execute("import it_helper\nprint(it_helper.VALUE)", working_directory=directory)
+            assert result['stdout'].strip() == "5"
+            assert [module['name'] for module in result['local_modules']] == ["it_helper"]
+
+            # Только новое время изменения: перезагрузка не нужна
+            _write(os.path.join(directory, "it_helper.py"), "import json\nVALUE = 5\n")
+            assert executor.module_reloader.changed_modules(directory) == []
+        finally:
+            _drop_modules(names)
+
+
+if __name__ == "__main__":
+    test_parse_imports()
+    test_reload_changed_and_dependents()
+    test_deleted_module_forgotten()
+    test_import_tracker_and_unchanged_content()
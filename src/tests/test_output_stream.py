@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Test потокового вывода при выполнении кода."""
+import os
+import tempfile
+import time
+from utils.code_executor import CodeExecutor
+from utils.output_stream import LogPager, OutputCapture, omission_marker, remove_spill_files
+
+
+def test_chunks_are_coalesced():
+    """Много print подряд должны приходить небольшим числом фрагментов."""
+    chunks = []
+    executor = CodeExecutor()
+    result = executor.execute(
+        "for i in range(1000):\n    print(i)",
+        on_output=lambda name, text: chunks.append((name, text))
+    )
+
+    streamed = "".join(text for name, text in chunks if name == "stdout")
+    print(f"Фрагментов: {len(chunks)}")
+    assert streamed == result['stdout']
+    assert len(chunks) < 100
+
+
+def test_output_arrives_before_end():
+    """Вывод перед долгим вычислением должен прийти до окончания выполнения."""
+    received = []
+    capture = OutputCapture(on_output=lambda name, text: received.append((time.monotonic(), text)))
+    with capture:
+        capture.stdout.write("started\n")
+        started = time.monotonic()
+        time.sleep(0.5)
+        finished = time.monotonic()
+
+    print(f"Получено: {received}")
+    assert received[0][1] == "started\n"
+    assert received[0][0] - started < finished - started
+
+
+def test_stderr_order():
+    """Порядок фрагментов stdout и stderr сохраняется."""
+    chunks = []
+    capture = OutputCapture(on_output=lambda name, text: chunks.append((name, text)), flush_interval=10)
+    with capture:
+        capture.stdout.write("a")
+        capture.stderr.write("b")
+        capture.stdout.write("c")
+
+    assert chunks == [("stdout", "a"), ("stderr", "b"), ("stdout", "c")]
+    assert capture.getvalue("stdout") == "ac"
+
+
+def test_long_output_spilled():
+    """Длинный вывод: в памяти начало и конец, полный текст в файле, поток - начало и скользящий конец."""
+    chunks = []
+    capture = OutputCapture(on_output=lambda name, text: chunks.append(text), head_limit=100, tail_limit=100,
+                            stream_tail_limit=50)
+    lines = [f"line {i}\n" for i in range(1000)]
+    with capture:
+        position = 0
+        for number, line in enumerate(lines):
+            if number == 990:
+                position = capture.position("stdout")
+            capture.stdout.write(line)
+
+    text = capture.getvalue("stdout")
+    spill = capture.spill_info()["stdout"]
+    try:
+        assert text.startswith("line 0\n") and text.endswith("line 999\n")
+        assert omission_marker("stdout", spill['omitted_lines']) in text
+        assert len(text) < 300
+        assert capture.getvalue("stdout", position) == "".join(lines[990:])
+        # После начала потока отправляется только его скользящий конец
+        streamed = "".join(chunks)
+        assert streamed.startswith("line 0\n") and streamed.endswith("line 999\n")
+        assert len(streamed) <= 100 + 50 * len(chunks)
+        with open(spill['path'], encoding='utf-8') as f:
+            assert f.read() == "".join(lines)
+        assert "stderr" not in capture.spill_info()
+    finally:
+        remove_spill_files(capture.spill_info())
+    assert not os.path.exists(spill['path'])
+
+
+def test_log_pager():
+    """Страницы файла читаются по отдельности и вместе дают весь текст."""
+    text = "".join(f"строка {i}\n" for i in range(5000)) + "x" * 3000 + "é" * 2000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "log.txt")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            f.write(text)
+        pager = LogPager(path, page_bytes=1000)
+        pages = [pager.read_page(page) for page in range(pager.page_count)]
+        assert "".join(pages) == text
+        assert all(page.endswith("\n") for page in pages[:50])
+
+
+def test_executor_result_spill():
+    """Результат выполнения ссылается на файл с полным выводом."""
+    result = CodeExecutor().execute("for i in range(200_000):\n    print('value', i)")
+    spill = result['output_spill']['stdout']
+    try:
+        assert spill['omitted_lines'] > 0
+        assert result['stdout'].endswith("value 199999\n")
+        assert os.path.getsize(spill['path']) == spill['size']
+    finally:
+        remove_spill_files(result['output_spill'])
+
+
+if __name__ == "__main__":
+    test_chunks_are_coalesced()
+    test_output_arrives_before_end()
+    test_stderr_order()
+    test_long_output_spilled()
+    test_log_pager()
+    test_executor_result_spill()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Test профилирования кода: cProfile, профилировщик строк и tracemalloc."""
+import os
+import pstats
+import tempfile
+import tracemalloc
+
+from utils.code_executor import CodeExecutor
+from utils.profiling import format_profile, save_profile
+
+
+CODE = """def slow(n):
+    return sum(i * i for i in range(n))
+
+for _ in range(3):
+    slow(10000)
+"""
+
+
+def test_cpu_profile():
+    """Профиль содержит функции скрипта и сохраняется в формате .prof."""
+    executor = CodeExecutor()
+    result = executor.execute(CODE, profile="cpu")
+    assert result['exception'] is None
+
+    profile = result['profile']
+    table = format_profile(profile)
+    print(table)
+    slow = [row for row in profile['rows'] if row['function'] == "<script>:1(slow)"]
+    assert slow and slow[0]['calls'] == 3
+    assert profile['rows'][0]['cumulative_time'] >= slow[0]['cumulative_time']
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run.prof")
+        save_profile(profile, path)
+        stats = pstats.Stats(path)
+        assert any(name == "slow" for (_, _, name) in stats.stats)
+
+
+def test_profile_kept_on_exception():
+    """Профиль собирается и при ошибке в коде."""
+    executor = CodeExecutor()
+    result = executor.execute("x = 1\nraise ValueError('boom')", profile="cpu")
+    assert result['exception'] == 'boom'
+    assert result['profile']['function_count'] > 0
+
+
+def test_line_profile():
+    """Профиль строк считает попадания и время каждой строки скрипта."""
+    executor = CodeExecutor()
+    code = "import time\nfor _ in range(3):\n    time.sleep(0.02)\ntotal = 1\n"
+    result = executor.execute(code, profile="lines")
+    assert result['exception'] is None
+
+    profile = result['profile']
+    print(format_profile(profile))
+    lines = {line: (hits, line_time) for line, hits, line_time in profile['lines']}
+    assert lines[3][0] == 3
+    assert lines[4][0] == 1
+    # Время сна приходится на строку 3
+    assert lines[3][1] >= 0.05
+    assert max(lines, key=lambda line: lines[line][1]) == 3
+
+
+def test_line_profile_functions():
+    """Строки внутри функций скрипта тоже профилируются."""
+    executor = CodeExecutor()
+    result = executor.execute(CODE, profile="lines")
+    lines = {line: hits for line, hits, _ in result['profile']['lines']}
+    assert lines[5] == 3
+    # Строка 2 выполняется и внутри генератора
+    assert lines[2] >= 3
+
+
+def test_line_profile_ignores_generated_code():
+    """Код, созданный namedtuple и exec(), не засчитывается строкам скрипта."""
+    executor = CodeExecutor()
+    code = "# комментарий\nfrom collections import namedtuple\nPoint = namedtuple('Point', 'x y')\n" \
+           "points = [Point(i, i) for i in range(100)]\nexec('value = 1')\n"
+    result = executor.execute(code, profile="lines")
+    assert result['exception'] is None
+    lines = {line: hits for line, hits, _ in result['profile']['lines']}
+    assert 1 not in lines
+    assert 4 in lines and 5 in lines
+
+
+def test_memory_profile():
+    """Профиль памяти показывает строку, создавшую большой массив, и пиковую память."""
+    executor = CodeExecutor()
+    code = "small = [0] * 10\nbig = np.ones(2_000_000)\ntmp = np.ones(4_000_000)\ndel tmp\n"
+    result = executor.execute(code, profile="memory")
+    assert result['exception'] is None
+    assert not tracemalloc.is_tracing()
+
+    profile = result['profile']
+    print(format_profile(profile))
+    assert profile['rows'][0]['location'] == "<script>:2"
+    assert profile['rows'][0]['size'] >= 16_000_000
+    # Временный массив освобожден, но попал в пик
+    assert profile['peak'] >= 48_000_000
+    assert profile['diff'] is None
+
+
+def test_memory_profile_session_diff():
+    """В постоянной сессии профиль сравнивается с предыдущим запуском."""
+    executor = CodeExecutor()
+    try:
+        first = executor.execute("data = np.ones(1_000_000)", persistent=True, profile="memory")
+        assert first['profile']['diff'] is None
+
+        second = executor.execute("del data\ndata2 = np.ones(2_000_000)", persistent=True, profile="memory")
+        print(format_profile(second['profile']))
+        diff = {row['location']: row['size_diff'] for row in second['profile']['diff']}
+        # Массив первого запуска освобожден, второй создан строкой 2
+        assert diff["<script>:1"] < -7_000_000
+        assert diff["<script>:2"] >= 16_000_000
+    finally:
+        executor.reset_session()
+    assert not tracemalloc.is_tracing()
+
+
+if __name__ == "__main__":
+    test_cpu_profile()
+    test_profile_kept_on_exception()
+    test_line_profile()
+    test_line_profile_functions()
+    test_line_profile_ignores_generated_code()
+    test_memory_profile()
+    test_memory_profile_session_diff()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test ограничений памяти и времени CPU для запуска кода в ядре."""
+import sys
+import threading
+
+import pytest
+
+from test_execution_kernel import _wait_for_result
+from utils.execution_kernel import ExecutionKernel
+from utils.resource_limits import ResourceGuard, _clear_in_thread, _raise_in_thread
+
+MEGABYTE = 1024 * 1024
+
+
+def _run(kernel, code, **kwargs):
+    kernel.submit(code, **kwargs)
+    events = _wait_for_result(kernel, timeout=30)
+    return [e for e in events if e['type'] == 'result'][0]['result']
+
+
+def _vm_size_mb(pid):
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmSize:"):
+                return int(line.split()[1]) // 1024
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+def test_resource_limits():
+    """Превышение лимитов останавливает код с понятным сообщением, ядро продолжает работу."""
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        result = _run(kernel, "x = sum(range(10 ** 6))")
+        print(f"peak_rss: {result['peak_rss']}, cpu_time: {result['cpu_time']:.3f}")
+        assert result['peak_rss'] > 0
+        assert result['cpu_time'] >= 0
+        assert result['limit_exceeded'] is None
+
+        allocate = "data = b'x' * (400 * 1024 * 1024)\nfor i in range(100):\n    time.sleep(0.05)"
+        limit = _vm_size_mb(kernel.pid) + 200
+        result = _run(kernel, "import time\n" + allocate, limits={'memory_mb': limit})
+        print(f"Адресное пространство: {result['exception']}")
+        assert result['limit_exceeded'] == 'memory'
+        assert "Memory limit exceeded" in result['limit_message']
+
+        limit = kernel.last_rss // MEGABYTE + 200
+        result = _run(kernel, "import time\n" + allocate, limits={'rss_mb': limit})
+        print(f"RSS: {result['exception']}")
+        assert result['limit_exceeded'] == 'rss'
+
+        result = _run(kernel, "while True:\n    pass", limits={'cpu_seconds': 1})
+        print(f"CPU: {result['exception']} за {result['cpu_time']:.1f} с")
+        assert result['limit_exceeded'] == 'cpu'
+
+        # Лимиты действуют только на свой запуск
+        result = _run(kernel, "data = b'x' * (400 * 1024 * 1024)")
+        assert result['exception'] is None
+    finally:
+        kernel.shutdown()
+
+
+def test_watchdog_exception_after_block():
+    """Превышение лимита после окончания блока не поднимает исключение вне пользовательского кода."""
+    guard = ResourceGuard(rss_mb=1 << 20)
+    with guard:
+        pass
+    # Сторожевой поток, опоздавший к концу блока, ничего не поднимает
+    guard._stop_block('rss', MemoryError)
+    assert guard.exceeded is None
+
+    # Запланированное, но еще не поднятое исключение отменяется
+    release = threading.Event()
+    errors = []
+
+    def wait():
+        try:
+            release.wait()
+            sum(range(1000))
+        except MemoryError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    _raise_in_thread(thread.ident, MemoryError)
+    _clear_in_thread(thread.ident)
+    release.set()
+    thread.join()
+    assert errors == []
+
+
+if __name__ == "__main__":
+    test_resource_limits()
+    test_watchdog_exception_after_block()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Test очереди запусков кода (debounce и замена устаревших запусков)."""
+from utils.run_scheduler import CANCEL_RUNNING, DUPLICATE, QUEUED, REPLACED, RunScheduler
+
+
+class FakeClock:
+    """Управляемые вручную часы."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_idle_run_starts_immediately():
+    """Запуск без очереди стартует сразу, повтор того же кода отбрасывается."""
+    clock = FakeClock()
+    scheduler = RunScheduler(debounce=0.5, clock=clock)
+    assert scheduler.submit("a.py", "x = 1", persistent=False) == QUEUED
+    request = scheduler.take()
+    assert request.code == "x = 1" and request.options == {'persistent': False}
+    assert scheduler.running is request
+
+    # F5 и кнопка на панели одновременно: второй запрос повторяет выполняемый код
+    assert scheduler.submit("a.py", "x = 1", persistent=False) == DUPLICATE
+    assert scheduler.pending_count == 0
+    # Тот же код с другими параметрами - другой запуск
+    assert scheduler.submit("a.py", "x = 1", persistent=True) == QUEUED
+    scheduler.finish()
+    clock.now += 1
+    assert scheduler.take().options == {'persistent': True}
+
+
+def test_one_pending_run_per_document():
+    """Новые версии кода заменяют ожидающий запуск, стартует последняя после паузы."""
+    clock = FakeClock()
+    scheduler = RunScheduler(debounce=0.5, clock=clock)
+    scheduler.submit("a.py", "v0")
+    scheduler.take()
+
+    for version in range(1, 6):
+        clock.now += 0.1
+        outcome = scheduler.submit("a.py", f"v{version}")
+        assert outcome == (QUEUED if version == 1 else REPLACED)
+    scheduler.submit("b.py", "other")
+    assert scheduler.pending_count == 2
+
+    # Пока код выполняется, ничего не стартует
+    clock.now += 1
+    assert scheduler.take() is None
+    scheduler.finish()
+    # Документы запускаются в порядке постановки в очередь
+    assert scheduler.take().code == "v5"
+    scheduler.finish()
+    assert scheduler.take().code == "other"
+    scheduler.finish()
+    assert scheduler.is_idle
+
+
+def test_debounce_and_stale_pending():
+    """Ожидающий запуск ждет паузы в запросах; повтор выполняемого кода отменяет устаревший."""
+    clock = FakeClock()
+    scheduler = RunScheduler(debounce=0.5, clock=clock)
+    scheduler.submit(None, "v0")
+    scheduler.take()
+    scheduler.submit(None, "v1")
+    scheduler.finish()
+
+    clock.now += 0.4
+    assert scheduler.take() is None
+    scheduler.submit(None, "v2")
+    clock.now += 0.4
+    assert scheduler.take() is None
+    clock.now += 0.2
+    assert scheduler.take().code == "v2"
+
+    # Пользователь вернул код к выполняемой версии - ожидающая версия устарела
+    scheduler.submit(None, "v3")
+    assert scheduler.submit(None, "v2") == DUPLICATE
+    assert scheduler.pending_count == 0
+    assert scheduler.clear() == 0
+
+
+def test_cancel_running():
+    """Новая версия кода отменяет выполняемый запуск того же документа один раз."""
+    clock = FakeClock()
+    scheduler = RunScheduler(debounce=0.0, cancel_running=True, clock=clock)
+    scheduler.submit("a.py", "slow")
+    scheduler.take()
+
+    assert scheduler.submit("b.py", "other") == QUEUED
+    assert scheduler.submit("a.py", "fixed") == CANCEL_RUNNING
+    # Отмена уже запрошена, повторный запрос не должен убить процесс
+    assert scheduler.submit("a.py", "fixed again") == REPLACED
+    scheduler.finish()
+    assert scheduler.take().code == "other"
+    scheduler.finish()
+    assert scheduler.take().code == "fixed again"
+
+
+if __name__ == "__main__":
+    test_idle_run_starts_immediately()
+    test_one_pending_run_per_document()
+    test_debounce_and_stale_pending()
+    test_cancel_running()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""Test перебора параметров скрипта (parameter sweep) в рабочих процессах."""
+import numpy as np
+import pytest
+
+from utils.code_executor import CodeExecutor
+from utils.shared_arrays import attach_array, release_blocks, share_array
+from utils.sweep import (apply_point, find_sweep_parameters, format_sweep_table, parse_metrics,
+                         split_setup, sweep_points)
+# После code_executor: он выбирает backend до импорта pyplot
+import matplotlib.pyplot as plt
+
+
+SWEEP_SCRIPT = """# %% setup
+import numpy as np
+data = np.ones(500_000)
+offset = 2
+
+def score(scale):
+    return float(data.sum()) * scale + offset
+
+# %% variant
+scale = 1  # @sweep [1, 2, 3]
+print("score:", score(scale))
+print("readonly:", int(not data.flags.writeable))
+plt.plot(data[:10] * scale)
+"""
+
+
+def test_parameters_and_points():
+    """Маркеры @sweep разбираются, сетка и случайная выборка строятся из значений."""
+    code = "a = 1  # @sweep [1, 2]\nb = 'x'  # @sweep range(3)\nc = 5\n"
+    parameters = find_sweep_parameters(code)
+    assert [(p.name, p.line, p.values) for p in parameters] == [("a", 1, [1, 2]), ("b", 2, [0, 1, 2])]
+    assert len(sweep_points(parameters)) == 6
+    sample = sweep_points(parameters, mode="random", samples=4, seed=1)
+    assert len(sample) == 4 and sample == sweep_points(parameters, mode="random", samples=4, seed=1)
+
+    variant = apply_point(code, parameters, {"a": 2, "b": 1})
+    assert variant.splitlines() == ["a = 2", "b = 1", "c = 5"]
+
+    with pytest.raises(ValueError):
+        find_sweep_parameters("a = 1  # @sweep []\n")
+    with pytest.raises(ValueError):
+        find_sweep_parameters("a = 1  # @sweep foo()\n")
+
+
+def test_split_setup_and_metrics():
+    """Ячейки выше первого параметра выполняются один раз; метрики берутся из вывода."""
+    parameters = find_sweep_parameters(SWEEP_SCRIPT)
+    setup, start_line = split_setup(SWEEP_SCRIPT, parameters)
+    assert "data = np.ones" in setup and "@sweep" not in setup
+    assert SWEEP_SCRIPT.splitlines()[start_line - 1] == "# %% variant"
+    # Ячейки setup склеиваются построчно
+    code = "# %% a\nx = 1\n# %% b\ny = 2\n# %% c\nz = 1  # @sweep [1]\n"
+    assert split_setup(code, find_sweep_parameters(code)) == ("# %% a\nx = 1\n# %% b\ny = 2", 5)
+    assert split_setup("x = 1  # @sweep [1]\n", find_sweep_parameters("x = 1  # @sweep [1]\n")) == ('', 1)
+
+    assert parse_metrics("loss: 0.5\nacc = 1e-2\ntext: abc\nloss: 0.25\n") == {"loss": 0.25, "acc": 0.01}
+
+
+def test_shared_array():
+    """Массив в общей памяти доступен другому владельцу только для чтения."""
+    array = np.arange(300_000, dtype=np.float64)
+    descriptor, block = share_array(array)
+    try:
+        shared, attached = attach_array(descriptor)
+        assert np.array_equal(shared, array)
+        assert not shared.flags.writeable
+        del shared
+        release_blocks([attached], unlink=False)
+    finally:
+        release_blocks([block])
+
+
+def test_run_sweep():
+    """Варианты выполняются в процессах с массивом из общей памяти и сводятся в таблицу."""
+    plt.close('all')
+    executor = CodeExecutor()
+    result = executor.execute(SWEEP_SCRIPT, sweep={'mode': 'grid', 'jobs': 2})
+    assert result['exception'] is None, result['stderr']
+    sweep = result['sweep']
+    assert sweep['parameters'] == ["scale"]
+    points = sorted(sweep['points'], key=lambda record: record['index'])
+    assert [record['point'] for record in points] == [{"scale": 1}, {"scale": 2}, {"scale": 3}]
+    assert [record['metrics']['score'] for record in points] == [500_002.0, 1_000_002.0, 1_500_002.0]
+    # Большой массив из setup отображается из общей памяти
+    assert all(record['metrics']['readonly'] == 1 for record in points)
+    assert result['stdout'].count("ok") == 3
+    assert len(result['figure_numbers']) == 3
+
+    table = format_sweep_table(sweep)
+    assert "Sweep: 3 variants" in table and "score" in table
+    plt.close('all')
+
+
+def test_variants_are_isolated():
+    """Варианты в одном процессе не видят изменений значений setup друг друга."""
+    code = """# %% setup
+acc = np.zeros(3)
+hist = []
+
+def total():
+    return float(acc.sum())
+
+# %% variant
+lr = 1  # @sweep [1, 2, 3, 4]
+acc += lr
+hist.append(lr)
+print("total:", total())
+print("hist:", len(hist))
+"""
+    executor = CodeExecutor()
+    result = executor.execute(code, sweep={'mode': 'grid', 'jobs': 1})
+    assert result['exception'] is None, result['stderr']
+    points = sorted(result['sweep']['points'], key=lambda record: record['index'])
+    assert [record['metrics']['total'] for record in points] == [3.0, 6.0, 9.0, 12.0]
+    assert all(record['metrics']['hist'] == 1 for record in points)
+
+
+def test_crash_affects_only_its_variant():
+    """Падение процесса одного варианта не помечает остальные варианты как упавшие."""
+    code = """import os, time
+x = 1  # @sweep [1, 2, 3, 4]
+time.sleep(0.5)
+if x == 2:
+    os._exit(3)
+print("x:", x)
+"""
+    executor = CodeExecutor()
+    result = executor.execute(code, sweep={'mode': 'grid', 'jobs': 2})
+    points = sorted(result['sweep']['points'], key=lambda record: record['index'])
+    assert [record['status'] for record in points] == ['ok', 'crashed', 'ok', 'ok']
+    assert [record['metrics'].get('x') for record in points] == [1.0, None, 3.0, 4.0]
+
+
+def test_workers_drop_run_limits():
+    """Рабочие процессы не наследуют ограничение памяти запуска, начавшего перебор."""
+    resource = pytest.importorskip("resource")
+    from utils.resource_limits import ResourceGuard
+
+    soft = resource.getrlimit(resource.RLIMIT_AS)[0]
+    code = f"""import resource
+x = 1  # @sweep [1]
+print("restored:", int(resource.getrlimit(resource.RLIMIT_AS)[0] == {soft}))
+"""
+    executor = CodeExecutor()
+    with ResourceGuard(memory_mb=256 * 1024):
+        assert resource.getrlimit(resource.RLIMIT_AS)[0] != soft
+        result = executor.execute(code, sweep={'mode': 'grid', 'jobs': 1})
+    assert result['sweep']['points'][0]['metrics']['restored'] == 1
+
+
+if __name__ == "__main__":
+    test_parameters_and_points()
+    test_split_setup_and_metrics()
+    test_shared_array()
+    test_run_sweep()
+    test_variants_are_isolated()
+    test_crash_affects_only_its_variant()
+    test_workers_drop_run_limits()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Test телеметрии запусков: этапы, запись истории и сводка."""
+import os
+import tempfile
+import time
+
+from utils.code_executor import CodeExecutor
+from utils import telemetry
+from utils.telemetry import (StageTimer, append_run_record, build_run_record, format_run_summary,
+                             load_run_history)
+
+
+def test_executor_timings():
+    """CodeExecutor измеряет время выполнения кода."""
+    executor = CodeExecutor()
+    result = executor.execute("import time\ntime.sleep(0.05)")
+    assert result['timings']['exec'] >= 0.05
+
+
+def test_run_history():
+    """Записи добавляются в JSONL и читаются обратно, сводка сравнивает с прошлым запуском."""
+    timer = StageTimer()
+    with timer.stage('clear_plots'):
+        time.sleep(0.01)
+    timer.add({'exec': 0.5})
+    result = {'stdout': 'abc', 'stderr': '', 'exception': None, 'cpu_time': 0.4,
+              'peak_rss': 50 * 1024 * 1024, 'figure_count': 2}
+    first = build_run_record(result, timer.stages, wall_time=0.6, file="a.py", mode="script")
+    assert first['status'] == 'ok'
+    assert first['output_size'] == 3
+    assert first['stages']['clear_plots'] >= 0.01
+
+    second = build_run_record(dict(result, exception='boom'), timer.stages, wall_time=0.9, file="a.py")
+    assert second['status'] == 'error'
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run_history.jsonl")
+        assert load_run_history(path) == []
+        append_run_record(path, first)
+        append_run_record(path, second)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write("damaged line\n")
+        history = load_run_history(path)
+        assert [record['wall_time'] for record in history] == [0.6, 0.9]
+        assert load_run_history(path, limit=1) == [second]
+
+    summary = format_run_summary(second, first)
+    print(summary)
+    assert summary.startswith("0.90 s (+50%)")
+    assert "exec 0.50 s" in summary
+    assert "2 figures" in summary
+
+
+def test_run_history_is_truncated():
+    """Файл истории ограничен по размеру: остаются последние записи."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "run_history.jsonl")
+        for number in range(500):
+            append_run_record(path, {'number': number, 'text': "ё" * 50}, max_bytes=20_000, keep_records=50)
+            assert os.path.getsize(path) <= 20_000
+        history = load_run_history(path)
+        assert 50 <= len(history) <= 200
+        assert history[-1]['number'] == 499
+        assert [record['number'] for record in history] == list(range(500 - len(history), 500))
+        assert [record['number'] for record in load_run_history(path, limit=3)] == [497, 498, 499]
+
+        # Чтение с конца блоками, граница блока посреди строки
+        block_bytes = telemetry._TAIL_BLOCK_BYTES
+        telemetry._TAIL_BLOCK_BYTES = 100
+        try:
+            assert load_run_history(path, limit=len(history) + 10) == history
+        finally:
+            telemetry._TAIL_BLOCK_BYTES = block_bytes
+
+
+if __name__ == "__main__":
+    test_executor_timings()
+    test_run_history()
+    test_run_history_is_truncated()
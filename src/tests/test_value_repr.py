@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Test отображения значения последнего выражения с ограниченным repr."""
+import time
+
+import numpy as np
+
+from utils.code_executor import CodeExecutor
+from utils.value_repr import MAX_REPR_CHARS, value_repr
+
+
+def test_large_values():
+    """Большие массивы и контейнеры показываются кратко и быстро."""
+    # 10^8 элементов без выделения памяти
+    array = np.broadcast_to(np.float64(1.5), (10 ** 8,))
+    start = time.perf_counter()
+    text = value_repr(array)
+    assert time.perf_counter() - start < 1.0
+    assert "shape=(100000000,)" in text and "dtype=float64" in text and "762.9 MB" in text
+    assert "..." in text and len(text) < 500
+
+    text = value_repr(list(range(1_000_000)))
+    assert text.startswith("[0, 1, 2") and "(list of 1000000 items)" in text and len(text) < 500
+
+    text = value_repr({"a": np.zeros((3, 4)), "b": 10 ** 5000})
+    assert "<ndarray shape=(3, 4)" in text and "bits>" in text
+
+    class Huge:
+        def __repr__(self):
+            return "x" * 100_000
+    assert len(value_repr(Huge())) < MAX_REPR_CHARS + 100
+
+
+def test_last_expression_displayed():
+    """Значение последнего выражения попадает в результат, None и ';' не показываются."""
+    executor = CodeExecutor()
+    result = executor.execute("x = 20\nx * 2 + 2")
+    assert result['display'] == "42"
+    assert result['stdout'] == ""
+
+    assert 'display' not in executor.execute("print('hi')")
+    assert 'display' not in executor.execute("x = 1\nx;")
+    assert 'display' not in executor.execute("x = 1")
+
+    result = executor.execute("import asyncio\nawait asyncio.sleep(0, 'done')")
+    assert result['display'] == "'done'"
+
+    # Ячейки: значение последней ячейки сохраняется и при повторе из кэша
+    code = "# %%\na = np.arange(5)\n# %%\na * 2"
+    for _ in range(2):
+        result = executor.execute(code, use_cells=True)
+        assert result['display'].startswith("ndarray shape=(5,)") and "[0 2 4 6 8]" in result['display']
+
+
+if __name__ == "__main__":
+    test_large_values()
+    test_last_expression_displayed()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Test сводок переменных для панели переменных."""
+import time
+import numpy as np
+from utils.code_executor import CodeExecutor
+from utils.execution_kernel import ExecutionKernel
+from utils.variables import VARIABLES_PAGE_SIZE, children, resolve, summarize, summarize_namespace
+
+
+class Unprintable:
+    """Объект, repr которого нельзя вызывать."""
+
+    def __init__(self):
+        self.value = 1
+
+    def __repr__(self):
+        raise AssertionError("repr не должен вызываться")
+
+
+def test_summarize_array_is_cheap():
+    """Огромный массив описывается формой и размером, без перевода в текст."""
+    array = np.broadcast_to(np.arange(10.0), (10 ** 7, 10))
+    started = time.perf_counter()
+    summary = summarize(array)
+    elapsed = time.perf_counter() - started
+
+    print(f"Сводка: {summary}, {elapsed * 1000:.2f} мс")
+    assert summary['shape'] == (10 ** 7, 10)
+    assert summary['dtype'] == 'float64'
+    assert summary['size'] == array.nbytes
+    assert summary['length'] == 10 ** 7 and summary['expandable']
+    assert summary['preview'] is None
+    assert elapsed < 0.1
+
+
+def test_summarize_without_repr():
+    """Объекты и контейнеры описываются без repr, превью только у скаляров и строк."""
+    assert summarize(Unprintable())['expandable']
+    assert summarize([Unprintable()] * 3)['length'] == 3
+    assert summarize(42)['preview'] == '42'
+    long_text = summarize("x" * 10_000)['preview']
+    assert len(long_text) < 100 and long_text.endswith('…')
+
+
+def test_summarize_namespace():
+    """Служебные имена, модули и непереопределенные предзагруженные имена скрыты."""
+    preloaded = {'np': np, 'pi': float('3.14'), 'e': float('2.71')}
+    # pi переопределен пользователем, e остался предзагруженным
+    namespace = {'__builtins__': {}, 'np': np, 'pi': float('3.14'), 'e': preloaded['e'], 'b': [1, 2], 'A': 1}
+    names = [variable['name'] for variable in summarize_namespace(namespace, preloaded)]
+    assert names == ['A', 'b', 'pi']
+
+
+def test_children_pages():
+    """Дочерние элементы отдаются страницами и находятся по пути."""
+    data = {'values': list(range(250)), 'matrix': np.zeros((3, 4)), (1, 2): 'tuple key', 'obj': Unprintable()}
+    namespace = {'data': data}
+
+    page = children(data)
+    assert page['total'] == 4
+    assert [item['name'] for item in page['items']] == ['values', 'matrix', '(1, 2)', 'obj']
+
+    values = resolve(namespace, ['data', 0])
+    first = children(values)
+    second = children(values, start=VARIABLES_PAGE_SIZE * 2)
+    assert first['total'] == 250 and len(first['items']) == VARIABLES_PAGE_SIZE
+    assert [item['key'] for item in second['items']] == list(range(200, 250))
+
+    row = children(resolve(namespace, ['data', 1]))['items'][2]
+    assert row['shape'] == (4,) and row['name'] == '[2]'
+    assert resolve(namespace, ['data', 3, 'value']) == 1
+
+
+def test_executor_variables():
+    """Результат выполнения содержит сводки переменных, пространство имен сохранено."""
+    executor = CodeExecutor()
+    result = executor.execute("import os\nx = np.ones((100, 100))\nname = 'test'")
+
+    variables = {variable['name']: variable for variable in result['variables']}
+    assert set(variables) == {'x', 'name'}
+    assert variables['x']['shape'] == (100, 100)
+    assert resolve(executor.last_namespace, ['x']).sum() == 10_000
+
+    executor.reset_session()
+    assert executor.last_namespace is None
+
+
+def test_kernel_inspect():
+    """Ядро отдает страницу дочерних элементов переменной после выполнения."""
+    kernel = ExecutionKernel()
+    kernel.start()
+    try:
+        kernel.submit("items = [{'a': i} for i in range(150)]", persistent=True)
+        pages = []
+        deadline = time.monotonic() + 60
+        inspected = False
+        while time.monotonic() < deadline and not pages:
+            for event in kernel.poll():
+                if event['type'] == 'result':
+                    assert event['result']['exception'] is None
+                    kernel.inspect_variable(['items'], start=100)
+                    inspected = True
+                elif event['type'] == 'variable_page':
+                    pages.append(event)
+            time.sleep(0.05)
+
+        assert inspected and pages
+        assert pages[0]['total'] == 150 and len(pages[0]['items']) == 50
+        assert pages[0]['items'][0]['name'] == '[100]'
+
+        kernel.inspect_variable(['missing'])
+        deadline = time.monotonic() + 30
+        errors = []
+        while time.monotonic() < deadline and not errors:
+            errors = [event for event in kernel.poll() if event['type'] == 'variable_page']
+            time.sleep(0.05)
+        assert errors and 'error' in errors[0]
+    finally:
+        kernel.shutdown()
+
+
+if __name__ == "__main__":
+    test_summarize_array_is_cheap()
+    test_summarize_without_repr()
+    test_summarize_namespace()
+    test_children_pages()
+    test_executor_variables()
+    test_kernel_inspect()
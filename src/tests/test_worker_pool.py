@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Test пула заранее запущенных процессов выполнения."""
+from test_execution_kernel import _wait_for_result
+from utils.worker_pool import WorkerPool
+
+
+def test_worker_pool_recycling():
+    """Процесс заменяется после max_runs запусков, пул остаётся заполненным."""
+    pool = WorkerPool(size=1, max_runs=2, max_rss_mb=None)
+    pool.start()
+    try:
+        kernel = pool.acquire()
+        kernel.submit("import os\nprint(os.getpid())")
+        _wait_for_result(kernel)
+        pool.release(kernel)
+        # Запуск не исчерпал лимит - тот же процесс возвращается в пул
+        assert pool.acquire() is kernel
+
+        kernel.submit("print('second run')")
+        _wait_for_result(kernel)
+        pool.release(kernel)
+        replacement = pool.acquire()
+        print(f"pid: {kernel.pid} -> {replacement.pid}")
+        assert replacement is not kernel
+        assert not kernel.is_alive() or kernel.run_count >= 2
+        pool.release(replacement)
+    finally:
+        pool.shutdown()
+
+
+if __name__ == "__main__":
+    test_worker_pool_recycling()
@@ -0,0 +1,398 @@
+"""Headless batch runner: executes many scripts in parallel without the GUI.
+
+Usage (from the src directory):
+    python -m pyculator run SCRIPTS_OR_DIRECTORIES... [-o OUTPUT] [-j JOBS] [--timeout SECONDS]
+
+Each script is executed by CodeExecutor in a worker process of a process pool,
+with the same semantics as in the application: the script's directory is the
+working directory, its local modules are importable and plt.show() doesn't open
+windows. For every script a directory in OUTPUT receives stdout.txt, stderr.txt
+and the figures as PNG files; OUTPUT/summary.json holds the status and timings
+of all scripts.
+
+Nothing here imports customtkinter or tkinter: figures are rendered with Agg.
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# Default settings of the "run" command
+DEFAULT_OUTPUT_DIRECTORY = "pyculator_output"
+DEFAULT_DPI = 100
+# Scripts executed by a worker process before it is replaced (1 - fresh process for every script)
+DEFAULT_WORKER_MAX_RUNS = 1
+
+# Executor of the worker process (created by _init_worker)
+_executor = None
+
+
+class ScriptTimeout(Exception):
+    """Raised in a script that ran longer than the timeout."""
+
+
+def _on_timeout(signum, frame):
+    """SIGALRM handler: stop the script with an exception."""
+    raise ScriptTimeout("Script timed out")
+
+
+def _init_worker() -> None:
+    """Prepare a worker process: executor (imported here to keep the parent light)."""
+    global _executor
+    # The executor's Agg backend has no windows: figures are only saved to files
+    from utils.code_executor import CodeExecutor
+    _executor = CodeExecutor()
+
+
+def collect_scripts(paths: List[str], recursive: bool = False) -> List[str]:
+    """
+    Collect scripts to run from files and directories.
+
+    Args:
+        paths: Script files and directories with scripts
+        recursive: Also take scripts from subdirectories
+
+    Returns:
+        Absolute paths of .py files without duplicates, in the given order
+        (scripts of a directory are sorted by name)
+
+    Raises:
+        FileNotFoundError: If a path doesn't exist
+    """
+    scripts: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            pattern = os.path.join(path, "**", "*.py") if recursive else os.path.join(path, "*.py")
+            found = sorted(glob.glob(pattern, recursive=recursive))
+        elif os.path.isfile(path):
+            found = [path]
+        else:
+            raise FileNotFoundError(f"No such file or directory: {path}")
+        for script in found:
+            script = os.path.abspath(script)
+            if script not in scripts:
+                scripts.append(script)
+    return scripts
+
+
+def output_names(scripts: List[str]) -> Dict[str, str]:
+    """
+    Choose output directory names for scripts: file name without extension,
+    with a numeric suffix when names repeat.
+
+    Args:
+        scripts: Script paths
+
+    Returns:
+        Script path -> directory name
+    """
+    names: Dict[str, str] = {}
+    used = set()
+    for script in scripts:
+        stem = os.path.splitext(os.path.basename(script))[0]
+        name = stem
+        counter = 2
+        while name in used:
+            name = f"{stem}_{counter}"
+            counter += 1
+        used.add(name)
+        names[script] = name
+    return names
+
+
+def _write_stream(path: str, text: str, spill: Optional[Dict], extra: str = '') -> int:
+    """
+    Write captured text of a stream, taking the full text from its spill file if there is one.
+
+    Args:
+        path: Output file
+        text: Captured text (with the middle omitted if the stream was spilled)
+        spill: Spill file description from the result (None - text is complete)
+        extra: Text appended after the stream
+
+    Returns:
+        Size of the written text in characters
+    """
+    if spill is None:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text + extra)
+        return len(text) + len(extra)
+    shutil.move(spill['path'], path)
+    if extra:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(extra)
+    return spill['size'] + len(extra)
+
+
+def run_script(script: str, output_directory: str, timeout: Optional[float] = None,
+               dpi: int = DEFAULT_DPI) -> Dict:
+    """
+    Execute one script in the current worker process and write its outputs.
+
+    Args:
+        script: Script path
+        output_directory: Directory for stdout.txt, stderr.txt and figure PNGs
+        timeout: Seconds after which the script is stopped (None - no limit; POSIX only)
+        dpi: Resolution of saved figures
+
+    Returns:
+        Summary record of the script:
+        {'script', 'output', 'status' ('ok', 'error' or 'timeout'), 'exception',
+         'exception_type', 'wall_time', 'cpu_time', 'figures', 'stdout_size',
+         'stderr_size', 'timings', 'pid'}
+    """
+    import matplotlib.pyplot as plt
+
+    if _executor is None:
+        _init_worker()
+    os.makedirs(output_directory, exist_ok=True)
+    plt.close('all')
+
+    with open(script, 'r', encoding='utf-8') as f:
+        code = f.read()
+
+    use_alarm = bool(timeout) and hasattr(signal, 'setitimer')
+    if use_alarm:
+        previous_handler = signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        result = _executor.execute(code, working_directory=os.path.dirname(script))
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+    wall_time = time.perf_counter() - wall_start
+    cpu_time = time.process_time() - cpu_start
+
+    figures = []
+    # Appended after the captured stderr
+    notes = ''
+    for number, figure in enumerate(_executor.get_all_figures(), start=1):
+        name = f"figure_{number}.png"
+        try:
+            figure.savefig(os.path.join(output_directory, name), dpi=dpi)
+            figures.append(name)
+        except Exception as e:
+            notes += f"\nFailed to save figure {number}: {e}\n"
+    plt.close('all')
+
+    # Streams that outgrew the memory limits were written in full to spill files
+    spills = result.get('output_spill', {})
+    if result['exception'] is not None:
+        notes += f"\n{result.get('exception_type') or 'Error'}: {result['exception']}\n"
+    stdout_size = _write_stream(os.path.join(output_directory, "stdout.txt"), result['stdout'], spills.get('stdout'))
+    stderr_size = _write_stream(os.path.join(output_directory, "stderr.txt"), result['stderr'], spills.get('stderr'),
+                                notes)
+
+    if result.get('exception_type') == ScriptTimeout.__name__:
+        status = 'timeout'
+    elif result['exception'] is not None:
+        status = 'error'
+    else:
+        status = 'ok'
+    return {
+        'script': script,
+        'output': output_directory,
+        'status': status,
+        'exception': result['exception'],
+        'exception_type': result.get('exception_type'),
+        'wall_time': round(wall_time, 4),
+        'cpu_time': round(cpu_time, 4),
+        'figures': figures,
+        'stdout_size': stdout_size,
+        'stderr_size': stderr_size,
+        'timings': {name: round(seconds, 4) for name, seconds in result.get('timings', {}).items()},
+        'pid': os.getpid(),
+    }
+
+
+def _crash_record(script: str, output_directory: str, error: Exception) -> Dict:
+    """Summary record of a script whose worker process died or that couldn't be started."""
+    return {
+        'script': script,
+        'output': output_directory,
+        'status': 'crashed',
+        'exception': str(error) or type(error).__name__,
+        'exception_type': type(error).__name__,
+    }
+
+
+def _run_isolated(script: str, output_directory: str, timeout: Optional[float], dpi: int,
+                  pool_options: Dict) -> Dict:
+    """Execute one script in a worker process of its own, so a crash affects only this script."""
+    with ProcessPoolExecutor(**dict(pool_options, max_workers=1)) as pool:
+        try:
+            return pool.submit(run_script, script, output_directory, timeout, dpi).result()
+        except Exception as e:
+            return _crash_record(script, output_directory, e)
+
+
+def run_batch(scripts: List[str], output_directory: str, jobs: Optional[int] = None,
+              timeout: Optional[float] = None, dpi: int = DEFAULT_DPI,
+              worker_max_runs: int = DEFAULT_WORKER_MAX_RUNS, on_done=None) -> Dict:
+    """
+    Execute scripts in parallel worker processes and write summary.json.
+
+    Args:
+        scripts: Script paths
+        output_directory: Directory for per-script outputs and summary.json
+        jobs: Number of worker processes (None - number of CPUs)
+        timeout: Per-script timeout in seconds (None - no limit)
+        dpi: Resolution of saved figures
+        worker_max_runs: Scripts executed by a worker process before it is replaced
+                         (honoured on Python 3.11+, older versions reuse workers)
+        on_done: Callback receiving each script record when it finishes
+
+    A worker process that dies (os._exit(), a segfault, killed by the OS) breaks
+    the whole pool and fails every script it was running or had queued. These
+    scripts are run again, each in a worker process of its own, so only the
+    script that crashed is reported as crashed.
+
+    Returns:
+        Summary dictionary (also written to output_directory/summary.json)
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(scripts) or 1))
+    names = output_names(scripts)
+
+    pool_options = {
+        'max_workers': jobs,
+        # Same start method as the execution kernels of the application
+        'mp_context': multiprocessing.get_context("spawn"),
+        'initializer': _init_worker,
+    }
+    if sys.version_info >= (3, 11):
+        pool_options['max_tasks_per_child'] = max(1, worker_max_runs)
+
+    started = datetime.now()
+    wall_start = time.perf_counter()
+    records: Dict[str, Dict] = {}
+    # Scripts failed by a broken pool (the crashing one among them)
+    retry: List[str] = []
+    with ProcessPoolExecutor(**pool_options) as pool:
+        futures = {
+            pool.submit(run_script, script, os.path.join(output_directory, names[script]), timeout, dpi): script
+            for script in scripts
+        }
+        for future in as_completed(futures):
+            script = futures[future]
+            try:
+                record = future.result()
+            except BrokenProcessPool:
+                retry.append(script)
+                continue
+            except Exception as e:
+                # The script couldn't be read
+                record = _crash_record(script, os.path.join(output_directory, names[script]), e)
+            records[script] = record
+            if on_done is not None:
+                on_done(record)
+
+    if retry:
+        with ThreadPoolExecutor(max_workers=min(jobs, len(retry))) as isolation:
+            futures = {
+                isolation.submit(_run_isolated, script, os.path.join(output_directory, names[script]),
+                                 timeout, dpi, pool_options): script
+                for script in retry
+            }
+            for future in as_completed(futures):
+                record = future.result()
+                records[futures[future]] = record
+                if on_done is not None:
+                    on_done(record)
+
+    ordered = [records[script] for script in scripts]
+    counts: Dict[str, int] = {}
+    for record in ordered:
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+    summary = {
+        'started': started.isoformat(timespec='seconds'),
+        'wall_time': round(time.perf_counter() - wall_start, 4),
+        'jobs': jobs,
+        'counts': counts,
+        'scripts': ordered,
+    }
+    with open(os.path.join(output_directory, "summary.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def _print_record(record: Dict) -> None:
+    """Print one line about a finished script."""
+    line = f"[{record['status']}] {os.path.basename(record['script'])}"
+    if 'wall_time' in record:
+        line += f" {record['wall_time']:.2f} s"
+    if record.get('figures'):
+        line += f", {len(record['figures'])} figures"
+    if record.get('exception'):
+        line += f": {record['exception']}"
+    print(line, flush=True)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create parser of the command line."""
+    parser = argparse.ArgumentParser(prog="python -m pyculator", description="Pyculator command line tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="execute scripts without the GUI")
+    run_parser.add_argument("paths", nargs="+", help="script files or directories with scripts")
+    run_parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT_DIRECTORY,
+                            help=f"output directory (default: {DEFAULT_OUTPUT_DIRECTORY})")
+    run_parser.add_argument("-j", "--jobs", type=int, default=None,
+                            help="number of worker processes (default: number of CPUs)")
+    run_parser.add_argument("-r", "--recursive", action="store_true", help="also run scripts in subdirectories")
+    run_parser.add_argument("--timeout", type=float, default=None, help="per-script timeout in seconds")
+    run_parser.add_argument("--dpi", type=int, default=DEFAULT_DPI,
+                            help=f"resolution of saved figures (default: {DEFAULT_DPI})")
+    run_parser.add_argument("--worker-max-runs", type=int, default=DEFAULT_WORKER_MAX_RUNS,
+                            help="scripts executed by a worker process before it is replaced "
+                                 f"(default: {DEFAULT_WORKER_MAX_RUNS})")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run the command line interface.
+
+    Args:
+        argv: Arguments without the program name (None - sys.argv)
+
+    Returns:
+        Exit code: 0 if all scripts succeeded, 1 if some failed, 2 on usage errors
+    """
+    args = build_parser().parse_args(argv)
+
+    try:
+        scripts = collect_scripts(args.paths, recursive=args.recursive)
+    except FileNotFoundError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if not scripts:
+        print("Error: no scripts to run", file=sys.stderr)
+        return 2
+
+    summary = run_batch(
+        scripts,
+        os.path.abspath(args.output),
+        jobs=args.jobs,
+        timeout=args.timeout,
+        dpi=args.dpi,
+        worker_max_runs=args.worker_max_runs,
+        on_done=_print_record
+    )
+    counts = ", ".join(f"{count} {status}" for status, count in sorted(summary['counts'].items()))
+    print(f"{len(scripts)} scripts in {summary['wall_time']:.2f} s ({counts}); "
+          f"summary: {os.path.join(os.path.abspath(args.output), 'summary.json')}")
+    return 0 if summary['counts'].get('ok', 0) == len(scripts) else 1
@@ -0,0 +1,316 @@
+"""Module for splitting scripts into `# %%` cells and caching cell results.
+
+Cached values are snapshots: they are pickled when the cell finishes (modules,
+functions and classes are kept by reference) and unpickled on every replay, so
+cells below never change the cached state. Data of large arrays is kept in a
+temporary file and mapped copy-on-write on replay, so replaying a cell that
+holds gigabytes of arrays doesn't copy them until they are written to.
+"""
+import hashlib
+import io
+import mmap
+import pickle
+import re
+import tempfile
+import types
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from utils.shared_arrays import SHARE_MIN_BYTES
+
+
+# Cell marker: a line starting with "# %%" (same as in VS Code / Spyder / Jupytext)
+CELL_MARKER = re.compile(r'^\s*#\s*%%')
+
+# Maximum number of cached cells (least recently used are dropped first)
+DEFAULT_CACHE_SIZE = 64
+# Maximum total size of cached values in bytes (least recently used are dropped first)
+DEFAULT_CACHE_BYTES = 1024 * 1024 * 1024
+
+
+class Cell:
+    """Class for storing one cell of a script."""
+
+    def __init__(self, index: int, source: str, start_line: int, key: str):
+        """
+        Initialize cell.
+
+        Args:
+            index: Cell index in the script (from 0)
+            source: Cell source code (including the marker line)
+            start_line: Number of the first cell line in the script (from 1)
+            key: Cache key - hash of the cell source and of all upstream cells
+        """
+        self.index = index
+        self.source = source
+        self.start_line = start_line
+        self.key = key
+
+    def __repr__(self):
+        return f"Cell({self.index}, line {self.start_line}, {self.key[:8]})"
+
+
+def has_cell_markers(code: str) -> bool:
+    """
+    Check whether code contains cell markers.
+
+    Args:
+        code: Script source
+
+    Returns:
+        True if at least one line is a cell marker
+    """
+    return any(CELL_MARKER.match(line) for line in code.splitlines())
+
+
+def split_cells(code: str) -> List[Cell]:
+    """
+    Split script into cells.
+
+    Code before the first marker forms its own cell. Cells without code
+    (only the marker, comments or blank lines) are kept so that line numbers stay valid.
+
+    Args:
+        code: Script source
+
+    Returns:
+        List of cells in script order
+    """
+    groups = []
+    current_lines: List[str] = []
+    current_start = 1
+
+    for line_number, line in enumerate(code.split('\n'), start=1):
+        if CELL_MARKER.match(line) and current_lines:
+            groups.append((current_start, current_lines))
+            current_lines = []
+            current_start = line_number
+        current_lines.append(line)
+    if current_lines:
+        groups.append((current_start, current_lines))
+
+    cells = []
+    upstream_key = ""
+    for index, (start_line, lines) in enumerate(groups):
+        source = '\n'.join(lines)
+        # Key depends on upstream cells: editing a cell invalidates everything below it
+        key = hashlib.sha256((upstream_key + '\0' + source).encode('utf-8')).hexdigest()
+        cells.append(Cell(index, source, start_line, key))
+        upstream_key = key
+    return cells
+
+
+def find_cell(cells: List[Cell], line: int) -> Optional[Cell]:
+    """
+    Find the cell containing a script line.
+
+    Args:
+        cells: Cells of the script (from split_cells)
+        line: Line number (from 1)
+
+    Returns:
+        Cell containing the line or None if the list is empty
+    """
+    found = None
+    for cell in cells:
+        if cell.start_line > line:
+            break
+        found = cell
+    return found
+
+
+# Objects snapshots keep by reference instead of copying
+_REFERENCE_TYPES = (types.ModuleType, types.FunctionType, types.BuiltinFunctionType, type)
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickler keeping modules, functions and classes by reference."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.references: List[object] = []
+
+    def persistent_id(self, obj):
+        if isinstance(obj, _REFERENCE_TYPES):
+            self.references.append(obj)
+            return len(self.references) - 1
+        return None
+
+
+class ValueSnapshot:
+    """Copy of namespace values that can be restored any number of times."""
+
+    def __init__(self, values: Dict[str, object]):
+        """
+        Take snapshot of values (names bound to one object stay bound to one copy).
+
+        Args:
+            values: Names with their values
+
+        Raises:
+            Exception: If a value can't be pickled (e.g. an open file or a generator)
+        """
+        # Large buffers: temporary file and (offset, size) of each buffer in it
+        self._file = None
+        self._buffers: List[Tuple[int, int]] = []
+        stream = io.BytesIO()
+        pickler = _SnapshotPickler(stream, protocol=5, buffer_callback=self._store_buffer)
+        pickler.dump(values)
+        self._data = stream.getvalue()
+        self._references = pickler.references
+        # Bytes held by the snapshot (in memory and in the file)
+        self.nbytes = len(self._data) + sum(size for _, size in self._buffers)
+
+    def _store_buffer(self, buffer: pickle.PickleBuffer) -> bool:
+        """Write a large buffer to the file (small ones stay in the pickle stream)."""
+        raw = buffer.raw()
+        if raw.nbytes < SHARE_MIN_BYTES:
+            return True
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="pyculator-cell-")
+        offset = self._file.seek(0, io.SEEK_END)
+        self._file.write(raw)
+        self._buffers.append((offset, raw.nbytes))
+        return False
+
+    def restore(self) -> Dict[str, object]:
+        """
+        Create independent copies of the values.
+
+        Returns:
+            Names with their values; arrays stored in the file are private
+            copy-on-write mappings of it
+        """
+        buffers = []
+        if self._buffers:
+            self._file.flush()
+            view = memoryview(mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_COPY))
+            buffers = [view[offset:offset + size] for offset, size in self._buffers]
+        unpickler = pickle.Unpickler(io.BytesIO(self._data), buffers=buffers)
+        unpickler.persistent_load = self._references.__getitem__
+        return unpickler.load()
+
+
+class CellResult:
+    """Class for storing cached results of an executed cell."""
+
+    def __init__(self, stdout: str, stderr: str, figures: List[Dict],
+                 changed: Dict[str, object], deleted: List[str], display: Optional[str] = None):
+        """
+        Initialize cell result.
+
+        Args:
+            stdout: Standard output of the cell
+            stderr: Error output of the cell
+            figures: Snapshots of figures created by the cell (figure_transport payloads)
+            changed: Names bound, rebound or used by the cell with their values (a
+                     snapshot is taken, so later cells mutating them don't change the cache)
+            deleted: Names deleted by the cell
+            display: Text of the value of the cell's trailing expression (only for the last cell)
+        """
+        self.stdout = stdout
+        self.stderr = stderr
+        self.figures = figures
+        self.changed = ValueSnapshot(changed)
+        self.deleted = deleted
+        self.display = display
+
+    def apply(self, namespace: Dict) -> None:
+        """
+        Apply namespace delta of the cell.
+
+        Every replay gets fresh copies of the values, so in-place changes made by
+        the cells below never reach the cached state.
+
+        Args:
+            namespace: Namespace to update
+        """
+        namespace.update(self.changed.restore())
+        for name in self.deleted:
+            namespace.pop(name, None)
+
+
+class Checkpoint:
+    """Class for storing namespace frozen right after a cell."""
+
+    def __init__(self, namespace: Dict, cell: Cell):
+        """
+        Initialize checkpoint.
+
+        Args:
+            namespace: Namespace after executing the script up to and including the cell
+            cell: Last executed cell; its key identifies the code the namespace was built from
+        """
+        self.namespace = namespace
+        self.cell_index = cell.index
+        self.start_line = cell.start_line
+        self.key = cell.key
+
+    def matches(self, cells: List[Cell]) -> bool:
+        """
+        Check that code up to the checkpoint cell is unchanged.
+
+        Args:
+            cells: Cells of the current script
+
+        Returns:
+            True if the checkpoint can be used for this script
+        """
+        return len(cells) > self.cell_index and cells[self.cell_index].key == self.key
+
+
+class CellCache:
+    """LRU cache of cell results keyed by Cell.key."""
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of cached cells
+            max_bytes: Maximum total size of cached values (a larger result is not kept)
+        """
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, CellResult]" = OrderedDict()
+        self._nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CellResult]:
+        """
+        Get cached result.
+
+        Args:
+            key: Cell key
+
+        Returns:
+            Cell result or None if not cached
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CellResult) -> None:
+        """
+        Store cell result.
+
+        Args:
+            key: Cell key
+            entry: Cell result
+        """
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._nbytes -= previous.changed.nbytes
+        self._entries[key] = entry
+        self._nbytes += entry.changed.nbytes
+        while self._entries and (len(self._entries) > self.max_size or self._nbytes > self.max_bytes):
+            _, dropped = self._entries.popitem(last=False)
+            self._nbytes -= dropped.changed.nbytes
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        self._entries.clear()
+        self._nbytes = 0
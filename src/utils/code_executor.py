@@ -1,15 +1,33 @@
 """Module for executing Python code and capturing results."""
-import io
+import ast
+import asyncio
+import inspect
 import os
 import sys
-import importlib
-from contextlib import redirect_stdout, redirect_stderr
-from typing import Dict, Tuple, Optional, List
+import time
+import tracemalloc
+from contextlib import nullcontext, redirect_stdout, redirect_stderr
+from typing import Callable, Dict, Tuple, Optional, List
 import matplotlib
-# Use TkAgg backend for tkinter compatibility, but disable automatic window opening
-matplotlib.use('TkAgg')
+from utils.mpl_backend import BACKEND, figure_sink
+# Agg backend without windows: plt.show() hands figures over instead of opening them
+matplotlib.use(BACKEND)
 import matplotlib.pyplot as plt
 import numpy as np
+from utils.output_stream import OutputCapture
+from utils.cells import Cell, CellCache, CellResult, Checkpoint, has_cell_markers, split_cells
+from utils.dataflow import ReactiveSession, StatementRecord, analyze
+from utils.figure_transport import snapshot_figure, restore_figure
+from utils.import_tracker import LocalImportTracker
+from utils.module_reloader import ModuleReloader
+from utils.profiling import SCRIPT_FILENAME, MemoryProfiler, create_profiler
+from utils.sweep import find_sweep_parameters, point_label, run_sweep
+from utils.value_repr import value_repr
+from utils.variables import summarize_namespace
+
+
+# Temporary name of the trailing expression value while it is evaluated
+VALUE_NAME = "__pyculator_value__"
 
 
 class CodeExecutor:
@@ -29,14 +47,82 @@ class CodeExecutor:
             'sys': sys,
             'os': os
         }
+
+        # Namespace of the persistent session (None - session not started)
+        self.session_namespace: Optional[Dict] = None
+        # Results of executed `# %%` cells
+        self.cell_cache = CellCache()
+        # State of reactive execution, belongs to the session namespace
+        self.reactive_session = ReactiveSession()
+        # Namespace frozen after a cell, variants of the code below it start from it
+        self.checkpoint: Optional[Checkpoint] = None
+        # Modules loaded from working directories, reloaded when their files change
+        self.module_reloader = ModuleReloader()
+        # Allocation sites after the last memory-profiled run of the session
+        self.memory_sites: Optional[Dict] = None
+        # Event loop of code with top-level await, kept with the session (clients bound to it stay usable)
+        self.event_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Namespace left by the last run, browsed by the variable explorer
+        self.last_namespace: Optional[Dict] = None
+        # Callback receiving figures shown by the running code (see execute)
+        self._on_figure: Optional[Callable[[plt.Figure], None]] = None
+        # Snapshots of figures shown by the current cell or statement (None - not recorded)
+        self._shown_figures: Optional[List[Optional[Dict]]] = None
+
+    def _new_namespace(self) -> Dict:
+        """Create namespace for executing code with preloaded modules."""
+        namespace = self.available_modules.copy()
+        namespace['__builtins__'] = __builtins__
+        return namespace
+
+    def reset_session(self) -> None:
+        """Drop the persistent session namespace (next persistent run starts from scratch)."""
+        self.session_namespace = None
+        self.last_namespace = None
+        self.reactive_session = ReactiveSession()
+        # Tracing was kept on for comparing memory profiles of the session
+        self.memory_sites = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._close_event_loop()
     
-    def execute(self, code: str, working_directory: Optional[str] = None) -> Dict:
+    def execute(self, code: str, working_directory: Optional[str] = None,
+                on_output: Optional[Callable[[str, str], None]] = None,
+                persistent: bool = False, use_cells: bool = False, reactive: bool = False,
+                checkpoint_cell: Optional[int] = None, from_checkpoint: bool = False,
+                profile: Optional[str] = None, sweep: Optional[Dict] = None,
+                on_figure: Optional[Callable[[plt.Figure], None]] = None) -> Dict:
         """
         Execute Python code.
 
+        Code may use `await` at the top level: it runs on the executor's event loop,
+        which lives as long as the session (see reset_session).
+
         Args:
             code: Code to execute
             working_directory: Working directory for execution (if None, current is used)
+            on_output: Callback (stream_name, text) receiving output chunks while code runs
+                       (stream_name is "stdout" or "stderr", chunks are coalesced in time)
+            persistent: Execute in the session namespace that survives between runs
+                        (if False, a fresh namespace is created for this run)
+            use_cells: Split code by `# %%` markers and reuse cached results of unchanged cells
+            reactive: Execute only changed top-level statements and their dependents
+                      in the session namespace (implies persistent)
+            checkpoint_cell: Execute cells up to and including this one (index from 0)
+                             in a fresh namespace and keep it as the checkpoint
+            from_checkpoint: Execute cells below the checkpoint directly in the checkpoint
+                             namespace. The namespace is modified, so this is meant for
+                             a forked copy of the process (see execution_kernel)
+            profile: Profile the run: "cpu" - functions with cProfile, "lines" - line times,
+                     "memory" - allocations with tracemalloc (None - no profiling).
+                     In the persistent session the memory profile is compared
+                     with the previous memory-profiled run.
+            sweep: Run the script for every combination of its `# @sweep` parameters in
+                   worker processes, settings {'mode', 'samples', 'seed', 'jobs'}
+                   (see utils.sweep). The figures of the variants become figures of this run
+            on_figure: Callback receiving each figure shown by plt.show() while code runs;
+                       the figure is closed after it (see utils.mpl_backend). Without it
+                       shown figures stay open like the figures that are never shown
 
         Returns:
             Dictionary with execution results:
@@ -44,7 +130,27 @@ class CodeExecutor:
                 'stdout': str - standard output,
                 'stderr': str - error output,
                 'exception': str - exception text if any,
-                'has_plot': bool - are there active plots
+                'exception_type': str - exception class name if any,
+                'interrupted': bool - only if execution was stopped by KeyboardInterrupt,
+                'has_plot': bool - are there active plots,
+                'cells': list - only in cell mode, [{'index', 'start_line', 'cached'}, ...],
+                'reactive': dict - only in reactive mode, {'executed': int, 'total': int},
+                'checkpoint': dict - only for checkpoint runs, {'cell': int, 'start_line': int, 'variant': bool},
+                'variables': list - summaries of the variables left in the namespace
+                             (see utils.variables.summarize_namespace),
+                'display': str - only if the code ends with an expression whose value is not None,
+                           size-aware text of the value (see utils.value_repr),
+                'profile': dict - only with profile, report of the profiler (see utils.profiling),
+                'sweep': dict - only for sweeps, {'parameters': [names], 'points': [records]}
+                         with the finished variants (see utils.sweep.run_sweep),
+                'output_spill': dict - only for long output, {stream name: {'path', 'size', 'omitted_chars',
+                                'omitted_lines'}}: full text of streams whose middle was omitted
+                                (see utils.output_stream), the files are removed by the receiver,
+                'timings': dict - wall time of the run stages in seconds: 'reload_modules' (only with
+                           working_directory) and 'exec'; the execution kernel adds 'render_figures'
+                           and 'transfer_figures' (stage names: utils.telemetry.STAGES),
+                'local_modules': list - only with working_directory, modules of the working directory
+                                 the code depends on: [{'name', 'path'}, ...]
             }
         """
         if not code.strip():
@@ -55,21 +161,33 @@ class CodeExecutor:
                 'has_plot': False
             }
         
-        stdout_capture = io.StringIO()
-        stderr_capture = io.StringIO()
+        capture = OutputCapture(on_output=on_output)
         
         result = {
             'stdout': '',
             'stderr': '',
             'exception': None,
             'has_plot': False,
-            'figure_numbers': []
+            'figure_numbers': [],
+            'timings': {}
         }
         
         # Save current working directory
         original_cwd = os.getcwd()
+        profiler = None
+        import_tracker = None
+        local_namespace = None
+        # The namespace of the previous run is released before this one allocates
+        self.last_namespace = None
 
         try:
+            session_memory_profile = profile == MemoryProfiler.kind and (persistent or reactive)
+            if session_memory_profile:
+                # Tracing stays on so the next run sees memory kept from this one
+                profiler = create_profiler(profile, baseline=self.memory_sites, keep_tracing=True)
+            else:
+                profiler = create_profiler(profile)
+
             # Change working directory if specified
             if working_directory and os.path.isdir(working_directory):
                 os.chdir(working_directory)
@@ -77,42 +195,62 @@ class CodeExecutor:
                 if working_directory not in sys.path:
                     sys.path.insert(0, working_directory)
                 
-                # Reload modules from working directory before execution
-                self._reload_modules_from_directory(working_directory)
+                # Record modules the run imports from the working directory
+                import_tracker = LocalImportTracker(working_directory)
+
+                # Reload changed modules of the working directory (and modules importing them)
+                reload_start = time.perf_counter()
+                with import_tracker:
+                    self.module_reloader.reload_changed(working_directory)
+                result['timings']['reload_modules'] = time.perf_counter() - reload_start
 
             # Plots are cleared in app.py before calling execute
 
-            # Create wrapper for plt.show() that won't open windows
-            def show_wrapper(*args, **kwargs):
-                """Wrapper for plt.show() that prevents opening separate windows."""
-                # Don't open windows, but plots should be saved
-                # In non-interactive mode plots are saved automatically
-                pass
+            # Tests and tools may have switched pyplot to another backend
+            if matplotlib.get_backend() != BACKEND:
+                plt.switch_backend(BACKEND)
+            self._on_figure = on_figure
+            self._shown_figures = None
 
             # Code execution
-            with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-                local_namespace = self.available_modules.copy()
-                # Redefine plt.show so it doesn't open windows
-                local_namespace['plt'].show = show_wrapper
-                # Also redefine in global namespace for imported modules
-                import matplotlib.pyplot as plt_module
-                original_show = plt_module.show
-                plt_module.show = show_wrapper
+            with capture, redirect_stdout(capture.stdout), redirect_stderr(capture.stderr), \
+                    figure_sink(self._hand_over_figure) if on_figure is not None else nullcontext():
+                if checkpoint_cell is not None or sweep is not None:
+                    local_namespace = self._new_namespace()
+                elif from_checkpoint:
+                    if self.checkpoint is None:
+                        raise RuntimeError("No checkpoint: create one first")
+                    local_namespace = self.checkpoint.namespace
+                elif persistent or reactive:
+                    if self.session_namespace is None:
+                        self.session_namespace = self._new_namespace()
+                    local_namespace = self.session_namespace
+                else:
+                    local_namespace = self._new_namespace()
 
+                exec_start = time.perf_counter()
                 try:
-                    # Execute code
-                    exec(code, {"__builtins__": __builtins__}, local_namespace)
-
-                    # After execution check plots
-                    # plt in local_namespace is a reference to the global module,
-                    # so plots should be available through global plt
+                    with import_tracker if import_tracker is not None else nullcontext(), \
+                            profiler if profiler is not None else nullcontext():
+                        if sweep is not None:
+                            self._execute_sweep(code, local_namespace, working_directory, sweep, capture, result)
+                        elif checkpoint_cell is not None:
+                            self._execute_to_checkpoint(code, checkpoint_cell, local_namespace, result)
+                        elif from_checkpoint:
+                            self._execute_from_checkpoint(code, result)
+                        elif reactive:
+                            self._execute_reactive(code, local_namespace, capture, result)
+                        elif use_cells and has_cell_markers(code):
+                            self._execute_cells(code, local_namespace, capture, result)
+                        else:
+                            # Execute code (single namespace so that functions see top-level names)
+                            self._show_value(self._run_code(code, local_namespace, keep_value=True), result)
                 finally:
-                    # Restore original show
-                    plt_module.show = original_show
+                    result['timings']['exec'] = time.perf_counter() - exec_start
             
             # Get output
-            result['stdout'] = stdout_capture.getvalue()
-            result['stderr'] = stderr_capture.getvalue()
+            result['stdout'] = capture.getvalue('stdout')
+            result['stderr'] = capture.getvalue('stderr')
 
             # Get all active plots
             figure_numbers = plt.get_fignums()
@@ -120,9 +258,51 @@ class CodeExecutor:
             result['figure_numbers'] = figure_numbers
 
         except Exception as e:
-            result['exception'] = str(e)
-            result['stderr'] = stderr_capture.getvalue()
+            # Some exceptions (e.g. MemoryError) have no message
+            result['exception'] = str(e) or type(e).__name__
+            result['exception_type'] = type(e).__name__
+            result['stdout'] = capture.getvalue('stdout')
+            result['stderr'] = capture.getvalue('stderr')
+        except KeyboardInterrupt:
+            # Stop requested (see ExecutionKernel.interrupt): keep everything produced so far
+            result['exception'] = "Execution interrupted"
+            result['interrupted'] = True
+            result['stdout'] = capture.getvalue('stdout')
+            result['stderr'] = capture.getvalue('stderr')
         finally:
+            self._on_figure = None
+            self._shown_figures = None
+            if local_namespace is not None:
+                self.last_namespace = local_namespace
+                try:
+                    result['variables'] = summarize_namespace(local_namespace, self.available_modules)
+                except Exception as e:
+                    result['stderr'] += f"\nFailed to list variables: {e}\n"
+
+            # Streams that outgrew the memory limits were written to spill files
+            spills = capture.spill_info()
+            if spills:
+                result['output_spill'] = spills
+
+            if profiler is not None:
+                try:
+                    result['profile'] = profiler.report()
+                    if session_memory_profile:
+                        self.memory_sites = profiler.sites
+                except Exception as e:
+                    result['stderr'] += f"\nFailed to collect profile: {e}\n"
+
+            # Remember modules this run imported from the working directory
+            if import_tracker is not None:
+                try:
+                    self.module_reloader.add_imports(import_tracker.records())
+                    result['local_modules'] = [
+                        {'name': name, 'path': self.module_reloader.modules[name].path}
+                        for name in self.module_reloader.local_dependencies(code)
+                    ]
+                except Exception as e:
+                    result['stderr'] += f"\nFailed to index local modules: {e}\n"
+
             # Restore original working directory
             try:
                 os.chdir(original_cwd)
@@ -140,65 +320,358 @@ class CodeExecutor:
 
         return result
     
-    def _reload_modules_from_directory(self, directory: str) -> None:
+    def _execute_cells(self, code: str, namespace: Dict, capture: OutputCapture, result: Dict) -> None:
         """
-        Reload all modules that were imported from the specified directory.
-        
+        Execute code cell by cell, replaying cached results of unchanged cells.
+
+        A cell is replayed if its key (hash of its source and of all cells above it)
+        is in the cache: its output is written again, its figures are restored and
+        a fresh copy of its namespace delta is applied. Other cells are executed and
+        cached with a snapshot of their delta: names they bind, rebind, or read (and so
+        may have changed in place). Cells whose values can't be copied are not cached.
+        Execution stops at the first failing cell, which is not cached.
+
         Args:
-            directory: Directory path to check for modules
+            code: Script source
+            namespace: Namespace to execute in
+            capture: Output capture of the current run
+            result: Result dictionary, 'cells' summary is added to it
         """
-        if not directory or not os.path.isdir(directory):
-            return
-        
-        # Normalize directory path for comparison
-        directory = os.path.abspath(directory)
-        directory_normalized = directory.lower()
-        
-        # Find and reload modules that were imported from this directory
-        modules_to_reload = []
-        
-        for module_name, module in list(sys.modules.items()):
-            # Skip built-in modules, standard library, and system modules
-            if module_name.startswith('_'):
+        from matplotlib import _pylab_helpers
+
+        result['cells'] = []
+        cells = split_cells(code)
+        for cell in cells:
+            is_last = cell is cells[-1]
+            cached = self.cell_cache.get(cell.key)
+            result['cells'].append({'index': cell.index, 'start_line': cell.start_line, 'cached': cached is not None})
+
+            if cached is not None:
+                capture.stdout.write(cached.stdout)
+                capture.stderr.write(cached.stderr)
+                for payload in cached.figures:
+                    restore_figure(payload)
+                cached.apply(namespace)
+                if is_last and cached.display is not None:
+                    result['display'] = cached.display
                 continue
-            
+
+            before = dict(namespace)
+            figures_before = set(plt.get_fignums())
+            stdout_start = capture.position('stdout')
+            stderr_start = capture.position('stderr')
+
+            self._shown_figures = []
+            self._show_value(self._exec_cell(cell, namespace, keep_value=is_last), result)
+            shown, self._shown_figures = self._shown_figures, None
+
             try:
-                module_file = getattr(module, '__file__', None)
-                if not module_file:
-                    continue
-                
-                module_path = os.path.abspath(module_file)
-                module_path_normalized = module_path.lower()
-                
-                # Check if module file is in the working directory
-                # Handle both .py files and __pycache__ files
-                if directory_normalized in module_path_normalized:
-                    # For __pycache__ files, get the parent directory
-                    if '__pycache__' in module_path:
-                        module_dir = os.path.dirname(os.path.dirname(module_path))
-                    else:
-                        module_dir = os.path.dirname(module_path)
-                    
-                    # Check if module directory matches working directory
-                    if os.path.abspath(module_dir).lower() == directory_normalized:
-                        # Only reload .py modules (skip .pyc, .pyd, etc.)
-                        if module_path.endswith('.py') or '__pycache__' in module_path:
-                            modules_to_reload.append(module_name)
-                    
-            except (AttributeError, TypeError, OSError):
-                # Skip modules that can't be checked
+                figures = shown + [
+                    snapshot_figure(manager.canvas.figure)
+                    for manager in _pylab_helpers.Gcf.get_all_fig_managers()
+                    if manager.num not in figures_before
+                ]
+            except Exception:
+                # Figures that can't be copied make the cell uncacheable
                 continue
-        
-        # Reload modules
-        for module_name in modules_to_reload:
+            if None in figures:
+                continue
+
             try:
-                if module_name in sys.modules:
-                    importlib.reload(sys.modules[module_name])
-            except (ImportError, AttributeError, TypeError, ValueError):
-                # Some modules can't be reloaded (e.g., C extensions, already deleted)
-                # This is expected and we can ignore it
-                pass
-    
+                # Values the cell read may have been changed in place (arr *= 2, d['a'] = 1,
+                # items.append(1)), so they are part of its delta too
+                touched = set()
+                for statement in analyze(cell.source):
+                    touched |= statement.defines | statement.uses
+                entry = CellResult(
+                    stdout=capture.getvalue('stdout', stdout_start),
+                    stderr=capture.getvalue('stderr', stderr_start),
+                    figures=figures,
+                    changed={
+                        name: value for name, value in namespace.items()
+                        if name not in before or before[name] is not value or name in touched
+                    },
+                    deleted=[name for name in before if name not in namespace],
+                    display=result.get('display') if is_last else None
+                )
+            except Exception:
+                # Values that can't be copied make the cell uncacheable
+                continue
+            self.cell_cache.put(cell.key, entry)
+
+    def _exec_cell(self, cell: Cell, namespace: Dict, keep_value: bool = False):
+        """Execute one cell keeping line numbers in tracebacks equal to script line numbers."""
+        return self._run_code('\n' * (cell.start_line - 1) + cell.source, namespace, keep_value=keep_value)
+
+    def _run_code(self, source, namespace: Dict, keep_value: bool = False):
+        """
+        Compile and execute code, running code with top-level await on the event loop.
+
+        Args:
+            source: Source text or ast.Module (file name of the code is SCRIPT_FILENAME)
+            namespace: Namespace to execute in
+            keep_value: Evaluate a trailing expression statement separately and return its value
+
+        Returns:
+            Value of the trailing expression (None if not requested, if there is none
+            or if the source ends with ';', which hides the value as in IPython)
+        """
+        if keep_value:
+            hidden = isinstance(source, str) and source.rstrip().endswith(';')
+            tree = ast.parse(source, SCRIPT_FILENAME) if isinstance(source, str) else source
+            if tree.body and isinstance(tree.body[-1], ast.Expr) and not hidden:
+                # The expression is assigned to a temporary name, so the code still runs
+                # as one unit (e.g. in one coroutine with top-level await)
+                last = tree.body[-1]
+                assign = ast.copy_location(
+                    ast.Assign(targets=[ast.Name(id=VALUE_NAME, ctx=ast.Store())], value=last.value), last
+                )
+                module = ast.fix_missing_locations(ast.Module(body=tree.body[:-1] + [assign], type_ignores=[]))
+                self._run_code(module, namespace)
+                return namespace.pop(VALUE_NAME, None)
+        code = compile(source, SCRIPT_FILENAME, 'exec', flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+        if code.co_flags & inspect.CO_COROUTINE:
+            # Evaluating code with top-level await creates a coroutine instead of running it
+            self._run_coroutine(eval(code, namespace))
+        else:
+            exec(code, namespace)
+        return None
+
+    def _hand_over_figure(self, figure: plt.Figure) -> None:
+        """Pass a figure shown by the running code to the on_figure callback of the run."""
+        if self._shown_figures is not None:
+            # Cached cells and statements replay the figures they showed
+            try:
+                self._shown_figures.append(snapshot_figure(figure))
+            except Exception:
+                self._shown_figures.append(None)
+        try:
+            self._on_figure(figure)
+        except Exception as e:
+            # A figure that can't be sent must not stop the script (stderr is captured here)
+            print(f"Failed to send figure: {e}", file=sys.stderr)
+
+    @staticmethod
+    def _show_value(value, result: Dict) -> None:
+        """Put size-aware text of the trailing expression value into the result (None is not shown)."""
+        if value is not None:
+            result['display'] = value_repr(value)
+
+    def _run_coroutine(self, coroutine):
+        """
+        Run a coroutine of top-level code on the executor's event loop.
+
+        Tasks of the run that are still pending when it fails or is interrupted
+        are cancelled, so a stopped fan-out doesn't resume in the next run.
+
+        Args:
+            coroutine: Coroutine created by evaluating the code
+
+        Returns:
+            Value returned by the coroutine
+        """
+        if self.event_loop is None or self.event_loop.is_closed():
+            self.event_loop = asyncio.new_event_loop()
+        loop = self.event_loop
+        # asyncio.get_event_loop() in user code returns this loop
+        asyncio.set_event_loop(loop)
+        try:
+            return loop.run_until_complete(coroutine)
+        except BaseException:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                try:
+                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+                except BaseException:
+                    # A task refusing to stop must not hide the original error
+                    pass
+            raise
+
+    def _close_event_loop(self) -> None:
+        """Cancel tasks left on the event loop and close it."""
+        loop = self.event_loop
+        self.event_loop = None
+        if loop is None or loop.is_closed():
+            return
+        try:
+            pending = asyncio.all_tasks(loop)
+            for task in pending:
+                task.cancel()
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+    def _execute_to_checkpoint(self, code: str, cell_index: int, namespace: Dict, result: Dict) -> None:
+        """
+        Execute cells up to and including a cell and keep the namespace as the checkpoint.
+
+        Args:
+            code: Script source
+            cell_index: Index of the last cell to execute
+            namespace: Fresh namespace that becomes the checkpoint namespace
+            result: Result dictionary, 'checkpoint' summary is added to it
+        """
+        # The previous checkpoint is dropped even if this one fails
+        self.checkpoint = None
+        cells = split_cells(code)
+        if not 0 <= cell_index < len(cells):
+            raise ValueError(f"Cell {cell_index + 1} does not exist")
+
+        for cell in cells[:cell_index + 1]:
+            self._exec_cell(cell, namespace)
+
+        self.checkpoint = Checkpoint(namespace, cells[cell_index])
+        result['checkpoint'] = {'cell': cell_index, 'start_line': cells[cell_index].start_line, 'variant': False}
+
+    def _execute_from_checkpoint(self, code: str, result: Dict) -> None:
+        """
+        Execute cells below the checkpoint cell in the checkpoint namespace.
+
+        Args:
+            code: Script source (code up to the checkpoint cell must be unchanged)
+            result: Result dictionary, 'checkpoint' summary is added to it
+        """
+        cells = split_cells(code)
+        if not self.checkpoint.matches(cells):
+            raise RuntimeError("Checkpoint is out of date: code above it was changed. Create the checkpoint again.")
+
+        result['checkpoint'] = {
+            'cell': self.checkpoint.cell_index,
+            'start_line': self.checkpoint.start_line,
+            'variant': True
+        }
+        for cell in cells[self.checkpoint.cell_index + 1:]:
+            self._show_value(self._exec_cell(cell, self.checkpoint.namespace, keep_value=cell is cells[-1]), result)
+
+    def _execute_reactive(self, code: str, namespace: Dict, capture: OutputCapture, result: Dict) -> None:
+        """
+        Execute only statements affected by changes since the previous reactive run.
+
+        Output and figures of statements that are up to date are replayed,
+        names defined only by deleted statements are removed from the namespace,
+        as are names a statement reads before their definition (so it fails as it
+        would in a fresh run). Removed preloaded names get their preloaded value back.
+        A figure built by several statements is saved in its final state with the
+        statement that created it, so replaying that statement shows the whole figure.
+
+        Args:
+            code: Script source
+            namespace: Session namespace
+            capture: Output capture of the current run
+            result: Result dictionary, 'reactive' summary is added to it
+        """
+        from matplotlib import _pylab_helpers
+
+        statements = analyze(code)
+        dirty, removed_names = self.reactive_session.plan(statements)
+        for name in removed_names:
+            self._unbind(namespace, name)
+
+        result['reactive'] = {'executed': 0, 'total': len(statements)}
+        # Number of a figure open in pyplot -> (figures of the record holding it, position)
+        owners: Dict[int, Tuple[List[Dict], int]] = {}
+        for statement in statements:
+            is_last = statement is statements[-1]
+            if statement.index not in dirty:
+                record = self.reactive_session.records[statement.key]
+                capture.stdout.write(record.stdout)
+                capture.stderr.write(record.stderr)
+                for position, payload in enumerate(record.figures):
+                    owners[restore_figure(payload).number] = (record.figures, position)
+                if is_last and record.display is not None:
+                    result['display'] = record.display
+                continue
+
+            figures_before = set(plt.get_fignums())
+            stdout_start = capture.position('stdout')
+            stderr_start = capture.position('stderr')
+
+            result['reactive']['executed'] += 1
+            # A failing statement stays dirty: the names it binds are marked unknown
+            for name in self.reactive_session.begin(statement):
+                self._unbind(namespace, name)
+            module = ast.Module(body=[statement.node], type_ignores=[])
+            self._shown_figures = []
+            self._show_value(self._run_code(module, namespace, keep_value=is_last), result)
+            shown, self._shown_figures = self._shown_figures, None
+
+            figures = [payload for payload in shown if payload is not None]
+            for manager in _pylab_helpers.Gcf.get_all_fig_managers():
+                if manager.num not in figures_before:
+                    try:
+                        payload = snapshot_figure(manager.canvas.figure)
+                    except Exception:
+                        payload = None
+                    if payload is not None:
+                        owners[manager.num] = (figures, len(figures))
+                        figures.append(payload)
+
+            self.reactive_session.mark_executed(statement, StatementRecord(
+                stdout=capture.getvalue('stdout', stdout_start),
+                stderr=capture.getvalue('stderr', stderr_start),
+                figures=figures,
+                display=result.get('display') if is_last else None
+            ))
+
+        # Later statements may have drawn on figures (ax.plot(...) below plt.subplots())
+        for manager in _pylab_helpers.Gcf.get_all_fig_managers():
+            if manager.num in owners:
+                figures, position = owners[manager.num]
+                try:
+                    payload = snapshot_figure(manager.canvas.figure)
+                except Exception:
+                    payload = None
+                if payload is not None:
+                    figures[position] = payload
+
+    def _unbind(self, namespace: Dict, name: str) -> None:
+        """Remove a name bound by the script from the namespace, restoring its preloaded value."""
+        namespace.pop(name, None)
+        if name in self.available_modules:
+            namespace[name] = self.available_modules[name]
+
+    def _execute_sweep(self, code: str, namespace: Dict, working_directory: Optional[str],
+                       settings: Dict, capture: OutputCapture, result: Dict) -> None:
+        """
+        Execute a parameter sweep and collect figures of its variants.
+
+        Args:
+            code: Script source with `# @sweep` parameters
+            namespace: Fresh namespace for the setup cells
+            working_directory: Working directory of the variants
+            settings: Sweep settings (see utils.sweep.run_sweep)
+            capture: Output capture of the current run (progress lines go there)
+            result: Result dictionary, 'sweep' summary is added to it
+        """
+        records: List[Dict] = []
+        result['sweep'] = {
+            'parameters': [parameter.name for parameter in find_sweep_parameters(code)],
+            'points': []
+        }
+
+        def on_point(record: Dict, total: int) -> None:
+            label = point_label(record['point'])
+            status = record['status'] if not record.get('exception') else f"{record['status']}: {record['exception']}"
+            capture.stdout.write(f"[{len(records)}/{total}] {label}: {status}\n")
+            for payload in record.pop('figures'):
+                try:
+                    figure = restore_figure(payload)
+                    # Parameters of the variant in the corner, the script's own titles are kept
+                    figure.text(0.01, 0.99, label, ha='left', va='top', fontsize='small', color='#555555')
+                except Exception as e:
+                    capture.stderr.write(f"Failed to restore figure of {label}: {e}\n")
+            # Output of the variants isn't sent back, the run shows the table of them
+            record.pop('stdout', None)
+            record.pop('stderr', None)
+            result['sweep']['points'].append(record)
+
+        run_sweep(code, namespace, working_directory, settings, records, on_point=on_point)
+
     def get_figure(self) -> Optional[plt.Figure]:
         """
         Get current matplotlib figure.
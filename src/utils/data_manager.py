@@ -5,6 +5,40 @@ import sys
 from typing import Dict, Optional, Tuple
 
 
+# Default code execution settings (stored in app_state.json under "execution")
+DEFAULT_EXECUTION_SETTINGS = {
+    # Keep namespace between runs (persistent session)
+    "persistent_session": False,
+    # How F5 executes the file: "script" (whole file), "cells" (`# %%` cells with result cache)
+    # or "reactive" (only changed statements and their dependents, in the session namespace)
+    "execution_mode": "script",
+    # Pre-started worker processes for isolated runs
+    "worker_pool_size": 2,
+    # Runs after which a worker process is replaced (1 - fresh process for every run)
+    "worker_max_runs": 1,
+    # Worker memory (RSS, megabytes) above which it is replaced after the run
+    "worker_max_rss_mb": 2048,
+    # Seconds after which a run is stopped (0 - no limit)
+    "run_timeout": 0,
+    # Resource limits of a run (0 - no limit): address space and resident memory
+    # in megabytes, CPU time in seconds
+    "memory_limit_mb": 0,
+    "rss_limit_mb": 0,
+    "cpu_time_limit": 0,
+    # Runs requested while code runs wait in a queue (one per file): seconds without
+    # new requests before the queued run starts, and whether newer code of the running
+    # file stops the running job instead of waiting for it
+    "run_debounce": 0.2,
+    "cancel_superseded_runs": False,
+    # Parameter sweep: "grid" (all combinations) or "random" (sweep_samples of them, seeded
+    # with sweep_seed, None - different each time), worker processes (0 - number of CPUs)
+    "sweep_mode": "grid",
+    "sweep_samples": 20,
+    "sweep_seed": None,
+    "sweep_jobs": 0,
+}
+
+
 def _get_base_path() -> str:
     """
     Get base path for application files.
@@ -51,6 +85,16 @@ def get_app_state_file() -> str:
     return os.path.join(base_path, "app_state.json")
 
 
+def get_run_history_file() -> str:
+    """
+    Get path to run history file (telemetry of code runs, next to app_state.json).
+
+    Returns:
+        Path to run_history.jsonl file
+    """
+    return os.path.join(_get_base_path(), "run_history.jsonl")
+
+
 class DataManager:
     """Class for managing application data in Python files."""
 
@@ -440,3 +484,42 @@ class DataManager:
         state = self.load_app_state()
         return state.get("hotkeys", {})
 
+    def load_execution_settings(self) -> Dict:
+        """
+        Load code execution settings.
+
+        Returns:
+            Dictionary with execution settings (defaults for missing keys)
+        """
+        state = self.load_app_state()
+        settings = dict(DEFAULT_EXECUTION_SETTINGS)
+        saved = state.get("execution", {})
+        if isinstance(saved, dict):
+            settings.update(saved)
+        return settings
+
+    def save_execution_settings(self, settings: Dict) -> bool:
+        """
+        Save code execution settings.
+
+        Args:
+            settings: Dictionary with execution settings (e.g., {"persistent_session": True})
+
+        Returns:
+            True if save successful, False otherwise
+        """
+        try:
+            state_file = get_app_state_file()
+            current_state = self.load_app_state()
+            execution = current_state.get("execution", {})
+            if not isinstance(execution, dict):
+                execution = {}
+            execution.update(settings)
+            current_state["execution"] = execution
+
+            with open(state_file, "w", encoding="utf-8") as f:
+                json.dump(current_state, f, ensure_ascii=False, indent=2)
+            return True
+        except Exception as e:
+            print(f"Error saving execution settings: {e}")
+            return False
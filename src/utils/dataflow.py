@@ -0,0 +1,329 @@
+"""Module for reactive re-execution of scripts based on top-level name dependencies.
+
+The script is split into top-level statements. For each statement the names it
+defines and uses are collected with `ast`, which gives a dependency graph:
+a statement depends on the latest statement above it that defines a name it uses.
+A statement is identified by its source together with the statements its names
+resolve to, so editing, deleting or moving a definition changes the identity of
+everything downstream. After an edit only changed statements and their transitive
+dependents are executed again; other statements keep their state in the persistent
+namespace. The session also tracks which statement produced the value each name
+holds, so definitions are re-executed whenever the namespace holds a value that
+a statement about to run (or the end of the script) must not see.
+
+Assignments to a name, its attributes or its items count as definitions of it,
+and so do method calls on a name defined by the script (`items.append(1)`,
+`ax.set_title(...)`), since they may change the object in place. Calls on
+imported or preloaded modules (`np.zeros(3)`) are not definitions.
+"""
+import ast
+import builtins
+import hashlib
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class Statement:
+    """Class for storing one top-level statement of a script."""
+
+    def __init__(self, index: int, node: ast.stmt, source: str, key: str,
+                 defines: Set[str], uses: Set[str]):
+        """
+        Initialize statement.
+
+        Args:
+            index: Statement index in the script
+            node: AST node of the statement
+            source: Statement source code
+            key: Identity of the statement - hash of its source, of the keys of the
+                 statements its names resolve to and of its occurrence number
+            defines: Names bound or mutated by the statement
+            uses: Names read by the statement
+        """
+        self.index = index
+        self.node = node
+        self.source = source
+        self.key = key
+        self.defines = defines
+        self.uses = uses
+        # Used name -> index of the statement above defining it (names without one are absent)
+        self.definers: Dict[str, int] = {}
+        # Indices of statements this one depends on
+        self.depends_on: Set[int] = set()
+
+    def __repr__(self):
+        return f"Statement({self.index}, line {self.node.lineno}, defines={sorted(self.defines)})"
+
+
+class _NameCollector(ast.NodeVisitor):
+    """Collects names defined and used at module level by a statement."""
+
+    def __init__(self):
+        self.defines: Set[str] = set()
+        self.uses: Set[str] = set()
+        # Names whose methods are called (may be mutated, see analyze)
+        self.called: Set[str] = set()
+
+    def visit_Name(self, node: ast.Name):
+        if isinstance(node.ctx, ast.Load):
+            self.uses.add(node.id)
+        else:
+            self.defines.add(node.id)
+
+    def _visit_mutated_target(self, node):
+        """Assignment to `x.attr` or `x[key]` mutates x: count it as definition of x."""
+        base = node
+        while isinstance(base, (ast.Attribute, ast.Subscript)):
+            base = base.value
+        if isinstance(base, ast.Name):
+            self.defines.add(base.id)
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if not isinstance(node.ctx, ast.Load):
+            self._visit_mutated_target(node)
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node: ast.Subscript):
+        if not isinstance(node.ctx, ast.Load):
+            self._visit_mutated_target(node)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        base = node.func
+        if isinstance(base, ast.Attribute):
+            while isinstance(base, (ast.Attribute, ast.Subscript)):
+                base = base.value
+            if isinstance(base, ast.Name):
+                self.called.add(base.id)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign):
+        # x += 1 both reads and writes x
+        if isinstance(node.target, ast.Name):
+            self.uses.add(node.target.id)
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        for alias in node.names:
+            self.defines.add(alias.asname or alias.name.split('.')[0])
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        for alias in node.names:
+            if alias.name != '*':
+                self.defines.add(alias.asname or alias.name)
+
+    def _visit_scope(self, node, name: Optional[str] = None):
+        """Function or class body: its local names are not module-level definitions."""
+        if name:
+            self.defines.add(name)
+        inner = _NameCollector()
+        for child in ast.iter_child_nodes(node):
+            inner.visit(child)
+        # Any name read inside may be a global; over-approximation is safe here
+        self.uses |= inner.uses
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            # Class bodies and comprehensions run right away
+            self.called |= inner.called
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self._visit_scope(node, node.name)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef):
+        self._visit_scope(node, node.name)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self._visit_scope(node, node.name)
+
+    def visit_Lambda(self, node: ast.Lambda):
+        self._visit_scope(node)
+
+    def visit_ListComp(self, node):
+        self._visit_scope(node)
+
+    visit_SetComp = visit_ListComp
+    visit_DictComp = visit_ListComp
+    visit_GeneratorExp = visit_ListComp
+
+
+def analyze(code: str) -> List[Statement]:
+    """
+    Split script into top-level statements and build their dependency graph.
+
+    Args:
+        code: Script source
+
+    Returns:
+        List of statements with depends_on filled in
+
+    Raises:
+        SyntaxError: If the script can't be parsed
+    """
+    tree = ast.parse(code)
+    lines = code.split('\n')
+    builtin_names = set(dir(builtins))
+
+    statements = []
+    occurrences: Dict[str, int] = {}
+    # Name -> index of the latest statement defining it
+    latest_definition: Dict[str, int] = {}
+
+    for index, node in enumerate(tree.body):
+        # Decorators belong to the statement
+        first_line = min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+        source = '\n'.join(lines[first_line - 1:node.end_lineno])
+
+        collector = _NameCollector()
+        collector.visit(node)
+        uses = collector.uses - builtin_names
+
+        definers = {name: latest_definition[name] for name in uses if name in latest_definition}
+        # The key covers where each used name comes from (nowhere - empty), so a statement
+        # whose inputs now come from another definition is a different statement
+        resolved = ''.join(
+            f"\0{name}={statements[definers[name]].key if name in definers else ''}" for name in sorted(uses)
+        )
+        source_hash = hashlib.sha256((source + resolved).encode('utf-8')).hexdigest()
+        # Identical statements are told apart by their occurrence number
+        occurrence = occurrences.get(source_hash, 0)
+        occurrences[source_hash] = occurrence + 1
+
+        # A method call on an object the script created may mutate it: the statement
+        # redefines the name (names of modules and preloaded values are left alone)
+        defines = collector.defines | {
+            name for name in collector.called
+            if name in latest_definition
+            and not isinstance(statements[latest_definition[name]].node, (ast.Import, ast.ImportFrom))
+        }
+
+        statement = Statement(index, node, source, f"{source_hash}:{occurrence}", defines, uses)
+        statement.definers = definers
+        statement.depends_on = set(definers.values())
+        for name in defines:
+            latest_definition[name] = index
+        statements.append(statement)
+
+    return statements
+
+
+class StatementRecord:
+    """Class for storing output of an executed statement for replay."""
+
+    def __init__(self, stdout: str, stderr: str, figures: List[Dict], display: Optional[str] = None):
+        """
+        Initialize record.
+
+        Args:
+            stdout: Standard output of the statement
+            stderr: Error output of the statement
+            figures: Snapshots of figures created by the statement
+            display: Text of the statement's value (only for a trailing expression)
+        """
+        self.stdout = stdout
+        self.stderr = stderr
+        self.figures = figures
+        self.display = display
+
+
+# Producer of a name whose value is unknown (its statement failed while running)
+_UNKNOWN = ""
+
+
+class ReactiveSession:
+    """State of reactive execution: which statements are up to date in the namespace."""
+
+    def __init__(self):
+        """Initialize empty session (every statement is dirty)."""
+        # Statement key -> record of its last successful execution
+        self.records: Dict[str, StatementRecord] = {}
+        # Name -> key of the statement whose value the namespace holds (only names bound by the script)
+        self.bound: Dict[str, str] = {}
+        # Statement index -> names to unbind before it runs (from the last plan)
+        self._unbind: Dict[int, Set[str]] = {}
+
+    def plan(self, statements: List[Statement]) -> Tuple[Set[int], Set[str]]:
+        """
+        Determine which statements have to be executed.
+
+        Statements without a record of their key are dirty. Running them is simulated
+        in order against the values the namespace holds: when a dirty statement would
+        read a value produced by another statement than the one its name resolves to,
+        that definition is executed too, and so is the last definition of every name
+        whose value at the end would differ. This repeats until nothing changes. Names
+        a dirty statement reads before any definition are unbound before it runs (see begin()).
+
+        Args:
+            statements: Statements of the current script (from analyze)
+
+        Returns:
+            Tuple (indices of statements to execute, names to remove from namespace)
+        """
+        current_keys = {statement.key for statement in statements}
+        # Forget statements that are no longer in the script
+        self.records = {key: record for key, record in self.records.items() if key in current_keys}
+
+        last_definer: Dict[str, Statement] = {}
+        for statement in statements:
+            for name in statement.defines:
+                last_definer[name] = statement
+        # Names whose defining statements were deleted from the script
+        removed_names = {name for name in self.bound if name not in last_definer}
+        for name in removed_names:
+            del self.bound[name]
+
+        dirty = {statement.index for statement in statements if statement.key not in self.records}
+        while True:
+            values = dict(self.bound)
+            unbind: Dict[int, Set[str]] = {}
+            required = set()
+            for statement in statements:
+                if statement.index not in dirty:
+                    # Replayed statements don't change the namespace
+                    continue
+                for name in statement.uses:
+                    definer = statement.definers.get(name)
+                    if definer is None:
+                        if name in values:
+                            unbind.setdefault(statement.index, set()).add(name)
+                            del values[name]
+                    elif values.get(name) != statements[definer].key:
+                        required.add(definer)
+                for name in statement.defines:
+                    values[name] = statement.key
+            for name, statement in last_definer.items():
+                if values.get(name) != statement.key:
+                    required.add(statement.index)
+            if required <= dirty:
+                break
+            dirty |= required
+
+        self._unbind = unbind
+        return dirty, removed_names
+
+    def begin(self, statement: Statement) -> Set[str]:
+        """
+        Prepare execution of a dirty statement.
+
+        Args:
+            statement: Statement about to run
+
+        Returns:
+            Names to remove from the namespace before it runs (it reads them before any definition)
+        """
+        names = self._unbind.pop(statement.index, set())
+        for name in names:
+            self.bound.pop(name, None)
+        # Until it succeeds the names it binds hold unknown values
+        for name in statement.defines:
+            self.bound[name] = _UNKNOWN
+        return names
+
+    def mark_executed(self, statement: Statement, record: StatementRecord) -> None:
+        """
+        Remember successful execution of a statement.
+
+        Args:
+            statement: Executed statement
+            record: Its output
+        """
+        self.records[statement.key] = record
+        for name in statement.defines:
+            self.bound[name] = statement.key
@@ -0,0 +1,776 @@
+"""Module for running user code in a separate worker process (execution kernel).
+
+The GUI talks to the kernel through a multiprocessing pipe using small dict messages.
+
+Requests (GUI -> kernel):
+    {'type': 'run', 'run_id': int, 'code': str, 'working_directory': str | None,
+     'persistent': bool, 'use_cells': bool, 'reactive': bool, 'fork': bool, 'limits': dict | None,
+     'profile': str | None, 'sweep': dict | None}
+    {'type': 'checkpoint', 'run_id': int, 'code': str, 'working_directory': str | None,
+     'cell_index': int, 'limits': dict | None}
+    {'type': 'clear_checkpoint'}
+    {'type': 'reset_session'}
+    {'type': 'clear_cell_cache'}
+    {'type': 'inspect', 'path': list, 'start': int, 'count': int} - children of a variable
+     left by the last run (path: variable name followed by child keys, see utils.variables)
+    {'type': 'shutdown'}
+
+Control requests (GUI -> kernel, separate pipe read by a thread while code runs):
+    {'type': 'interrupt', 'run_id': int}
+
+Events (kernel -> GUI):
+    {'type': 'ready', 'pid': int}
+    {'type': 'fork', 'run_id': int, 'pid': int} - variant run started in a forked child
+    {'type': 'stream', 'run_id': int, 'name': 'stdout' | 'stderr', 'text': str}
+    {'type': 'figure', 'run_id': int, 'figure': dict} - payload from figure_transport with the
+     PNG rendered by the kernel (large arrays of the figure are in shared memory, see below);
+     sent when the code shows the figure (plt.show()) or after the run if it is still open
+    {'type': 'result', 'run_id': int, 'result': dict} - dictionary from CodeExecutor.execute
+    {'type': 'variable_page', 'path': list, 'start': int, 'total': int, 'items': list}
+    {'type': 'variable_page', 'path': list, 'start': int, 'error': str} - the value no longer exists
+
+Shared memory: figure data is passed in multiprocessing.shared_memory blocks
+(see utils.shared_arrays), so large arrays are not pickled through the pipe.
+The kernel owns the blocks of its last run and removes them when the next run
+starts, the session is reset or the kernel exits. The GUI maps them while
+restoring the figures, which must happen before it submits the next run. The
+client removes blocks the kernel could not release itself (forked variants,
+killed kernels) when it submits the next run and when it kills the kernel.
+
+Checkpoints: a 'checkpoint' request executes cells up to the given one and keeps the
+namespace in the kernel. A 'run' request with 'fork' set executes the cells below the
+checkpoint in an os.fork() child: the child gets a copy-on-write view of the namespace,
+reports through the same pipe and exits, so the checkpoint itself is never modified.
+
+Limits: 'limits' holds ResourceGuard arguments ({'memory_mb', 'rss_mb', 'cpu_seconds'}),
+applied to the run only. Results report 'peak_rss' and 'cpu_time' of the run.
+
+Stopping: interrupt() raises KeyboardInterrupt in the running code. If the code does
+not stop within INTERRUPT_GRACE_PERIOD (or a timeout was given and has expired and the
+interrupt did not help), the process running it is killed and the kernel restarted.
+"""
+import _thread
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+
+# Time to wait for the worker to exit gracefully before killing it (seconds)
+SHUTDOWN_TIMEOUT = 2.0
+# Time given to code to stop after KeyboardInterrupt before it is killed (seconds)
+INTERRUPT_GRACE_PERIOD = 3.0
+# Interval of repeating the interrupt: library code may swallow a single KeyboardInterrupt (seconds)
+INTERRUPT_RETRY_INTERVAL = 0.5
+
+
+def _failed_result(exception: str, stderr: str = '', stdout: str = '') -> Dict:
+    """Create result dictionary for a run that could not produce its own result."""
+    return {
+        'stdout': stdout,
+        'stderr': stderr,
+        'exception': exception,
+        'has_plot': False,
+        'figure_numbers': [],
+        'figure_count': 0
+    }
+
+
+class _KernelWorker:
+    """Message loop that runs inside the kernel process."""
+
+    def __init__(self, conn, control_conn):
+        """
+        Initialize worker.
+
+        Args:
+            conn: Worker end of the pipe
+            control_conn: Receiving end of the control pipe (stop requests)
+        """
+        # Imports are done here so that the GUI process never loads them through this module.
+        # The executor selects its Agg backend (utils.mpl_backend): the kernel has no windows
+        from utils.code_executor import CodeExecutor
+
+        self.conn = conn
+        self.control_conn = control_conn
+        self._warm_up()
+        # Output is streamed from a flusher thread while the main thread may send results
+        self._send_lock = threading.Lock()
+        # Run executing user code right now and PID of its forked child (variant runs)
+        self._state_lock = threading.Lock()
+        self._interruptible_run_id: Optional[int] = None
+        self._fork_pid: Optional[int] = None
+        self.executor = CodeExecutor()
+        # Shared memory blocks with figure data of the last run (owned by this process)
+        self._shared_blocks: List = []
+        # Figures sent by the current run and the time spent on them
+        self._figure_stats: Dict = {'count': 0, 'render_figures': 0.0, 'transfer_figures': 0.0}
+        self._handlers = {
+            'run': self._handle_run,
+            'checkpoint': self._handle_checkpoint,
+            'clear_checkpoint': self._handle_clear_checkpoint,
+            'reset_session': self._handle_reset_session,
+            'clear_cell_cache': self._handle_clear_cell_cache,
+            'inspect': self._handle_inspect,
+        }
+
+    @staticmethod
+    def _warm_up() -> None:
+        """Render a small figure so that fonts and Agg caches are ready before the first run."""
+        import matplotlib.pyplot as plt
+        try:
+            figure = plt.figure(figsize=(1, 1))
+            figure.gca().set_title("warm-up")
+            figure.canvas.draw()
+        except Exception as e:
+            print(f"Kernel warm-up failed: {e}")
+        finally:
+            plt.close('all')
+
+    def serve(self) -> None:
+        """Process requests until shutdown or until the GUI goes away."""
+        # KeyboardInterrupt is how running code is stopped, whatever the parent process set
+        signal.signal(signal.SIGINT, self._on_interrupt)
+        threading.Thread(target=self._listen_control, name="kernel-control", daemon=True).start()
+
+        self._send({'type': 'ready', 'pid': os.getpid()})
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                # GUI process closed the pipe - nothing left to do
+                break
+
+            message_type = message.get('type')
+            if message_type == 'shutdown':
+                break
+
+            handler = self._handlers.get(message_type)
+            if handler is None:
+                print(f"Kernel: unknown message type {message_type!r}")
+                continue
+            handler(message)
+        self._release_shared()
+
+    def _release_shared(self) -> None:
+        """Remove shared memory blocks of the last run (the GUI keeps its own mappings)."""
+        from utils.shared_arrays import release_blocks
+
+        release_blocks(self._shared_blocks)
+        self._shared_blocks = []
+
+    def _listen_control(self) -> None:
+        """Receive stop requests while the main thread executes user code."""
+        while True:
+            try:
+                message = self.control_conn.recv()
+            except (EOFError, OSError):
+                break
+            if message.get('type') == 'interrupt':
+                self._interrupt(message.get('run_id'))
+
+    def _interrupt(self, run_id: Optional[int]) -> None:
+        """Raise KeyboardInterrupt in the code of the given run if it is still running."""
+        with self._state_lock:
+            if run_id is None or run_id != self._interruptible_run_id:
+                return
+            if self._fork_pid is not None:
+                # Variant runs in the forked child, the main thread only waits for it
+                os.kill(self._fork_pid, signal.SIGINT)
+            elif hasattr(signal, 'pthread_kill'):
+                # A real signal also wakes the main thread from blocking calls like time.sleep
+                signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)
+            else:
+                _thread.interrupt_main()
+
+    def _on_interrupt(self, signum, frame) -> None:
+        """
+        SIGINT handler: stop the running code.
+
+        The GUI repeats stop requests until the result arrives; a repeated request
+        delivered after the run stopped being interruptible is ignored.
+        """
+        if self._interruptible_run_id is not None:
+            raise KeyboardInterrupt
+
+    def _send(self, event: Dict) -> None:
+        """Send event to the GUI, ignoring a closed pipe."""
+        try:
+            with self._send_lock:
+                self.conn.send(event)
+        except (EOFError, OSError, BrokenPipeError):
+            pass
+
+    def _handle_run(self, message: Dict) -> None:
+        """Execute code (in a forked child if requested) and report the result."""
+        if message.get('fork'):
+            self._handle_fork_run(message)
+            return
+        self._run_and_report(
+            message,
+            persistent=message.get('persistent', False),
+            use_cells=message.get('use_cells', False),
+            reactive=message.get('reactive', False)
+        )
+
+    def _handle_checkpoint(self, message: Dict) -> None:
+        """Execute cells up to the requested one and keep the namespace as the checkpoint."""
+        self._run_and_report(message, checkpoint_cell=message['cell_index'])
+
+    def _handle_clear_checkpoint(self, message: Dict) -> None:
+        """Drop the checkpoint namespace."""
+        self.executor.checkpoint = None
+
+    def _handle_fork_run(self, message: Dict) -> None:
+        """Execute a variant below the checkpoint in a copy-on-write child process."""
+        run_id = message['run_id']
+        if not hasattr(os, 'fork'):
+            self._send({'type': 'result', 'run_id': run_id, 'result': _failed_result(
+                "Checkpoint variants need os.fork(), which is not available on this platform"
+            )})
+            return
+
+        with self._state_lock:
+            pid = os.fork()
+            if pid == 0:
+                # Child: everything it changes is discarded when it exits.
+                # Only this thread exists in the child, so the lock held here is replaced.
+                self._state_lock = threading.Lock()
+                exit_code = 0
+                try:
+                    self._run_and_report(message, from_checkpoint=True)
+                except BaseException:
+                    exit_code = 1
+                finally:
+                    os._exit(exit_code)
+
+            self._fork_pid = pid
+            self._interruptible_run_id = run_id
+        # The GUI kills the child directly if it ignores the interrupt
+        self._send({'type': 'fork', 'run_id': run_id, 'pid': pid})
+
+        # The parent only waits, so the pipe is never written by both processes at once
+        _, status = os.waitpid(pid, 0)
+        with self._state_lock:
+            self._fork_pid = None
+            self._interruptible_run_id = None
+        exit_code = os.waitstatus_to_exitcode(status)
+        if exit_code != 0:
+            self._send({'type': 'result', 'run_id': run_id, 'result': _failed_result(
+                f"Variant process died unexpectedly (exit code {exit_code}). Checkpoint is kept."
+            )})
+
+    def _run_and_report(self, message: Dict, **options) -> None:
+        """
+        Execute code and send figures followed by the result.
+
+        Args:
+            message: Request with 'run_id', 'code' and 'working_directory'
+            **options: Execution mode arguments for CodeExecutor.execute
+        """
+        import matplotlib.pyplot as plt
+        from utils.process_stats import current_rss
+        from utils.resource_limits import CpuTimeLimitExceeded, ResourceGuard
+
+        run_id = message['run_id']
+        # Each run starts without figures left from the previous one
+        plt.close('all')
+        self._release_shared()
+        self._figure_stats = {'count': 0, 'render_figures': 0.0, 'transfer_figures': 0.0}
+
+        result = None
+        try:
+            guard = ResourceGuard(**(message.get('limits') or {}))
+            with self._state_lock:
+                self._interruptible_run_id = run_id
+            try:
+                with guard:
+                    result = self.executor.execute(
+                        message['code'],
+                        working_directory=message.get('working_directory'),
+                        profile=message.get('profile'),
+                        sweep=message.get('sweep'),
+                        on_output=lambda name, text: self._send(
+                            {'type': 'stream', 'run_id': run_id, 'name': name, 'text': text}
+                        ),
+                        # Figures shown by plt.show() are sent at once
+                        on_figure=lambda figure: self._send_figure(run_id, figure),
+                        **options
+                    )
+            except (MemoryError, CpuTimeLimitExceeded) as e:
+                if guard.exceeded is None:
+                    raise
+                # The limit was hit as the run was ending and the exception arrived after the
+                # executor returned: report it as the limit, not as a kernel error
+                result = _failed_result(type(e).__name__)
+                result['exception_type'] = type(e).__name__
+            except KeyboardInterrupt:
+                if result is None:
+                    # A repeated stop request reached the executor after it had stopped the
+                    # code and cut its result short: the GUI fills in the output it received
+                    result = _failed_result("Execution interrupted")
+                    result['interrupted'] = True
+                    result['output_streamed'] = True
+            finally:
+                # Not under the lock: a stop request sent before this is ignored by _on_interrupt,
+                # and _interrupt() sends nothing after it
+                self._interruptible_run_id = None
+            guard.report(result)
+
+            # Figures that were never shown are sent after the run
+            for figure in self.executor.get_all_figures():
+                try:
+                    self._send_figure(run_id, figure)
+                except Exception as e:
+                    # Unpicklable artists should not hide the rest of the output
+                    result['stderr'] += f"\nFailed to transfer figure: {e}\n"
+            result['figure_count'] = self._figure_stats.pop('count')
+            result.setdefault('timings', {}).update(self._figure_stats)
+        except Exception:
+            result = _failed_result('Internal kernel error', traceback.format_exc())
+        finally:
+            plt.close('all')
+
+        # Used by the worker pool to recycle workers that grew too large
+        result['worker_rss'] = current_rss()
+        self._send({'type': 'result', 'run_id': run_id, 'result': result})
+
+    def _send_figure(self, run_id: int, figure) -> None:
+        """Render a figure with Agg and send it to the GUI (large arrays go through shared memory)."""
+        from utils.figure_transport import render_figure, serialize_figure
+
+        render_start = time.perf_counter()
+        image = render_figure(figure)
+        transfer_start = time.perf_counter()
+        payload = serialize_figure(figure, self._shared_blocks, image=image)
+        self._send({'type': 'figure', 'run_id': run_id, 'figure': payload})
+        stats = self._figure_stats
+        stats['render_figures'] += transfer_start - render_start
+        stats['transfer_figures'] += time.perf_counter() - transfer_start
+        stats['count'] += 1
+
+    def _handle_reset_session(self, message: Dict) -> None:
+        """Drop the persistent session namespace."""
+        self.executor.reset_session()
+        self._release_shared()
+
+    def _handle_clear_cell_cache(self, message: Dict) -> None:
+        """Drop cached cell results."""
+        self.executor.cell_cache.clear()
+
+    def _handle_inspect(self, message: Dict) -> None:
+        """Send a page of children of a variable left by the last run."""
+        from utils.variables import children, resolve
+
+        event = {'type': 'variable_page', 'path': message['path'], 'start': message['start']}
+        try:
+            if self.executor.last_namespace is None:
+                raise LookupError("No variables: the namespace of the last run is gone")
+            value = resolve(self.executor.last_namespace, message['path'])
+            event.update(children(value, message['start'], message['count']))
+        except Exception as e:
+            event['error'] = str(e) or type(e).__name__
+        self._send(event)
+
+
+def _kernel_main(conn, control_conn) -> None:
+    """Entry point of the kernel process."""
+    worker = _KernelWorker(conn, control_conn)
+    worker.serve()
+
+
+class ExecutionKernel:
+    """Client side of the execution kernel, used from the GUI thread."""
+
+    def __init__(self):
+        """Initialize kernel client (the process is started by start())."""
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._conn = None
+        self._control_conn = None
+        self._next_run_id = 1
+        # ID of the run whose result has not arrived yet
+        self._active_run_id: Optional[int] = None
+        self.pid: Optional[int] = None
+        # True after the worker finished warm-up and reported 'ready'
+        self.ready = False
+        # Number of runs finished by the current worker process
+        self.run_count = 0
+        # RSS of the worker after its last run (bytes, None if unknown)
+        self.last_rss: Optional[int] = None
+        # Index of the cell the kernel holds a checkpoint after (None - no checkpoint)
+        self.checkpoint_cell: Optional[int] = None
+        self._checkpoint_run_id: Optional[int] = None
+
+        # State of the active run used for stopping it
+        self._timeout: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self._interrupt_time: Optional[float] = None
+        self._interrupt_sent_time: Optional[float] = None
+        self._timed_out = False
+        self._fork_pid: Optional[int] = None
+        self._fork_killed = False
+        # Output received for the active run, kept for the result if the process is killed
+        self._run_output: Dict[str, List[str]] = {'stdout': [], 'stderr': []}
+        # Shared memory blocks with figure data received since the last run was submitted
+        self._shared_names: List[str] = []
+
+    def start(self) -> None:
+        """Start the kernel process if it is not running."""
+        if self.is_alive():
+            return
+
+        parent_conn, child_conn = self._context.Pipe()
+        control_reader, control_writer = self._context.Pipe(duplex=False)
+        # Not a daemon: user code may start its own worker processes
+        self._process = self._context.Process(
+            target=_kernel_main,
+            args=(child_conn, control_reader),
+            name="pyculator-kernel"
+        )
+        self._process.start()
+        # The child ends now belong to the kernel process
+        child_conn.close()
+        control_reader.close()
+        self._conn = parent_conn
+        self._control_conn = control_writer
+        self.pid = self._process.pid
+        self.ready = False
+        self.run_count = 0
+        self.last_rss = None
+        self.checkpoint_cell = None
+
+    def is_alive(self) -> bool:
+        """Check whether the kernel process is running."""
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def is_busy(self) -> bool:
+        """True while a submitted run has not produced its result."""
+        return self._active_run_id is not None
+
+    def submit(self, code: str, working_directory: Optional[str] = None, persistent: bool = False,
+               use_cells: bool = False, reactive: bool = False, fork: bool = False,
+               timeout: Optional[float] = None, limits: Optional[Dict] = None,
+               profile: Optional[str] = None, sweep: Optional[Dict] = None) -> int:
+        """
+        Send code to the kernel for execution.
+
+        Args:
+            code: Code to execute
+            working_directory: Working directory for execution
+            persistent: Execute in the session namespace kept by the kernel between runs
+            use_cells: Execute `# %%` cells, reusing cached results of unchanged cells
+            reactive: Execute only changed statements and their dependents in the session namespace
+            fork: Execute cells below the checkpoint in a forked copy of the kernel (POSIX only)
+            timeout: Seconds after which the run is interrupted (None - no limit)
+            limits: Resource limits of the run, ResourceGuard arguments (None - no limits)
+            profile: Profiler kind (see utils.profiling, None - no profiling)
+            sweep: Parameter sweep settings (see utils.sweep, None - a single run)
+
+        Returns:
+            ID of the run, repeated in all events that belong to it
+        """
+        return self._send_run({
+            'type': 'run',
+            'code': code,
+            'working_directory': working_directory,
+            'persistent': persistent,
+            'use_cells': use_cells,
+            'reactive': reactive,
+            'fork': fork,
+            'limits': limits,
+            'profile': profile,
+            'sweep': sweep
+        }, timeout)
+
+    def create_checkpoint(self, code: str, cell_index: int, working_directory: Optional[str] = None,
+                          timeout: Optional[float] = None, limits: Optional[Dict] = None) -> int:
+        """
+        Execute cells up to and including a cell and keep the namespace in the kernel.
+
+        Later runs with fork=True start from this namespace. The checkpoint_cell
+        attribute is set when the result arrives.
+
+        Args:
+            code: Script source
+            cell_index: Index of the checkpoint cell (from 0)
+            working_directory: Working directory for execution
+            timeout: Seconds after which the run is interrupted (None - no limit)
+            limits: Resource limits of the run, ResourceGuard arguments (None - no limits)
+
+        Returns:
+            ID of the run
+        """
+        run_id = self._send_run({
+            'type': 'checkpoint',
+            'code': code,
+            'working_directory': working_directory,
+            'cell_index': cell_index,
+            'limits': limits
+        }, timeout)
+        self.checkpoint_cell = None
+        self._checkpoint_run_id = run_id
+        return run_id
+
+    def clear_checkpoint(self) -> None:
+        """Drop the checkpoint namespace in the kernel."""
+        self.checkpoint_cell = None
+        if self._conn is not None and self.is_alive():
+            self._conn.send({'type': 'clear_checkpoint'})
+
+    def _send_run(self, message: Dict, timeout: Optional[float] = None) -> int:
+        """Start the kernel if needed and send a request that produces a result."""
+        self.start()
+
+        run_id = self._next_run_id
+        self._next_run_id += 1
+        # Figures of the previous run are restored by now
+        self._unlink_shared()
+
+        self._conn.send(dict(message, run_id=run_id))
+        self._active_run_id = run_id
+        self._timeout = timeout
+        # The timeout is counted from the moment a starting kernel becomes ready
+        self._deadline = None
+        self._interrupt_time = None
+        self._timed_out = False
+        self._fork_pid = None
+        self._fork_killed = False
+        self._run_output = {'stdout': [], 'stderr': []}
+        return run_id
+
+    def interrupt(self) -> None:
+        """
+        Ask the running code to stop by raising KeyboardInterrupt in it.
+
+        Output and figures produced so far are reported as usual. If the code
+        does not stop within INTERRUPT_GRACE_PERIOD, poll() kills the process;
+        a second call does it without waiting.
+        """
+        if self._active_run_id is None:
+            return
+        if self._interrupt_time is not None:
+            # Already asked once: make the grace period expire
+            self._interrupt_time -= INTERRUPT_GRACE_PERIOD
+            return
+
+        self._interrupt_time = time.monotonic()
+        self._send_interrupt()
+
+    def _send_interrupt(self) -> None:
+        """Send interrupt request for the active run through the control pipe."""
+        self._interrupt_sent_time = time.monotonic()
+        try:
+            self._control_conn.send({'type': 'interrupt', 'run_id': self._active_run_id})
+        except (AttributeError, EOFError, OSError):
+            pass
+
+    def poll(self) -> List[Dict]:
+        """
+        Collect events that arrived from the kernel without blocking.
+
+        If the kernel process died in the middle of a run, a synthetic result event
+        is returned for that run and the kernel is restarted.
+
+        Returns:
+            List of event dictionaries
+        """
+        events = []
+        if self._conn is None:
+            return events
+
+        try:
+            while self._conn.poll():
+                event = self._conn.recv()
+                if event.get('type') == 'ready':
+                    self.ready = True
+                elif event.get('type') == 'fork':
+                    if event.get('run_id') == self._active_run_id:
+                        self._fork_pid = event['pid']
+                    continue
+                elif event.get('type') == 'figure':
+                    self._shared_names.extend(buffer['shm'] for buffer in event['figure'].get('buffers', []))
+                elif event.get('type') == 'stream':
+                    if event.get('run_id') == self._active_run_id:
+                        self._run_output[event['name']].append(event['text'])
+                elif event.get('type') == 'result':
+                    self.run_count += 1
+                    self.last_rss = event['result'].get('worker_rss')
+                    if event.get('run_id') == self._checkpoint_run_id:
+                        checkpoint = event['result'].get('checkpoint')
+                        self.checkpoint_cell = checkpoint['cell'] if checkpoint else None
+                        self._checkpoint_run_id = None
+                    if event.get('run_id') == self._active_run_id:
+                        if self._fork_killed or event['result'].pop('output_streamed', False):
+                            # The kernel reports the killed variant (or a run whose result was
+                            # cut short by a repeated interrupt) without its output
+                            event['result']['stdout'] = ''.join(self._run_output['stdout'])
+                            event['result']['stderr'] = ''.join(self._run_output['stderr'])
+                        if self._timed_out:
+                            self._report_timeout(event['result'])
+                        self._active_run_id = None
+                        self._fork_pid = None
+                events.append(event)
+        except (EOFError, OSError):
+            # Pipe is broken - the process is gone, handled below
+            pass
+
+        if self._active_run_id is not None and not self.is_alive():
+            exit_code = self._process.exitcode if self._process else None
+            events.append(self._lost_run_result(
+                f"Execution kernel died unexpectedly (exit code {exit_code}). Kernel restarted."
+            ))
+            self.restart()
+        elif self._active_run_id is not None:
+            now = time.monotonic()
+            if self._timeout and self._deadline is None and self.ready:
+                self._deadline = now + self._timeout
+            if self._interrupt_time is None and self._deadline is not None and now >= self._deadline:
+                self._timed_out = True
+                self.interrupt()
+            elif self._interrupt_time is not None and now - self._interrupt_time >= INTERRUPT_GRACE_PERIOD:
+                events.extend(self._hard_stop())
+            elif self._interrupt_time is not None and now - self._interrupt_sent_time >= INTERRUPT_RETRY_INTERVAL:
+                self._send_interrupt()
+
+        return events
+
+    def _hard_stop(self) -> List[Dict]:
+        """Kill code that ignored the interrupt, returns the synthetic result if there is one."""
+        if self._fork_pid is not None:
+            # Only the variant is killed: the kernel reports it and keeps the checkpoint
+            self._kill_fork()
+            self._fork_killed = True
+            self._interrupt_time = time.monotonic()
+            return []
+
+        if self._timed_out:
+            message = f"Execution timed out after {self._timeout:g} s and did not stop. Kernel restarted."
+        else:
+            message = "Execution did not stop after interrupt. Kernel restarted."
+        event = self._lost_run_result(message)
+        self.restart()
+        return [event]
+
+    def _lost_run_result(self, exception: str) -> Dict:
+        """Create result event for the active run from the output received so far."""
+        event = {
+            'type': 'result',
+            'run_id': self._active_run_id,
+            'result': _failed_result(
+                exception,
+                stderr=''.join(self._run_output['stderr']),
+                stdout=''.join(self._run_output['stdout'])
+            )
+        }
+        self._active_run_id = None
+        return event
+
+    def _report_timeout(self, result: Dict) -> None:
+        """Replace the exception of a run stopped because of its timeout."""
+        message = f"Execution timed out after {self._timeout:g} s"
+        if result.get('interrupted'):
+            result['exception'] = message
+        elif result.get('exception'):
+            result['exception'] = f"{message}: {result['exception']}"
+
+    def _kill_fork(self) -> None:
+        """Kill the forked child of a variant run."""
+        if self._fork_pid is not None:
+            try:
+                os.kill(self._fork_pid, signal.SIGKILL)
+            except OSError:
+                pass
+            self._fork_pid = None
+
+    def reset_session(self) -> None:
+        """Drop the persistent session namespace in the kernel."""
+        if self._conn is not None and self.is_alive():
+            self._conn.send({'type': 'reset_session'})
+
+    def clear_cell_cache(self) -> None:
+        """Drop cached cell results in the kernel."""
+        if self._conn is not None and self.is_alive():
+            self._conn.send({'type': 'clear_cell_cache'})
+
+    def inspect_variable(self, path: List, start: int = 0, count: Optional[int] = None) -> None:
+        """
+        Ask for a page of children of a variable left by the last run.
+
+        The answer arrives through poll() as a 'variable_page' event (after the
+        running code, if any, finishes).
+
+        Args:
+            path: Variable name followed by child keys (see utils.variables)
+            start: Index of the first child
+            count: Number of children (None - VARIABLES_PAGE_SIZE)
+        """
+        from utils.variables import VARIABLES_PAGE_SIZE
+
+        if self._conn is not None and self.is_alive():
+            self._conn.send({'type': 'inspect', 'path': list(path), 'start': start,
+                             'count': count or VARIABLES_PAGE_SIZE})
+
+    def _unlink_shared(self) -> None:
+        """Remove shared memory blocks of received figures that are still there."""
+        from utils.shared_arrays import unlink_names
+
+        unlink_names(self._shared_names)
+        self._shared_names = []
+
+    def restart(self) -> None:
+        """Kill the kernel process and start a fresh one."""
+        self._kill()
+        self._active_run_id = None
+        self.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the kernel process.
+
+        Args:
+            wait: Wait for the process to exit (killing it after SHUTDOWN_TIMEOUT);
+                  if False, the process exits on its own and the call returns immediately
+        """
+        if self._conn is not None and self.is_alive():
+            try:
+                self._conn.send({'type': 'shutdown'})
+            except (EOFError, OSError):
+                pass
+            if not wait:
+                # Exited processes are reaped by multiprocessing when the next one starts
+                self._process = None
+            else:
+                self._process.join(SHUTDOWN_TIMEOUT)
+        self._kill()
+
+    def _kill(self) -> None:
+        """Terminate the process and close the pipes."""
+        # A forked variant would outlive the kernel
+        self._kill_fork()
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.kill()
+                self._process.join(SHUTDOWN_TIMEOUT)
+            self._process = None
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except OSError:
+                pass
+            self._conn = None
+        if self._control_conn is not None:
+            try:
+                self._control_conn.close()
+            except OSError:
+                pass
+            self._control_conn = None
+        # A killed kernel leaves its blocks behind
+        self._unlink_shared()
+        self.pid = None
+        self.ready = False
+        self.checkpoint_cell = None
@@ -0,0 +1,143 @@
+"""Module for moving matplotlib figures between the execution kernel and the GUI.
+
+The kernel renders each figure with Agg and sends the PNG together with the
+pickled figure. The GUI shows the image (RenderedFigure) and restores the
+Figure object only when it is made interactive.
+"""
+import io
+import pickle
+import warnings
+from typing import Dict, List, Optional
+
+import matplotlib.pyplot as plt
+
+from utils.shared_arrays import dumps_shared, loads_shared, map_buffers
+
+
+def render_figure(figure: plt.Figure) -> Dict:
+    """
+    Rasterize a figure into PNG with Agg.
+
+    Figures without their own layout engine get the tight layout, as the
+    plots panel always used.
+
+    Args:
+        figure: Figure object
+
+    Returns:
+        {'png': bytes, 'width': int, 'height': int} - image and its size in pixels
+    """
+    if figure.get_layout_engine() is None:
+        figure.set_layout_engine('tight')
+    buffer = io.BytesIO()
+    with warnings.catch_warnings():
+        # Tight layout warns about axes it can't fit, the image is drawn anyway
+        warnings.simplefilter('ignore', UserWarning)
+        figure.savefig(buffer, format='png', dpi=figure.dpi)
+    width, height = figure.get_size_inches() * figure.dpi
+    return {'png': buffer.getvalue(), 'width': int(round(width)), 'height': int(round(height))}
+
+
+def serialize_figure(figure: plt.Figure, blocks: Optional[List] = None, image: Optional[Dict] = None) -> Dict:
+    """
+    Convert a figure into a payload that can be sent through a pipe.
+
+    The figure is closed first so it is detached from pyplot: otherwise the
+    receiving side would register it with its own pyplot backend on unpickling.
+
+    Args:
+        figure: Figure object to serialize
+        blocks: List receiving shared memory blocks with large array data of the
+                figure (see utils.shared_arrays); the caller owns them and releases
+                them after the receiver mapped them. None - all data is pickled
+        image: Image of the figure from render_figure, sent along with it
+
+    Returns:
+        Dictionary with figure payload:
+        {
+            'pickle': bytes - pickled Figure object,
+            'buffers': list - descriptors of the data in shared memory (only with blocks),
+            'image': dict - only with image, PNG of the figure
+        }
+    """
+    plt.close(figure)
+    payload = {}
+    if image is not None:
+        payload['image'] = image
+    if blocks is None:
+        payload['pickle'] = pickle.dumps(figure, protocol=pickle.HIGHEST_PROTOCOL)
+    else:
+        payload['pickle'], payload['buffers'] = dumps_shared(figure, blocks)
+    return payload
+
+
+def deserialize_figure(payload: Dict) -> plt.Figure:
+    """
+    Restore a figure from a payload created by serialize_figure.
+
+    Data in shared memory is mapped, not copied: it stays available while the
+    figure exists, even after the sender released the blocks.
+
+    Args:
+        payload: Figure payload
+
+    Returns:
+        Figure object
+    """
+    if payload.get('buffers'):
+        return loads_shared(payload['pickle'], payload['buffers'])
+    return pickle.loads(payload['pickle'])
+
+
+class RenderedFigure:
+    """Figure received from the kernel: its image and the data to restore it on demand."""
+
+    def __init__(self, payload: Dict):
+        """
+        Initialize from a payload created by serialize_figure with an image.
+
+        Args:
+            payload: Figure payload
+        """
+        image = payload['image']
+        self.png: bytes = image['png']
+        self.width: int = image['width']
+        self.height: int = image['height']
+        self._pickle = payload['pickle']
+        # Mapped right away: the kernel may remove its blocks as soon as the run ends
+        self._buffers = map_buffers(payload.get('buffers', []))
+
+    def figure(self) -> plt.Figure:
+        """Restore the Figure object (a new one on every call)."""
+        return pickle.loads(self._pickle, buffers=self._buffers)
+
+
+def snapshot_figure(figure: plt.Figure) -> Dict:
+    """
+    Save a copy of a figure without closing it.
+
+    Unlike serialize_figure, the figure stays registered with pyplot and
+    restore_figure registers the copy with pyplot again (as a new figure number).
+
+    Args:
+        figure: Figure object
+
+    Returns:
+        Figure payload
+    """
+    return {
+        'pickle': pickle.dumps(figure, protocol=pickle.HIGHEST_PROTOCOL)
+    }
+
+
+def restore_figure(payload: Dict) -> plt.Figure:
+    """
+    Restore a figure saved by snapshot_figure into pyplot.
+
+    Args:
+        payload: Figure payload
+
+    Returns:
+        Figure object (registered with pyplot)
+    """
+    return pickle.loads(payload['pickle'])
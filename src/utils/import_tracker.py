@@ -0,0 +1,114 @@
+"""Module for recording which modules a run imports from the working directory.
+
+LocalImportTracker is a sys.meta_path finder installed for the duration of a run,
+right before the standard PathFinder. It finds specs with PathFinder itself (so the
+import works exactly as without it) and records modules whose source lies in the
+working directory, with the source path and its hash.
+"""
+import hashlib
+import os
+import sys
+from importlib.machinery import PathFinder
+from typing import Dict, List, Optional
+
+
+def source_hash(path: str) -> Optional[str]:
+    """
+    Compute hash of a source file.
+
+    Args:
+        path: File path
+
+    Returns:
+        SHA-256 hex digest or None if the file can't be read
+    """
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class LocalImport:
+    """Class for storing module imported from the working directory."""
+
+    def __init__(self, name: str, path: str, source_hash: Optional[str]):
+        """
+        Initialize record.
+
+        Args:
+            name: Module name
+            path: Absolute source file path
+            source_hash: Hash of the source when it was imported
+        """
+        self.name = name
+        self.path = path
+        self.source_hash = source_hash
+
+    def to_dict(self) -> Dict:
+        """Convert to a picklable dictionary {'name', 'path', 'hash'}."""
+        return {'name': self.name, 'path': self.path, 'hash': self.source_hash}
+
+    def __repr__(self):
+        return f"LocalImport({self.name}, {self.path})"
+
+
+class LocalImportTracker:
+    """
+    Context manager installing the finder that records local imports.
+
+    Usage:
+        with LocalImportTracker(directory) as tracker:
+            exec(code, namespace)
+        tracker.imports  # modules imported from directory during the run
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize tracker.
+
+        Args:
+            directory: Working directory of the run
+        """
+        self.directory = os.path.abspath(directory)
+        self._prefix = os.path.normcase(self.directory) + os.sep
+        # Module name -> record, in import order
+        self.imports: Dict[str, LocalImport] = {}
+
+    def __enter__(self):
+        # Right before PathFinder: built-in, frozen and custom finders keep their priority
+        position = len(sys.meta_path)
+        for index, finder in enumerate(sys.meta_path):
+            if finder is PathFinder:
+                position = index
+                break
+        sys.meta_path.insert(position, self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            pass
+        return False
+
+    def find_spec(self, fullname: str, path=None, target=None):
+        """Find module spec with PathFinder and record it if it comes from the working directory."""
+        spec = PathFinder.find_spec(fullname, path, target)
+        if spec is not None and isinstance(spec.origin, str) and spec.origin.endswith('.py'):
+            origin = os.path.abspath(spec.origin)
+            if os.path.normcase(origin).startswith(self._prefix):
+                self.imports[fullname] = LocalImport(fullname, origin, source_hash(origin))
+        return spec
+
+    def invalidate_caches(self) -> None:
+        """Caches belong to PathFinder, it is invalidated by importlib itself."""
+
+    def records(self) -> List[Dict]:
+        """
+        Get recorded imports as dictionaries.
+
+        Returns:
+            [{'name', 'path', 'hash'}, ...] in import order
+        """
+        return [record.to_dict() for record in self.imports.values()]
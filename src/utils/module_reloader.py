@@ -0,0 +1,305 @@
+"""Module for reloading changed modules of the working directory.
+
+Scripts import helper modules from their directory; the kernel keeps them in
+sys.modules between runs, so an edited helper has to be reloaded. The reloader
+keeps an index of such modules (recorded during runs by LocalImportTracker, see
+utils.import_tracker) with the mtime, size and hash of their source files and the
+import graph between them (from the imports in their source). Before a run only
+modules whose file changed are reloaded, together with the modules importing them,
+dependencies first. A file with a new mtime but the same content is not reloaded.
+"""
+import ast
+import importlib
+import os
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.import_tracker import source_hash
+
+
+class ModuleRecord:
+    """Class for storing indexed local module."""
+
+    def __init__(self, name: str, path: str, stat: Tuple[int, int], source_hash: Optional[str],
+                 imports: Set[str]):
+        """
+        Initialize record.
+
+        Args:
+            name: Module name in sys.modules
+            path: Source file path
+            stat: (mtime in nanoseconds, size) of the source when it was loaded
+            source_hash: Hash of the source when it was loaded
+            imports: Names of modules imported by the source (not resolved to local ones)
+        """
+        self.name = name
+        self.path = path
+        self.stat = stat
+        self.source_hash = source_hash
+        self.imports = imports
+
+    def __repr__(self):
+        return f"ModuleRecord({self.name}, {self.path})"
+
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    """Get (mtime in nanoseconds, size) of a file or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _module_source(module) -> Optional[str]:
+    """Get path of the .py source of a module (None for built-in, compiled and namespace modules)."""
+    spec = getattr(module, '__spec__', None)
+    path = getattr(spec, 'origin', None) if spec is not None else None
+    if not path:
+        path = getattr(module, '__file__', None)
+    if not isinstance(path, str) or not path.endswith('.py'):
+        return None
+    return path
+
+
+def parse_imports(path: str, module_name: str, is_package: bool = False) -> Set[str]:
+    """
+    Collect names of modules imported by a source file.
+
+    Args:
+        path: Source file path
+        module_name: Name of the module
+        is_package: The source is a package __init__
+
+    Returns:
+        Absolute module names (an unreadable file gives an empty set)
+    """
+    try:
+        with open(path, 'rb') as f:
+            source = f.read()
+    except OSError:
+        return set()
+    return parse_source_imports(source, module_name, is_package)
+
+
+def parse_source_imports(source, module_name: str = '__main__', is_package: bool = False) -> Set[str]:
+    """
+    Collect names of modules imported by source code.
+
+    For "import a.b" both "a" and "a.b" are collected, for "from a import b" -
+    "a" and "a.b" (b may be a submodule). Relative imports are resolved against
+    the module's package.
+
+    Args:
+        source: Source code (str or bytes)
+        module_name: Name of the module
+        is_package: The source is a package __init__
+
+    Returns:
+        Absolute module names (invalid source gives an empty set)
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+
+    package = module_name if is_package else module_name.rpartition('.')[0]
+    names: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                parts = alias.name.split('.')
+                names.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base_parts = package.split('.') if package else []
+                if node.level - 1 > len(base_parts):
+                    continue
+                base = '.'.join(base_parts[:len(base_parts) - (node.level - 1)])
+                base = f"{base}.{node.module}" if node.module and base else (node.module or base)
+            else:
+                base = node.module
+            if not base:
+                continue
+            parts = base.split('.')
+            names.update('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+            names.update(f"{base}.{alias.name}" for alias in node.names if alias.name != '*')
+    return names
+
+
+class ModuleReloader:
+    """Index of modules loaded from the working directory with dependency-aware reloading."""
+
+    def __init__(self):
+        """Initialize reloader."""
+        # Module name -> record of modules loaded from working directories
+        self.modules: Dict[str, ModuleRecord] = {}
+
+    def add_module(self, name: str, path: str, source_hash_value: Optional[str] = None) -> None:
+        """
+        Index a module loaded from a source file.
+
+        Args:
+            name: Module name in sys.modules
+            path: Absolute source file path
+            source_hash_value: Hash of the source it was loaded from (None - hash the file now)
+        """
+        stat = _file_stat(path)
+        if stat is None:
+            return
+        if source_hash_value is None:
+            source_hash_value = source_hash(path)
+        is_package = os.path.basename(path) == '__init__.py'
+        self.modules[name] = ModuleRecord(name, path, stat, source_hash_value,
+                                          parse_imports(path, name, is_package))
+
+    def add_imports(self, imports: Iterable[Dict]) -> None:
+        """
+        Index modules recorded by LocalImportTracker during a run.
+
+        Args:
+            imports: [{'name', 'path', 'hash'}, ...]; modules that failed to import are skipped
+        """
+        for record in imports:
+            if record['name'] in sys.modules:
+                self.add_module(record['name'], record['path'], record['hash'])
+
+    def dependencies(self, name: str) -> Set[str]:
+        """
+        Get indexed modules imported by a module.
+
+        Args:
+            name: Module name
+
+        Returns:
+            Names of indexed modules the module depends on
+        """
+        record = self.modules.get(name)
+        if record is None:
+            return set()
+        return {imported for imported in record.imports if imported in self.modules and imported != name}
+
+    def changed_modules(self, directory: Optional[str] = None) -> List[str]:
+        """
+        Find indexed modules whose source changed since they were loaded.
+
+        Modules removed from sys.modules or whose files were deleted are dropped from the index.
+
+        Args:
+            directory: Check only modules from this directory (None - all indexed modules)
+
+        Returns:
+            Names of changed modules
+        """
+        prefix = os.path.normcase(os.path.abspath(directory)) + os.sep if directory else None
+        changed = []
+        for name, record in list(self.modules.items()):
+            if prefix is not None and not os.path.normcase(record.path).startswith(prefix):
+                continue
+            if name not in sys.modules:
+                self._forget(name)
+                continue
+            stat = _file_stat(record.path)
+            if stat is None:
+                self._forget(name)
+            elif stat != record.stat:
+                # Saved without changes: only the stat is updated
+                if record.source_hash is not None and source_hash(record.path) == record.source_hash:
+                    record.stat = stat
+                else:
+                    changed.append(name)
+        return changed
+
+    def local_dependencies(self, code: str) -> List[str]:
+        """
+        Get indexed modules a script depends on, directly or through other local modules.
+
+        Args:
+            code: Script source
+
+        Returns:
+            Module names sorted by name
+        """
+        found: Set[str] = set()
+        stack = [name for name in parse_source_imports(code) if name in self.modules]
+        while stack:
+            name = stack.pop()
+            if name not in found:
+                found.add(name)
+                stack.extend(self.dependencies(name))
+        return sorted(found)
+
+    def reload_order(self, changed: Iterable[str]) -> List[str]:
+        """
+        Get modules to reload for the changed ones: them and all their dependents,
+        dependencies before the modules importing them.
+
+        Args:
+            changed: Names of changed modules
+
+        Returns:
+            Module names in reload order
+        """
+        dependents: Dict[str, Set[str]] = {name: set() for name in self.modules}
+        for name in self.modules:
+            for dependency in self.dependencies(name):
+                dependents[dependency].add(name)
+
+        # Changed modules and everything that imports them, directly or not
+        affected: Set[str] = set()
+        stack = [name for name in changed if name in self.modules]
+        while stack:
+            name = stack.pop()
+            if name not in affected:
+                affected.add(name)
+                stack.extend(dependents[name])
+
+        # Topological order (import cycles are broken at the first module reached)
+        order: List[str] = []
+        visited: Set[str] = set()
+
+        def visit(name: str) -> None:
+            visited.add(name)
+            for dependency in sorted(self.dependencies(name) & affected):
+                if dependency not in visited:
+                    visit(dependency)
+            order.append(name)
+
+        for name in sorted(affected):
+            if name not in visited:
+                visit(name)
+        return order
+
+    def reload_changed(self, directory: Optional[str] = None) -> List[str]:
+        """
+        Reload changed modules and their dependents.
+
+        Modules are found through sys.path on reload, so only modules of a directory
+        that is on sys.path (the working directory of the run) should be reloaded.
+        A module that fails to import with SyntaxError stops reloading and the error
+        propagates (the run reports it); its record is not updated, so it is retried next time.
+
+        Args:
+            directory: Reload only modules changed in this directory (None - all indexed modules)
+
+        Returns:
+            Names of reloaded modules
+        """
+        reloaded = []
+        for name in self.reload_order(self.changed_modules(directory)):
+            module = sys.modules.get(name)
+            if module is None:
+                self._forget(name)
+                continue
+            try:
+                importlib.reload(module)
+            except (ImportError, AttributeError, TypeError, ValueError):
+                # Some modules can't be reloaded (e.g. deleted or replaced in sys.modules)
+                continue
+            self.add_module(name, self.modules[name].path)
+            reloaded.append(name)
+        return reloaded
+
+    def _forget(self, name: str) -> None:
+        """Drop a module from the index (it is recorded again if imported later)."""
+        self.modules.pop(name, None)
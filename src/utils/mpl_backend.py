@@ -0,0 +1,65 @@
+"""Matplotlib backend of the code executor: Agg rendering, figures handed over on show().
+
+Selected by utils.code_executor with matplotlib.use(BACKEND). It has no windows
+and never touches Tk: plt.show() (and Figure.show()) pass the shown figures to
+the sink installed with figure_sink() and close them, as notebooks do, so the
+execution kernel can send each figure as soon as the script shows it. Without
+a sink show() does nothing and figures stay open for the executor to collect
+after the run.
+"""
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from matplotlib import _pylab_helpers
+from matplotlib.backend_bases import FigureManagerBase
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+
+# Name of this backend for matplotlib.use()
+BACKEND = "module://utils.mpl_backend"
+
+# Callback receiving shown figures (None - show() does nothing)
+_sink: Optional[Callable[[Figure], None]] = None
+
+
+@contextmanager
+def figure_sink(sink: Callable[[Figure], None]):
+    """
+    Hand figures shown inside the block to a callback.
+
+    Args:
+        sink: Callback receiving each shown figure; the figure is closed in
+              pyplot after it returns (the callback may keep using it)
+    """
+    global _sink
+    previous = _sink
+    _sink = sink
+    try:
+        yield
+    finally:
+        _sink = previous
+
+
+class FigureManager(FigureManagerBase):
+    """Figure manager without a window: showing a figure hands it to the sink."""
+
+    def show(self):
+        if _sink is None:
+            return
+        try:
+            _sink(self.canvas.figure)
+        finally:
+            # The next plt.plot() starts a new figure
+            _pylab_helpers.Gcf.destroy(self)
+
+    @classmethod
+    def pyplot_show(cls, *, block=None):
+        for manager in sorted(_pylab_helpers.Gcf.get_all_fig_managers(), key=lambda manager: manager.num):
+            manager.show()
+
+
+class FigureCanvas(FigureCanvasAgg):
+    """Agg canvas managed by FigureManager."""
+
+    manager_class = FigureManager
@@ -0,0 +1,445 @@
+"""Module for capturing stdout/stderr of executed code and streaming it in chunks.
+
+Captured text is bounded: a stream keeps its first OUTPUT_HEAD_CHARS and last
+OUTPUT_TAIL_CHARS characters in memory. When a stream outgrows them, its whole
+text is written to a spill file in the temp directory and the text in between is
+replaced with an omission marker (see omission_marker). Spill files belong to
+whoever receives the result: they are listed in the result's 'output_spill'
+and removed with remove_spill_files().
+"""
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Minimal interval between two chunks sent to the output callback (seconds)
+FLUSH_INTERVAL = 0.05
+
+# Characters of a stream kept in memory from its beginning and its end
+OUTPUT_HEAD_CHARS = 256 * 1024
+OUTPUT_TAIL_CHARS = 256 * 1024
+# Characters of the latest output shown while code runs once the head is streamed
+STREAM_TAIL_CHARS = 64 * 1024
+
+# Prefix of spill files in the temp directory
+SPILL_FILE_PREFIX = "pyculator-output-"
+
+# Size of a page of LogPager (bytes, pages end at line breaks)
+LOG_PAGE_BYTES = 64 * 1024
+
+
+def omission_marker(name: str, omitted_lines: int) -> str:
+    """
+    Line that replaces the omitted middle of a stream.
+
+    Markers of different streams differ, so each one can be found in the output.
+
+    Args:
+        name: Stream name ("stdout" or "stderr")
+        omitted_lines: Number of omitted lines
+
+    Returns:
+        Marker line with line breaks around it
+    """
+    return f"\n… {omitted_lines} lines of {name} omitted — open full log …\n"
+
+
+def remove_spill_files(spills: Optional[Dict]) -> None:
+    """
+    Remove spill files of a result.
+
+    Args:
+        spills: 'output_spill' of a result: {stream name: {'path', ...}} (None - nothing to remove)
+    """
+    for info in (spills or {}).values():
+        try:
+            os.remove(info['path'])
+        except OSError:
+            pass
+
+
+class BoundedText:
+    """
+    Text of one stream with a bounded head and tail in memory.
+
+    The head takes the first head_limit characters, then text goes to the tail;
+    characters pushed out of the tail are counted as omitted. On the first
+    omission the whole text so far is written to a spill file, which then
+    receives every following write, so the file always holds the full text.
+    """
+
+    def __init__(self, name: str, head_limit: int = OUTPUT_HEAD_CHARS, tail_limit: int = OUTPUT_TAIL_CHARS):
+        """
+        Initialize text.
+
+        Args:
+            name: Stream name (used in the spill file name)
+            head_limit: Characters kept from the beginning
+            tail_limit: Characters kept from the end
+        """
+        self.name = name
+        self.head_limit = head_limit
+        self.tail_limit = tail_limit
+        self._head: List[str] = []
+        self._head_size = 0
+        self._tail: deque = deque()
+        self._tail_size = 0
+        # Total number of characters written
+        self.size = 0
+        self.omitted_chars = 0
+        self.omitted_lines = 0
+        self.spill_path: Optional[str] = None
+        self._spill_file = None
+
+    def write(self, text: str) -> None:
+        """Append text."""
+        self.size += len(text)
+        if self._spill_file is not None:
+            self._spill_file.write(text)
+
+        if self._head_size < self.head_limit:
+            part = text[:self.head_limit - self._head_size]
+            self._head.append(part)
+            self._head_size += len(part)
+            text = text[len(part):]
+            if not text:
+                return
+
+        self._tail.append(text)
+        self._tail_size += len(text)
+        if self._tail_size <= self.tail_limit:
+            return
+        if self._spill_file is None:
+            self._open_spill()
+        # Push the oldest tail text out
+        excess = self._tail_size - self.tail_limit
+        while excess > 0:
+            part = self._tail[0]
+            if len(part) <= excess:
+                self._tail.popleft()
+                dropped = part
+            else:
+                self._tail[0] = part[excess:]
+                dropped = part[:excess]
+            excess -= len(dropped)
+            self._tail_size -= len(dropped)
+            self.omitted_chars += len(dropped)
+            self.omitted_lines += dropped.count('\n')
+
+    def _open_spill(self) -> None:
+        """Create the spill file with the text written so far."""
+        descriptor, self.spill_path = tempfile.mkstemp(prefix=f"{SPILL_FILE_PREFIX}{self.name}-", suffix=".log")
+        # newline='' keeps offsets of LogPager equal to the written text
+        self._spill_file = open(descriptor, 'w', encoding='utf-8', errors='backslashreplace', newline='')
+        self._spill_file.write(''.join(self._head))
+        self._spill_file.write(''.join(self._tail))
+
+    def close(self) -> None:
+        """Close the spill file (it stays on disk)."""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def getvalue(self, start: int = 0) -> str:
+        """
+        Get text kept in memory.
+
+        Args:
+            start: Position in the full text (characters written before it are skipped)
+
+        Returns:
+            Text from the position; an omitted part is replaced with omission_marker()
+        """
+        parts = []
+        if start < self._head_size:
+            parts.append(''.join(self._head)[start:])
+        tail_start = self._head_size + self.omitted_chars
+        if self.omitted_chars and start < tail_start:
+            parts.append(omission_marker(self.name, self.omitted_lines))
+        tail = ''.join(self._tail)
+        parts.append(tail[max(0, start - tail_start):])
+        return ''.join(parts)
+
+    def spill_info(self) -> Optional[Dict]:
+        """Description of the spill file: {'path', 'size', 'omitted_chars', 'omitted_lines'} (None - no spill)."""
+        if self.spill_path is None:
+            return None
+        return {
+            'path': self.spill_path,
+            'size': self.size,
+            'omitted_chars': self.omitted_chars,
+            'omitted_lines': self.omitted_lines,
+        }
+
+
+class LogPager:
+    """
+    Reads a large text file page by page without indexing it.
+
+    Page n starts at the first line break after n * page_bytes (or at that byte,
+    moved back to a character boundary, if the line is longer than a page),
+    so any page is read with one seek.
+    """
+
+    def __init__(self, path: str, page_bytes: int = LOG_PAGE_BYTES):
+        """
+        Initialize pager.
+
+        Args:
+            path: Path of a UTF-8 text file
+            page_bytes: Approximate page size in bytes
+        """
+        self.path = path
+        self.page_bytes = page_bytes
+        self.size = os.path.getsize(path)
+
+    @property
+    def page_count(self) -> int:
+        """Number of pages (at least 1)."""
+        return max(1, -(-self.size // self.page_bytes))
+
+    def _page_start(self, f, page: int) -> int:
+        """Byte offset where a page starts."""
+        offset = page * self.page_bytes
+        if offset <= 0:
+            return 0
+        if offset >= self.size:
+            return self.size
+        f.seek(offset - 1)
+        data = f.read(self.page_bytes + 1)
+        newline = data.find(b'\n')
+        if newline != -1:
+            return offset + newline
+        # No line break within a page: cut at a character boundary
+        f.seek(offset)
+        while offset > 0 and (f.read(1)[0] & 0xC0) == 0x80:
+            offset -= 1
+            f.seek(offset)
+        return offset
+
+    def read_page(self, page: int) -> str:
+        """
+        Read a page.
+
+        Args:
+            page: Page index from 0
+
+        Returns:
+            Text of the page
+        """
+        page = min(max(0, page), self.page_count - 1)
+        with open(self.path, 'rb') as f:
+            start = self._page_start(f, page)
+            end = self._page_start(f, page + 1) if page + 1 < self.page_count else self.size
+            f.seek(start)
+            return f.read(max(0, end - start)).decode('utf-8', errors='replace')
+
+
+class _CaptureStream(io.TextIOBase):
+    """File-like object that forwards writes to OutputCapture."""
+
+    def __init__(self, owner: "OutputCapture", name: str):
+        """
+        Initialize stream.
+
+        Args:
+            owner: Capture that stores the text
+            name: Stream name ("stdout" or "stderr")
+        """
+        super().__init__()
+        self._owner = owner
+        self._name = name
+
+    @property
+    def name(self) -> str:
+        """Stream name."""
+        return self._name
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+        self._owner._write(self._name, text)
+        return len(text)
+
+    def flush(self) -> None:
+        # Chunks are sent on the flush interval, explicit flush only pushes pending text
+        self._owner.flush()
+
+    def getvalue(self) -> str:
+        """Get all text written to this stream."""
+        return self._owner.getvalue(self._name)
+
+
+class OutputCapture:
+    """
+    Captures stdout and stderr text and forwards it in time-coalesced chunks.
+
+    Writes are kept for the final result in BoundedText buffers. When on_output is
+    set, new text is also collected into pending chunks which are sent at most once
+    per flush_interval: by the writing thread if the interval has passed, otherwise
+    by a background flusher thread, so that a single print before a long computation
+    still shows up. Past the head of a stream only its latest stream_tail_limit
+    characters are sent with each chunk: the live view becomes a rolling tail
+    (see MarkdownOutputDisplay.append_stdout) and the full text comes with the result.
+    """
+
+    def __init__(self, on_output: Optional[Callable[[str, str], None]] = None,
+                 flush_interval: float = FLUSH_INTERVAL,
+                 head_limit: int = OUTPUT_HEAD_CHARS, tail_limit: int = OUTPUT_TAIL_CHARS,
+                 stream_tail_limit: int = STREAM_TAIL_CHARS):
+        """
+        Initialize capture.
+
+        Args:
+            on_output: Callback (stream_name, text) for streamed chunks (None - no streaming)
+            flush_interval: Minimal interval between chunks in seconds
+            head_limit: Characters of a stream kept (and streamed in full) from its beginning
+            tail_limit: Characters of a stream kept from its end
+            stream_tail_limit: Characters of a chunk sent past the head (older text of the chunk is dropped)
+        """
+        self.on_output = on_output
+        self.flush_interval = flush_interval
+        self.stream_tail_limit = stream_tail_limit
+
+        self.stdout = _CaptureStream(self, "stdout")
+        self.stderr = _CaptureStream(self, "stderr")
+
+        self._texts = {name: BoundedText(name, head_limit, tail_limit) for name in ("stdout", "stderr")}
+        # Pending chunks in write order: list of [stream_name, text, characters of the head in text]
+        self._pending: List[List[str]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        # Serializes callback calls so chunks are delivered in order
+        self._send_lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "OutputCapture":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Start background flushing (only needed when streaming)."""
+        if self.on_output is None or self._flusher is not None:
+            return
+        self._stop_event.clear()
+        self._flusher = threading.Thread(target=self._flush_loop, name="output-flusher", daemon=True)
+        self._flusher.start()
+
+    def stop(self) -> None:
+        """Stop background flushing, send the remaining text and close spill files."""
+        if self._flusher is not None:
+            self._stop_event.set()
+            self._flusher.join()
+            self._flusher = None
+        self.flush()
+        with self._lock:
+            for text in self._texts.values():
+                text.close()
+
+    def getvalue(self, name: str = "stdout", start: int = 0) -> str:
+        """
+        Get captured text of a stream.
+
+        Args:
+            name: Stream name ("stdout" or "stderr")
+            start: Position returned by position() (text written before it is skipped)
+
+        Returns:
+            Captured text, an omitted middle is replaced with omission_marker()
+        """
+        with self._lock:
+            return self._texts[name].getvalue(start)
+
+    def position(self, name: str = "stdout") -> int:
+        """
+        Get number of characters written to a stream.
+
+        Args:
+            name: Stream name ("stdout" or "stderr")
+
+        Returns:
+            Position for getvalue()
+        """
+        with self._lock:
+            return self._texts[name].size
+
+    def spill_info(self) -> Dict[str, Dict]:
+        """
+        Get spill files of streams that outgrew the memory limits.
+
+        Returns:
+            {stream name: {'path', 'size', 'omitted_chars', 'omitted_lines'}}
+        """
+        with self._lock:
+            spills = {name: text.spill_info() for name, text in self._texts.items()}
+        return {name: info for name, info in spills.items() if info is not None}
+
+    def flush(self) -> None:
+        """Send pending chunks to the callback."""
+        with self._send_lock:
+            chunks = self._take_pending()
+            self._send(chunks)
+
+    def _write(self, name: str, text: str) -> None:
+        """Store text and send pending chunks if the flush interval has passed."""
+        if not text:
+            return
+        with self._lock:
+            bounded = self._texts[name]
+            # Characters of the text that belong to the head of the stream (all of them are sent)
+            head_chars = min(len(text), max(0, bounded.head_limit - bounded.size))
+            bounded.write(text)
+            if self.on_output is None:
+                return
+            # Merge with the previous chunk of the same stream
+            if self._pending and self._pending[-1][0] == name:
+                self._pending[-1][1] += text
+                self._pending[-1][2] += head_chars
+            else:
+                self._pending.append([name, text, head_chars])
+            _, chunk, head_chars = self._pending[-1]
+            if len(chunk) - head_chars > self.stream_tail_limit:
+                # Past the head only the latest text is shown live, the whole text comes with the result
+                self._pending[-1][1] = chunk[:head_chars] + chunk[-self.stream_tail_limit:]
+            due = time.monotonic() - self._last_flush >= self.flush_interval
+
+        if due:
+            self.flush()
+
+    def _take_pending(self) -> List[Tuple[str, str]]:
+        """Take pending chunks and reset flush timer."""
+        with self._lock:
+            chunks = [(name, text) for name, text, _ in self._pending]
+            self._pending = []
+            self._last_flush = time.monotonic()
+        return chunks
+
+    def _send(self, chunks: List[Tuple[str, str]]) -> None:
+        """Pass chunks to the callback, errors in the callback never reach user code."""
+        if self.on_output is None:
+            return
+        for name, text in chunks:
+            try:
+                self.on_output(name, text)
+            except Exception:
+                pass
+
+    def _flush_loop(self) -> None:
+        """Periodically send text that was not sent by writers."""
+        while not self._stop_event.wait(self.flush_interval):
+            with self._lock:
+                due = bool(self._pending) and time.monotonic() - self._last_flush >= self.flush_interval
+            if due:
+                self.flush()
@@ -0,0 +1,100 @@
+"""Module for measuring memory usage of the current process."""
+import os
+import sys
+from typing import Optional
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    # Windows has no resource module
+    RESOURCE_AVAILABLE = False
+
+
+def current_rss() -> Optional[int]:
+    """
+    Get resident set size of the current process.
+
+    Returns:
+        RSS in bytes or None if it can't be determined on this platform
+    """
+    # Linux: second field of /proc/self/statm is resident pages
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Windows: working set from GetProcessMemoryInfo
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+        except Exception:
+            pass
+        return None
+
+    # Other POSIX systems: only the peak is available
+    return peak_rss()
+
+
+def peak_rss() -> Optional[int]:
+    """
+    Get peak resident set size of the current process.
+
+    On Linux the peak can be reset with reset_peak_rss(), on other systems
+    it is the peak over the process lifetime.
+
+    Returns:
+        Peak RSS in bytes or None if it can't be determined on this platform
+    """
+    # Linux: VmHWM ("high water mark") from /proc/self/status, in kilobytes
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    if not RESOURCE_AVAILABLE:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset peak RSS of the current process to its current RSS (Linux only).
+
+    Returns:
+        True if the peak was reset
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
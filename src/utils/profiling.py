@@ -0,0 +1,490 @@
+"""Module for profiling user code executed by CodeExecutor.
+
+A profiler is a context manager wrapped around execution of the script.
+After the run report() returns a picklable dictionary that is sent to the GUI
+with the result and rendered there by format_profile().
+
+Profilers:
+- "cpu" - functions, cProfile;
+- "lines" - hit count and time of each script line, sys.monitoring on Python 3.12+
+  and sys.settrace on older versions;
+- "memory" - allocation sites and peak traced memory, tracemalloc.
+"""
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from utils.value_repr import format_size
+
+
+# Number of rows shown in the profile table
+MAX_PROFILE_ROWS = 30
+
+# File name of code executed from the editor (not '<string>': code generated by
+# dataclasses, namedtuple or exec() gets that name and would be taken for the script)
+SCRIPT_FILENAME = '<pyculator-script>'
+
+# Frames stored for each allocation: enough to reach the script line through library calls
+MEMORY_TRACE_FRAMES = 32
+
+# Allocations of the profiling machinery and pyculator itself, not shown in memory profiles
+_MEMORY_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, os.path.join(os.path.dirname(os.path.abspath(__file__)), "*")),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+
+class CpuProfiler:
+    """Function-level profiler based on cProfile."""
+
+    kind = 'cpu'
+
+    def __init__(self):
+        """Initialize profiler."""
+        self._profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self._profiler.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._profiler.disable()
+        return False
+
+    def report(self) -> Dict:
+        """
+        Collect profile of the run.
+
+        Returns:
+            Dictionary:
+            {
+                'kind': 'cpu',
+                'total_time': float - total time of profiled calls (seconds),
+                'function_count': int - number of profiled functions,
+                'rows': list - top functions by cumulative time:
+                        [{'function', 'calls', 'primitive_calls', 'self_time', 'cumulative_time'}, ...],
+                'prof_data': bytes - stats in the .prof file format (pstats / snakeviz)
+            }
+        """
+        stats = pstats.Stats(self._profiler)
+        rows = []
+        for (filename, line, name), (primitive_calls, calls, self_time, cumulative_time, _) in stats.stats.items():
+            if '_lsprof.Profiler' in name or filename == __file__:
+                # The profiler's own calls
+                continue
+            rows.append({
+                'function': _function_label(filename, line, name),
+                'calls': calls,
+                'primitive_calls': primitive_calls,
+                'self_time': self_time,
+                'cumulative_time': cumulative_time
+            })
+        rows.sort(key=lambda row: row['cumulative_time'], reverse=True)
+
+        return {
+            'kind': self.kind,
+            'total_time': stats.total_tt,
+            'function_count': len(rows),
+            'rows': rows[:MAX_PROFILE_ROWS],
+            # Same content as written by pstats.Stats.dump_stats
+            'prof_data': marshal.dumps(stats.stats)
+        }
+
+
+class LineProfiler:
+    """
+    Line-level profiler of the script executed from the editor.
+
+    Only code compiled from the script (file name SCRIPT_FILENAME) is measured.
+    Time of a line is the time until the next line of the same frame starts,
+    so it includes functions called from it (like line_profiler).
+    """
+
+    kind = 'lines'
+
+    def __init__(self):
+        """Initialize profiler."""
+        self.backend = 'sys.monitoring' if hasattr(sys, 'monitoring') else 'settrace'
+        self._hits: Dict[int, int] = defaultdict(int)
+        self._times: Dict[int, float] = defaultdict(float)
+        # Frame (settrace) or call stack entry (sys.monitoring) -> (current line, its start time)
+        self._current: Dict[object, Tuple[int, float]] = {}
+        # Call stack of script frames being executed (sys.monitoring)
+        self._stack: List[object] = []
+        self._total_start = 0.0
+        self._total_time = 0.0
+
+    def __enter__(self):
+        self._total_start = time.perf_counter()
+        if self.backend == 'sys.monitoring' and sys.monitoring.get_tool(sys.monitoring.PROFILER_ID) is not None:
+            # Another profiler (e.g. a debugger or coverage tool) holds the tool ID
+            self.backend = 'settrace'
+        if self.backend == 'sys.monitoring':
+            self._start_monitoring()
+        else:
+            self._previous_trace = sys.gettrace()
+            sys.settrace(self._trace_call)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.backend == 'sys.monitoring':
+            self._stop_monitoring()
+        else:
+            sys.settrace(self._previous_trace)
+        now = time.perf_counter()
+        # Frames interrupted by an exception still hold their last line
+        for line, start in self._current.values():
+            self._times[line] += now - start
+        self._current.clear()
+        self._total_time = now - self._total_start
+        return False
+
+    def _enter_line(self, key, line: int) -> None:
+        """Finish the previous line of a frame and start the next one."""
+        now = time.perf_counter()
+        previous = self._current.get(key)
+        if previous is not None:
+            self._times[previous[0]] += now - previous[1]
+        self._current[key] = (line, now)
+        self._hits[line] += 1
+
+    def _leave_frame(self, key) -> None:
+        """Finish the last line of a frame."""
+        previous = self._current.pop(key, None)
+        if previous is not None:
+            self._times[previous[0]] += time.perf_counter() - previous[1]
+
+    # sys.settrace backend
+
+    def _trace_call(self, frame, event, arg):
+        """Global trace function: trace only frames of the script."""
+        if frame.f_code.co_filename != SCRIPT_FILENAME:
+            return None
+        return self._trace_line
+
+    def _trace_line(self, frame, event, arg):
+        """Local trace function of a script frame."""
+        if event == 'line':
+            self._enter_line(frame, frame.f_lineno)
+        elif event == 'return':
+            self._leave_frame(frame)
+        return self._trace_line
+
+    # sys.monitoring backend (Python 3.12+)
+
+    def _start_monitoring(self) -> None:
+        monitoring = sys.monitoring
+        events = monitoring.events
+        tool = monitoring.PROFILER_ID
+        monitoring.use_tool_id(tool, "pyculator")
+        # Locations disabled during a previous run must report again
+        monitoring.restart_events()
+        monitoring.register_callback(tool, events.PY_START, self._on_start)
+        monitoring.register_callback(tool, events.PY_RESUME, self._on_start)
+        monitoring.register_callback(tool, events.PY_RETURN, self._on_leave)
+        monitoring.register_callback(tool, events.PY_YIELD, self._on_leave)
+        monitoring.register_callback(tool, events.PY_UNWIND, self._on_unwind)
+        monitoring.register_callback(tool, events.LINE, self._on_line)
+        monitoring.set_events(
+            tool,
+            events.PY_START | events.PY_RESUME | events.PY_RETURN | events.PY_YIELD
+            | events.PY_UNWIND | events.LINE
+        )
+
+    def _stop_monitoring(self) -> None:
+        monitoring = sys.monitoring
+        tool = monitoring.PROFILER_ID
+        monitoring.set_events(tool, 0)
+        for event in (monitoring.events.PY_START, monitoring.events.PY_RESUME, monitoring.events.PY_RETURN,
+                      monitoring.events.PY_YIELD, monitoring.events.PY_UNWIND, monitoring.events.LINE):
+            monitoring.register_callback(tool, event, None)
+        monitoring.free_tool_id(tool)
+
+    def _on_start(self, code, instruction_offset):
+        if code.co_filename != SCRIPT_FILENAME:
+            # Library code: stop reporting this location
+            return sys.monitoring.DISABLE
+        self._stack.append(object())
+
+    def _on_leave(self, code, instruction_offset, retval):
+        if code.co_filename != SCRIPT_FILENAME:
+            return sys.monitoring.DISABLE
+        if self._stack:
+            self._leave_frame(self._stack.pop())
+
+    def _on_unwind(self, code, instruction_offset, exception):
+        # PY_UNWIND can't be disabled per location
+        if code.co_filename == SCRIPT_FILENAME and self._stack:
+            self._leave_frame(self._stack.pop())
+
+    def _on_line(self, code, line_number):
+        if code.co_filename != SCRIPT_FILENAME:
+            return sys.monitoring.DISABLE
+        if not self._stack:
+            # Started before monitoring was enabled (the top-level code of the script)
+            self._stack.append(object())
+        self._enter_line(self._stack[-1], line_number)
+
+    def report(self) -> Dict:
+        """
+        Collect line profile of the run.
+
+        Returns:
+            Dictionary:
+            {
+                'kind': 'lines',
+                'backend': str - 'sys.monitoring' or 'settrace',
+                'total_time': float - wall time of the run (seconds),
+                'lines': list - [(line number, hits, time in seconds), ...] sorted by line
+            }
+        """
+        return {
+            'kind': self.kind,
+            'backend': self.backend,
+            'total_time': self._total_time,
+            'lines': [(line, self._hits[line], self._times[line]) for line in sorted(self._hits)]
+        }
+
+
+class MemoryProfiler:
+    """
+    Memory profiler based on tracemalloc.
+
+    Allocations are attributed to the most recent line of the script in their
+    traceback (np.ones(...) is reported at the script line calling it, not inside
+    numpy); allocations made outside the script keep their own location.
+    Only memory allocated while tracing is seen, so in a persistent session
+    tracing can be kept on between runs (keep_tracing) and the allocation sites
+    of the previous run passed as baseline: the report then shows how memory held
+    by each line changed.
+    """
+
+    kind = 'memory'
+
+    def __init__(self, baseline: Optional[Dict[str, Tuple[int, int]]] = None, keep_tracing: bool = False):
+        """
+        Initialize profiler.
+
+        Args:
+            baseline: Allocation sites at the end of the previous run to compare with
+            keep_tracing: Don't stop tracemalloc after the run
+        """
+        self.baseline = baseline
+        self.keep_tracing = keep_tracing
+        # Allocation sites at the end of the run: location -> (size, blocks)
+        self.sites: Dict[str, Tuple[int, int]] = {}
+        self._peak = 0
+        self._current = 0
+        self._started_tracing = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(MEMORY_TRACE_FRAMES)
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._current, self._peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+        if self._started_tracing and not self.keep_tracing:
+            tracemalloc.stop()
+        self.sites = _allocation_sites(snapshot)
+        return False
+
+    def report(self) -> Dict:
+        """
+        Collect memory profile of the run.
+
+        Returns:
+            Dictionary:
+            {
+                'kind': 'memory',
+                'peak': int - peak traced memory during the run (bytes),
+                'current': int - traced memory still allocated at the end (bytes),
+                'rows': list - top allocation sites by size: [{'location', 'size', 'count'}, ...],
+                'diff': list or None - with a baseline, top changes since the previous run:
+                        [{'location', 'size', 'size_diff', 'count_diff'}, ...]
+            }
+        """
+        by_size = sorted(self.sites.items(), key=lambda item: item[1][0], reverse=True)
+        rows = [
+            {'location': location, 'size': size, 'count': count}
+            for location, (size, count) in by_size[:MAX_PROFILE_ROWS]
+        ]
+
+        diff = None
+        if self.baseline is not None:
+            diff = []
+            for location in set(self.sites) | set(self.baseline):
+                size, count = self.sites.get(location, (0, 0))
+                old_size, old_count = self.baseline.get(location, (0, 0))
+                if size != old_size:
+                    diff.append({
+                        'location': location,
+                        'size': size,
+                        'size_diff': size - old_size,
+                        'count_diff': count - old_count
+                    })
+            diff.sort(key=lambda row: abs(row['size_diff']), reverse=True)
+            diff = diff[:MAX_PROFILE_ROWS]
+
+        return {
+            'kind': self.kind,
+            'peak': self._peak,
+            'current': self._current,
+            'rows': rows,
+            'diff': diff
+        }
+
+
+def _allocation_sites(snapshot: tracemalloc.Snapshot) -> Dict[str, Tuple[int, int]]:
+    """Group traced allocations by their script line: location -> (size, blocks)."""
+    sites: Dict[str, List[int]] = defaultdict(lambda: [0, 0])
+    for trace in snapshot.traces:
+        frames = trace.traceback
+        # Frames are ordered from the oldest to the most recent
+        site = next((frame for frame in reversed(frames) if frame.filename == SCRIPT_FILENAME), frames[-1])
+        entry = sites[_frame_label(site)]
+        entry[0] += trace.size
+        entry[1] += 1
+    return {location: (size, count) for location, (size, count) in sites.items()}
+
+
+# Profiler kind -> class
+PROFILERS = {
+    CpuProfiler.kind: CpuProfiler,
+    LineProfiler.kind: LineProfiler,
+    MemoryProfiler.kind: MemoryProfiler,
+}
+
+
+def create_profiler(kind: Optional[str], **options):
+    """
+    Create profiler of the given kind.
+
+    Args:
+        kind: Profiler kind (key of PROFILERS) or None
+        options: Arguments of the profiler class
+
+    Returns:
+        Profiler instance or None if kind is None
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    if kind is None:
+        return None
+    if kind not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {kind}")
+    return PROFILERS[kind](**options)
+
+
+def _function_label(filename: str, line: int, name: str) -> str:
+    """Short readable name of a profiled function."""
+    if filename == '~':
+        # Built-in functions: name is already like "<built-in method time.sleep>"
+        return name
+    if filename == SCRIPT_FILENAME:
+        return f"<script>:{line}({name})"
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def _frame_label(frame: tracemalloc.Frame) -> str:
+    """Short readable location of an allocation."""
+    if frame.filename == SCRIPT_FILENAME:
+        return f"<script>:{frame.lineno}"
+    return f"{os.path.basename(frame.filename)}:{frame.lineno}"
+
+
+def format_profile(profile: Dict) -> str:
+    """
+    Render profile report as a text table for the output panel.
+
+    Args:
+        profile: Dictionary from a profiler's report()
+
+    Returns:
+        Text table
+    """
+    if profile['kind'] == LineProfiler.kind:
+        return _format_line_profile(profile)
+    if profile['kind'] == MemoryProfiler.kind:
+        return _format_memory_profile(profile)
+
+    rows: List[Dict] = profile['rows']
+    lines = [
+        f"Profile: {profile['total_time']:.3f} s total, {profile['function_count']} functions "
+        f"(top {len(rows)} by cumulative time)",
+        f"{'cumulative':>12} {'self':>10} {'calls':>10}  function",
+    ]
+    for row in rows:
+        calls = str(row['calls'])
+        if row['primitive_calls'] != row['calls']:
+            # Recursive functions: total/primitive calls, like pstats
+            calls = f"{row['calls']}/{row['primitive_calls']}"
+        lines.append(
+            f"{row['cumulative_time']:>10.4f} s {row['self_time']:>8.4f} s {calls:>10}  {row['function']}"
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def _format_line_profile(profile: Dict) -> str:
+    """Render the slowest lines of a line profile."""
+    lines_by_time = sorted(profile['lines'], key=lambda item: item[2], reverse=True)[:MAX_PROFILE_ROWS]
+    total = profile['total_time'] or 1.0
+    lines = [
+        f"Line profile ({profile['backend']}): {profile['total_time']:.3f} s total, "
+        f"slowest {len(lines_by_time)} lines (see the editor gutter)",
+        f"{'line':>6} {'hits':>10} {'time':>12} {'%':>6}",
+    ]
+    for line, hits, line_time in lines_by_time:
+        lines.append(f"{line:>6} {hits:>10} {line_time:>10.4f} s {line_time / total * 100:>5.1f}%")
+    return '\n'.join(lines) + '\n'
+
+
+def _format_memory_profile(profile: Dict) -> str:
+    """Render top allocation sites and changes since the previous run."""
+    rows: List[Dict] = profile['rows']
+    lines = [
+        f"Memory profile: peak {format_size(profile['peak'])} traced, "
+        f"{format_size(profile['current'])} still allocated (top {len(rows)} lines by size)",
+        f"{'size':>12} {'blocks':>10}  location",
+    ]
+    for row in rows:
+        lines.append(f"{format_size(row['size']):>12} {row['count']:>10}  {row['location']}")
+
+    if profile.get('diff') is not None:
+        lines.append("")
+        lines.append("Change since the previous run of the session:")
+        if not profile['diff']:
+            lines.append("  no changes")
+        for row in profile['diff']:
+            size_diff = format_size(row['size_diff'])
+            if row['size_diff'] > 0:
+                size_diff = "+" + size_diff
+            lines.append(
+                f"{size_diff:>12} {row['count_diff']:>+10}  {row['location']} (now {format_size(row['size'])})"
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def save_profile(profile: Dict, path: str) -> None:
+    """
+    Save profile in the .prof format readable by pstats, snakeviz etc.
+
+    Args:
+        profile: Dictionary from CpuProfiler.report()
+        path: Output file path
+    """
+    with open(path, 'wb') as f:
+        f.write(profile['prof_data'])
@@ -0,0 +1,233 @@
+"""Module for limiting memory and CPU time used by a run in the execution kernel.
+
+Limits are applied around a single run:
+- address space: resource.RLIMIT_AS, allocations above it fail with MemoryError;
+- CPU time: resource.RLIMIT_CPU, the kernel gets SIGXCPU which is turned into an exception;
+- RSS: Linux does not enforce RLIMIT_RSS, so a watchdog thread samples RSS and raises
+  MemoryError in the executing thread when the limit is exceeded.
+
+Where the resource module is not available (Windows) only the watchdog limits work,
+it also checks CPU time there.
+"""
+import ctypes
+import signal
+import threading
+import time
+from typing import Dict, Optional
+
+from utils.process_stats import RESOURCE_AVAILABLE, current_rss, peak_rss, reset_peak_rss
+
+if RESOURCE_AVAILABLE:
+    import resource
+
+
+# Interval of RSS sampling by the watchdog (seconds)
+WATCHDOG_INTERVAL = 0.1
+
+MEGABYTE = 1024 * 1024
+
+
+# Limits of the process before the active guard lowered them (limit -> (soft, hard))
+_unguarded_limits: Dict[int, tuple] = {}
+
+
+class CpuTimeLimitExceeded(Exception):
+    """Raised in user code when the run used up its CPU time limit."""
+
+
+def _raise_in_thread(thread_id: int, exception_type: type) -> None:
+    """Schedule exception in another thread (raised at its next Python instruction)."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), ctypes.py_object(exception_type))
+
+
+def _clear_in_thread(thread_id: int) -> None:
+    """Cancel an exception scheduled by _raise_in_thread that was not raised yet."""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(thread_id), None)
+
+
+class ResourceGuard:
+    """Context manager applying resource limits to the code executed inside it."""
+
+    def __init__(self, memory_mb: Optional[int] = None, rss_mb: Optional[int] = None,
+                 cpu_seconds: Optional[float] = None):
+        """
+        Initialize guard.
+
+        Args:
+            memory_mb: Address space limit in megabytes (None or 0 - no limit)
+            rss_mb: Resident memory limit in megabytes (None or 0 - no limit)
+            cpu_seconds: CPU time limit of the run in seconds (None or 0 - no limit)
+        """
+        self.memory_mb = memory_mb or None
+        self.rss_mb = rss_mb or None
+        self.cpu_seconds = cpu_seconds or None
+
+        # Which limit stopped the run: 'memory', 'rss', 'cpu' or None
+        self.exceeded: Optional[str] = None
+        self._sampled_peak = 0
+        self._cpu_start = 0.0
+        self._cpu_used = 0.0
+        self._saved_limits: Dict[int, tuple] = {}
+        self._saved_handler = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._thread_id = threading.get_ident()
+        # The watchdog raises only while the guarded block runs (changed under the lock)
+        self._lock = threading.Lock()
+        self._armed = False
+
+    def __enter__(self):
+        """Apply limits (must be called from the main thread of the kernel)."""
+        reset_peak_rss()
+        self._sampled_peak = current_rss() or 0
+        self._cpu_start = time.process_time()
+        self._thread_id = threading.get_ident()
+
+        if RESOURCE_AVAILABLE:
+            if self.memory_mb:
+                self._set_soft_limit(resource.RLIMIT_AS, int(self.memory_mb * MEGABYTE))
+            if self.cpu_seconds:
+                self._saved_handler = signal.signal(signal.SIGXCPU, self._on_cpu_limit)
+                # RLIMIT_CPU counts the whole process lifetime
+                usage = resource.getrusage(resource.RUSAGE_SELF)
+                used = usage.ru_utime + usage.ru_stime
+                self._set_soft_limit(resource.RLIMIT_CPU, int(used + self.cpu_seconds + 1))
+
+        if self.rss_mb or (self.cpu_seconds and not RESOURCE_AVAILABLE):
+            self._armed = True
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="resource-watchdog", daemon=True)
+            self._watchdog.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        """
+        Remove limits and collect usage.
+
+        A limit the watchdog hit as the block was ending may still be pending in this
+        thread: it is cancelled here, or, if it arrives before that, the exception
+        (MemoryError or CpuTimeLimitExceeded with `exceeded` set) leaves the guard
+        after the limits are removed.
+        """
+        try:
+            with self._lock:
+                self._armed = False
+                _clear_in_thread(self._thread_id)
+        finally:
+            self._stop.set()
+            if self._watchdog is not None:
+                self._watchdog.join()
+                self._watchdog = None
+
+            for limit, value in self._saved_limits.items():
+                try:
+                    resource.setrlimit(limit, value)
+                except (ValueError, OSError):
+                    pass
+                _unguarded_limits.pop(limit, None)
+            self._saved_limits = {}
+            if self._saved_handler is not None:
+                signal.signal(signal.SIGXCPU, self._saved_handler)
+                self._saved_handler = None
+
+            self._cpu_used = time.process_time() - self._cpu_start
+        return False
+
+    def _set_soft_limit(self, limit: int, value: int) -> None:
+        """Set soft limit, keeping the hard one (it can't be raised back by the process)."""
+        soft, hard = resource.getrlimit(limit)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        try:
+            resource.setrlimit(limit, (value, hard))
+            self._saved_limits[limit] = (soft, hard)
+            _unguarded_limits[limit] = (soft, hard)
+        except (ValueError, OSError) as e:
+            print(f"Failed to set resource limit: {e}")
+
+    def _on_cpu_limit(self, signum, frame):
+        """SIGXCPU handler: stop the run with an exception."""
+        if self.exceeded == 'cpu':
+            # The signal repeats every second until the limit is removed
+            return
+        self.exceeded = 'cpu'
+        raise CpuTimeLimitExceeded(f"CPU time limit of {self.cpu_seconds:g} s exceeded")
+
+    def _watch(self) -> None:
+        """Sample RSS (and CPU time where setrlimit is not available) while code runs."""
+        while not self._stop.wait(WATCHDOG_INTERVAL):
+            rss = current_rss() or 0
+            self._sampled_peak = max(self._sampled_peak, rss)
+            if self.rss_mb and rss > self.rss_mb * MEGABYTE:
+                self._stop_block('rss', MemoryError)
+                return
+            if self.cpu_seconds and not RESOURCE_AVAILABLE \
+                    and time.process_time() - self._cpu_start > self.cpu_seconds:
+                self._stop_block('cpu', CpuTimeLimitExceeded)
+                return
+
+    def _stop_block(self, limit: str, exception_type: type) -> None:
+        """Raise an exception in the guarded block if it is still running."""
+        with self._lock:
+            if self._armed:
+                self.exceeded = limit
+                _raise_in_thread(self._thread_id, exception_type)
+
+    def report(self, result: Dict) -> None:
+        """
+        Add resource usage to a result dictionary.
+
+        Adds 'peak_rss' (bytes), 'cpu_time' (seconds) and 'limit_exceeded'
+        ('memory', 'rss', 'cpu' or None); if a limit stopped the run,
+        'limit_message' explains which one.
+
+        Args:
+            result: Result dictionary from CodeExecutor.execute
+        """
+        result['peak_rss'] = max(peak_rss() or 0, self._sampled_peak) or None
+        result['cpu_time'] = self._cpu_used
+
+        exceeded = self.exceeded
+        if exceeded is None and self.memory_mb and result.get('exception_type') == 'MemoryError':
+            exceeded = 'memory'
+        result['limit_exceeded'] = exceeded
+
+        if exceeded == 'memory':
+            result['limit_message'] = (
+                f"Memory limit exceeded: the run needed more than {self.memory_mb} MB of address space."
+            )
+        elif exceeded == 'rss':
+            result['limit_message'] = (
+                f"Memory limit exceeded: the run used more than {self.rss_mb} MB of resident memory."
+            )
+        elif exceeded == 'cpu':
+            result['limit_message'] = f"CPU time limit exceeded: the run used more than {self.cpu_seconds:g} s of CPU time."
+        if exceeded and result.get('exception') is not None:
+            result['exception'] = result['limit_message']
+
+
+def unguarded_limits() -> Dict[int, tuple]:
+    """
+    Get limits the process had before the active ResourceGuard lowered them.
+
+    Child processes inherit the lowered limits of the run that started them;
+    they pass these values to restore_limits to get the limits of a fresh process.
+
+    Returns:
+        Limit (resource.RLIMIT_*) -> (soft, hard); empty if no guard is active
+    """
+    return dict(_unguarded_limits)
+
+
+def restore_limits(limits: Dict[int, tuple]) -> None:
+    """
+    Set limits of the process (see unguarded_limits).
+
+    Args:
+        limits: Limit (resource.RLIMIT_*) -> (soft, hard)
+    """
+    for limit, value in limits.items():
+        try:
+            resource.setrlimit(limit, value)
+        except (ValueError, OSError):
+            pass
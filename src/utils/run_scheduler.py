@@ -0,0 +1,151 @@
+"""Module for scheduling code runs requested from the GUI.
+
+One run executes at a time. Requests made while code runs (F5 pressed repeatedly,
+a hotkey and a toolbar button at the same moment) wait in a queue holding at most
+one pending run per document: a newer request replaces the pending one, so the
+run that starts next always has the latest code. A request repeating the running
+one is dropped instead of running the same code twice, and a pending run starts
+only after requests for it stop arriving for the debounce interval. Optionally
+a newer version of the running document's code cancels the running job.
+
+The scheduler only decides what runs and when; starting and interrupting runs
+is left to the caller (the app polls take() from its event loop).
+"""
+import time
+from typing import Callable, Dict, Optional
+
+
+# Default settings
+DEFAULT_DEBOUNCE = 0.2
+
+# Outcomes of RunScheduler.submit()
+QUEUED = "queued"
+REPLACED = "replaced"
+DUPLICATE = "duplicate"
+CANCEL_RUNNING = "cancel_running"
+
+
+class RunRequest:
+    """Requested run of a document: code and run options."""
+
+    def __init__(self, document: Optional[str], code: str, options: Dict, due: float):
+        """
+        Initialize request.
+
+        Args:
+            document: Document the code comes from (file path, None - unsaved editor)
+            code: Code to execute
+            options: Run options (passed back to the caller unchanged)
+            due: Time (scheduler clock) from which the run may start
+        """
+        self.document = document
+        self.code = code
+        self.options = options
+        self.due = due
+        # Cancellation of the run was already requested (it is requested once)
+        self.cancelled = False
+
+    def same_as(self, other: "RunRequest") -> bool:
+        """Check whether the request would run exactly the same thing as another one."""
+        return (self.document, self.code, self.options) == (other.document, other.code, other.options)
+
+
+class RunScheduler:
+    """Queue of runs with at most one pending run per document."""
+
+    def __init__(self, debounce: float = DEFAULT_DEBOUNCE, cancel_running: bool = False,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize scheduler.
+
+        Args:
+            debounce: Seconds without new requests before a pending run starts
+            cancel_running: Cancel the running job when newer code of its document is submitted
+            clock: Time source in seconds
+        """
+        self.debounce = max(0.0, debounce)
+        self.cancel_running = cancel_running
+        self._clock = clock
+        # Run being executed (None - idle)
+        self.running: Optional[RunRequest] = None
+        # Pending runs by document, in the order documents were queued
+        self._pending: Dict[Optional[str], RunRequest] = {}
+
+    @property
+    def pending_count(self) -> int:
+        """Number of runs waiting for the current one to finish."""
+        return len(self._pending)
+
+    @property
+    def is_idle(self) -> bool:
+        """Check whether nothing runs and nothing waits."""
+        return self.running is None and not self._pending
+
+    def submit(self, document: Optional[str], code: str, **options) -> str:
+        """
+        Request a run.
+
+        A request made while the scheduler is idle may start right away; otherwise
+        it replaces the pending run of its document and waits for the debounce interval.
+
+        Args:
+            document: Document the code comes from (file path, None - unsaved editor)
+            code: Code to execute
+            **options: Run options (compared to detect duplicates, returned by take())
+
+        Returns:
+            QUEUED or REPLACED (a pending run of the document was replaced), DUPLICATE
+            (the same run is already running or pending, nothing was queued) or
+            CANCEL_RUNNING (queued, and the caller should cancel the running job)
+        """
+        now = self._clock()
+        due = now if self.is_idle else now + self.debounce
+        request = RunRequest(document, code, options, due)
+
+        pending = self._pending.get(document)
+        if self.running is not None and request.same_as(self.running):
+            # Repeated run of what is executing: a pending newer version is stale too
+            self._pending.pop(document, None)
+            return DUPLICATE
+        if pending is not None and request.same_as(pending):
+            return DUPLICATE
+
+        self._pending[document] = request
+        running = self.running
+        if (self.cancel_running and running is not None and running.document == document
+                and not running.cancelled):
+            running.cancelled = True
+            return CANCEL_RUNNING
+        return REPLACED if pending is not None else QUEUED
+
+    def take(self) -> Optional[RunRequest]:
+        """
+        Take the next run to start, marking it as running.
+
+        Returns:
+            Oldest pending run that is due, or None while a run executes or nothing is due
+        """
+        if self.running is not None:
+            return None
+        now = self._clock()
+        for document, request in self._pending.items():
+            if request.due <= now:
+                del self._pending[document]
+                self.running = request
+                return request
+        return None
+
+    def finish(self) -> None:
+        """Mark the running run as finished."""
+        self.running = None
+
+    def clear(self) -> int:
+        """
+        Drop all pending runs (the running one is not affected).
+
+        Returns:
+            Number of dropped runs
+        """
+        count = len(self._pending)
+        self._pending.clear()
+        return count
@@ -0,0 +1,241 @@
+"""Module for sharing numpy arrays between processes without copying them.
+
+An array is copied once into a multiprocessing.shared_memory block; other
+processes receive a small picklable descriptor and map the same memory as an
+array (read-only, so one process can't change data under another).
+dumps_shared()/loads_shared() do the same for arrays anywhere inside a pickled
+object (pickle protocol 5 out-of-band buffers), e.g. the data of a figure.
+
+The process that created the blocks owns them and must release them with
+release_blocks() when they are no longer needed. If it can't (it was killed or
+has exited), another process removes them by name with unlink_names().
+Mapped memory stays valid until the last array using it is freed, even after
+the block is removed.
+"""
+import io
+import os
+import pickle
+from multiprocessing import shared_memory
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# Arrays smaller than this are cheaper to pickle
+SHARE_MIN_BYTES = 1024 * 1024
+
+
+class _AttachedBlock(shared_memory.SharedMemory):
+    """Block mapped by a receiving process; closing it leaves the memory to arrays that still use it."""
+
+    def close(self) -> None:
+        try:
+            super().close()
+        except BufferError:
+            # Arrays still use the mapping: it is unmapped when the last of them is freed.
+            # Only the descriptor is closed now (POSIX), the mapping doesn't need it
+            if getattr(self, '_fd', -1) >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+def is_shareable(value) -> bool:
+    """
+    Check whether a value is an array worth placing into shared memory.
+
+    Args:
+        value: Any value
+
+    Returns:
+        True for plain numpy arrays of at least SHARE_MIN_BYTES without Python objects
+    """
+    return (
+        type(value) is np.ndarray
+        and value.nbytes >= SHARE_MIN_BYTES
+        and not value.dtype.hasobject
+    )
+
+
+def share_array(array: np.ndarray) -> Tuple[Dict, shared_memory.SharedMemory]:
+    """
+    Copy an array into a new shared memory block.
+
+    Args:
+        array: Array without Python objects
+
+    Returns:
+        (descriptor, block): descriptor {'shm', 'shape', 'dtype'} for attach_array,
+        block owned by the caller
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+    shared[...] = array
+    descriptor = {'shm': block.name, 'shape': array.shape, 'dtype': array.dtype.str}
+    return descriptor, block
+
+
+def attach_array(descriptor: Dict) -> Tuple[np.ndarray, shared_memory.SharedMemory]:
+    """
+    Map an array shared by share_array.
+
+    Args:
+        descriptor: Descriptor from share_array
+
+    Returns:
+        (array, block): read-only array backed by the block; the block must be
+        kept referenced (and closed) by the caller while the array is used
+    """
+    block = _AttachedBlock(name=descriptor['shm'])
+    array = np.ndarray(tuple(descriptor['shape']), dtype=np.dtype(descriptor['dtype']), buffer=block.buf)
+    array.flags.writeable = False
+    return array, block
+
+
+def share_namespace_arrays(namespace: Dict) -> Tuple[Dict[str, Dict], List[shared_memory.SharedMemory]]:
+    """
+    Place large arrays of a namespace into shared memory.
+
+    Args:
+        namespace: Namespace of executed code
+
+    Returns:
+        (descriptors, blocks): variable name -> descriptor, blocks owned by the caller
+    """
+    descriptors: Dict[str, Dict] = {}
+    blocks: List[shared_memory.SharedMemory] = []
+    try:
+        for name, value in namespace.items():
+            if not name.startswith('__') and is_shareable(value):
+                descriptors[name], block = share_array(value)
+                blocks.append(block)
+    except Exception:
+        release_blocks(blocks)
+        raise
+    return descriptors, blocks
+
+
+def _restore_masked(data: np.ndarray, mask, fill_value) -> np.ma.MaskedArray:
+    """Rebuild a masked array pickled by _SharedPickler."""
+    return np.ma.MaskedArray(data, mask=mask, fill_value=fill_value)
+
+
+class _SharedPickler(pickle.Pickler):
+    """Pickler that passes data of large arrays out of band where numpy would copy it in band."""
+
+    def reducer_override(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.nbytes < SHARE_MIN_BYTES or obj.dtype.hasobject:
+            return NotImplemented
+        if type(obj) is np.ma.MaskedArray:
+            # Masked arrays (images, scatter offsets) pickle their data as bytes
+            return _restore_masked, (np.ma.getdata(obj), np.ma.getmask(obj), obj.fill_value)
+        if type(obj) is np.ndarray and not obj.flags.forc:
+            # Views (e.g. columns of an (N, 2) array) are pickled as in-band copies
+            return np.ascontiguousarray(obj).__reduce_ex__(5)
+        return NotImplemented
+
+
+def dumps_shared(obj, blocks: List[shared_memory.SharedMemory]) -> Tuple[bytes, List[Dict]]:
+    """
+    Pickle an object, placing large array buffers into shared memory.
+
+    Args:
+        obj: Object to pickle
+        blocks: List receiving the created blocks (owned by the caller, also on errors)
+
+    Returns:
+        (data, descriptors): pickle stream without the shared buffers and
+        descriptors {'shm', 'size'} of the buffers for loads_shared
+    """
+    descriptors: List[Dict] = []
+
+    def place(buffer: pickle.PickleBuffer) -> bool:
+        raw = buffer.raw()
+        if raw.nbytes < SHARE_MIN_BYTES:
+            # Small buffers stay in the pickle stream
+            return True
+        block = shared_memory.SharedMemory(create=True, size=raw.nbytes)
+        blocks.append(block)
+        block.buf[:raw.nbytes] = raw
+        descriptors.append({'shm': block.name, 'size': raw.nbytes})
+        return False
+
+    stream = io.BytesIO()
+    _SharedPickler(stream, protocol=5, buffer_callback=place).dump(obj)
+    return stream.getvalue(), descriptors
+
+
+def map_buffers(descriptors: List[Dict]) -> List[memoryview]:
+    """
+    Map buffers placed into shared memory by dumps_shared.
+
+    The mappings live as long as the returned views (and arrays created from
+    them), so the data stays available after the owner removes the blocks.
+
+    Args:
+        descriptors: Buffer descriptors from dumps_shared
+
+    Returns:
+        Read-only views of the buffers
+    """
+    buffers = []
+    for descriptor in descriptors:
+        block = _AttachedBlock(name=descriptor['shm'])
+        buffers.append(block.buf[:descriptor['size']].toreadonly())
+        # The views keep the mapping, the block object itself isn't needed
+        block.close()
+    return buffers
+
+
+def loads_shared(data: bytes, descriptors: List[Dict]):
+    """
+    Unpickle an object created by dumps_shared, mapping its buffers.
+
+    Arrays of the object use the shared memory directly (read-only); the
+    mapping lives as long as they do.
+
+    Args:
+        data: Pickle stream from dumps_shared
+        descriptors: Buffer descriptors from dumps_shared
+
+    Returns:
+        Unpickled object
+    """
+    return pickle.loads(data, buffers=map_buffers(descriptors))
+
+
+def unlink_names(names: List[str]) -> None:
+    """
+    Remove blocks by name (blocks already removed are skipped).
+
+    Used for blocks whose owner can no longer release them, e.g. a killed process.
+
+    Args:
+        names: Block names
+    """
+    for name in names:
+        try:
+            block = shared_memory.SharedMemory(name=name)
+        except (FileNotFoundError, OSError):
+            continue
+        release_blocks([block])
+
+
+def release_blocks(blocks: List[shared_memory.SharedMemory], unlink: bool = True) -> None:
+    """
+    Close shared memory blocks and (by their owner) remove them.
+
+    Args:
+        blocks: Blocks from share_array or attach_array
+        unlink: Remove the blocks from the system (only by the process that created them)
+    """
+    for block in blocks:
+        try:
+            block.close()
+        except Exception:
+            # Arrays still referencing the buffer keep the mapping alive
+            pass
+        if unlink:
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
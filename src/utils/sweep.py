@@ -0,0 +1,472 @@
+"""Module for parameter sweeps: running a script for many values of its constants.
+
+A top-level constant becomes a sweep parameter with a marker comment listing its values:
+
+    learning_rate = 0.1  # @sweep [0.01, 0.1, 1.0]
+    layers = 2           # @sweep range(1, 5)
+
+A grid sweep runs every combination of the values, a random sweep runs a random
+sample of the combinations. Variants run in parallel worker processes (spawn
+process pool). If the script has `# %%` cells, the cells above the first cell with
+a parameter are the setup: it runs once, large numpy arrays it creates are placed
+into shared memory (see utils.shared_arrays) and mapped by the workers read-only,
+other picklable values are sent once per worker and unpickled afresh for every
+variant, so variants never see each other's changes. Definitions of the setup
+(imports, functions, classes) are re-executed for each variant. Workers execute only
+the cells starting from the first one with a parameter.
+
+Each variant reports status, wall time, metrics printed as "name: number" or
+"name = number" lines, and its figures.
+"""
+import ast
+import itertools
+import multiprocessing
+import os
+import pickle
+import random
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional
+
+from utils.cells import has_cell_markers, split_cells
+
+
+# Marker of a sweep parameter: "name = value  # @sweep [values]"
+SWEEP_MARKER = re.compile(r'^([A-Za-z_]\w*)\s*=\s*(.+?)\s*#\s*@sweep\s+(.+?)\s*$')
+
+# Metric printed by a variant: "name: number" or "name = number"
+METRIC_LINE = re.compile(r'^\s*([A-Za-z_][\w .\-]{0,40}?)\s*[:=]\s*([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)\s*$')
+
+# Maximum number of metric columns in the comparison table
+MAX_METRIC_COLUMNS = 8
+
+# Default sweep settings
+DEFAULT_SWEEP_MODE = "grid"
+DEFAULT_SWEEP_SAMPLES = 20
+
+
+class SweepParameter:
+    """Class for storing one sweep parameter of a script."""
+
+    def __init__(self, name: str, line: int, values: List):
+        """
+        Initialize parameter.
+
+        Args:
+            name: Variable name
+            line: Line number of the assignment (from 1)
+            values: Values to try
+        """
+        self.name = name
+        self.line = line
+        self.values = values
+
+    def __repr__(self):
+        return f"SweepParameter({self.name}, line {self.line}, {len(self.values)} values)"
+
+
+def _parse_values(text: str) -> List:
+    """Parse values of a marker: a literal list/tuple or range(...)."""
+    node = ast.parse(text, mode='eval').body
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'range' \
+            and not node.keywords:
+        return list(range(*[ast.literal_eval(arg) for arg in node.args]))
+    values = ast.literal_eval(node)
+    if not isinstance(values, (list, tuple)):
+        raise ValueError("expected a list of values")
+    return list(values)
+
+
+def find_sweep_parameters(code: str) -> List[SweepParameter]:
+    """
+    Find constants marked with `# @sweep` in a script.
+
+    Args:
+        code: Script source
+
+    Returns:
+        Parameters in the order of their lines
+
+    Raises:
+        ValueError: If a marker has invalid or empty values, or a parameter is marked twice
+    """
+    parameters: List[SweepParameter] = []
+    for number, line in enumerate(code.splitlines(), start=1):
+        match = SWEEP_MARKER.match(line)
+        if not match:
+            continue
+        name = match.group(1)
+        try:
+            values = _parse_values(match.group(3))
+        except (SyntaxError, ValueError, TypeError) as e:
+            raise ValueError(f"Invalid @sweep values of '{name}' on line {number}: {e}")
+        if not values:
+            raise ValueError(f"No @sweep values for '{name}' on line {number}")
+        if any(parameter.name == name for parameter in parameters):
+            raise ValueError(f"Parameter '{name}' is marked with @sweep twice (line {number})")
+        parameters.append(SweepParameter(name, number, values))
+    return parameters
+
+
+def sweep_points(parameters: List[SweepParameter], mode: str = DEFAULT_SWEEP_MODE,
+                 samples: int = DEFAULT_SWEEP_SAMPLES, seed: Optional[int] = None) -> List[Dict]:
+    """
+    Build parameter combinations to run.
+
+    Args:
+        parameters: Sweep parameters
+        mode: "grid" - all combinations, "random" - random sample of them
+        samples: Number of combinations of a random sweep
+        seed: Seed of a random sweep (None - different each time)
+
+    Returns:
+        List of {parameter name: value}
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    names = [parameter.name for parameter in parameters]
+    combinations = itertools.product(*[parameter.values for parameter in parameters])
+    if mode == "grid":
+        return [dict(zip(names, values)) for values in combinations]
+    if mode == "random":
+        combinations = list(combinations)
+        chosen = random.Random(seed).sample(combinations, min(samples, len(combinations)))
+        return [dict(zip(names, values)) for values in chosen]
+    raise ValueError(f"Unknown sweep mode: {mode}")
+
+
+def apply_point(code: str, parameters: List[SweepParameter], point: Dict) -> str:
+    """
+    Substitute parameter values into a script (line numbers are kept).
+
+    Args:
+        code: Script source
+        parameters: Sweep parameters of the script
+        point: {parameter name: value}
+
+    Returns:
+        Script source with the values assigned
+    """
+    lines = code.splitlines()
+    for parameter in parameters:
+        lines[parameter.line - 1] = f"{parameter.name} = {point[parameter.name]!r}"
+    return '\n'.join(lines) + '\n'
+
+
+def split_setup(code: str, parameters: List[SweepParameter]) -> tuple:
+    """
+    Split a script into the setup (run once) and the part executed for each variant.
+
+    Args:
+        code: Script source
+        parameters: Sweep parameters of the script
+
+    Returns:
+        (setup, variant_start_line): setup source (empty without cells) and the line
+        where the part executed by the variants starts
+    """
+    if not parameters or not has_cell_markers(code):
+        return '', 1
+    first_line = min(parameter.line for parameter in parameters)
+    cells = split_cells(code)
+    start_line = 1
+    for cell in cells:
+        if cell.start_line <= first_line:
+            start_line = cell.start_line
+    setup = '\n'.join(cell.source for cell in cells if cell.start_line < start_line)
+    return setup, start_line
+
+
+def definitions_source(setup: str) -> tuple:
+    """
+    Extract imports, functions and classes from the setup (they can't be sent to workers).
+
+    Args:
+        setup: Setup source
+
+    Returns:
+        (source, names): source with only these top-level statements and the names they define
+    """
+    tree = ast.parse(setup)
+    kinds = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    tree.body = [node for node in tree.body if isinstance(node, kinds)]
+    names = set()
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            names.update((alias.asname or alias.name).split('.')[0] for alias in node.names)
+        else:
+            names.add(node.name)
+    return ast.unparse(tree), names
+
+
+def parse_metrics(stdout: str) -> Dict[str, float]:
+    """
+    Collect metrics printed by a variant ("name: number" or "name = number" lines, last value wins).
+
+    Args:
+        stdout: Output of the variant
+
+    Returns:
+        {metric name: value}
+    """
+    metrics: Dict[str, float] = {}
+    for line in stdout.splitlines():
+        match = METRIC_LINE.match(line)
+        if match:
+            metrics[match.group(1).strip()] = float(match.group(2))
+    return metrics
+
+
+def point_label(point: Dict) -> str:
+    """Short text of a parameter combination, e.g. "lr=0.1, layers=2"."""
+    return ', '.join(f"{name}={value!r}" for name, value in point.items())
+
+
+# Worker process state (set by _init_worker)
+_worker_executor = None
+_worker_definitions = ''
+_worker_values: Dict[str, bytes] = {}
+_worker_arrays: Dict = {}
+_worker_blocks: List = []
+
+
+def _init_worker(definitions: str, values: Dict[str, bytes], shared: Dict[str, Dict],
+                 working_directory: Optional[str], limits: Dict[int, tuple]) -> None:
+    """Prepare a sweep worker: limits, executor, setup values and mapped shared arrays."""
+    global _worker_executor, _worker_definitions, _worker_values
+    from utils.resource_limits import restore_limits
+
+    # Memory and CPU limits of the run that started the sweep are not the worker's limits
+    restore_limits(limits)
+    # The executor's backend has no windows, figures are sent back as snapshots
+    from utils.code_executor import CodeExecutor
+    from utils.shared_arrays import attach_array
+
+    _worker_executor = CodeExecutor()
+    if working_directory and os.path.isdir(working_directory):
+        os.chdir(working_directory)
+        import sys
+        if working_directory not in sys.path:
+            sys.path.insert(0, working_directory)
+    # Values stay pickled: every variant gets its own copy (see _variant_namespace)
+    _worker_definitions = definitions
+    _worker_values = values
+    for name, descriptor in shared.items():
+        # Read-only arrays can be shared by the variants
+        _worker_arrays[name], block = attach_array(descriptor)
+        # The mapping must live as long as the process
+        _worker_blocks.append(block)
+
+
+def _variant_namespace() -> Dict:
+    """Build a fresh namespace from the setup for one variant."""
+    namespace = _worker_executor._new_namespace()
+    if _worker_definitions:
+        # Functions of the setup must see this variant's globals
+        exec(_worker_definitions, namespace)
+    for name, data in _worker_values.items():
+        namespace[name] = pickle.loads(data)
+    namespace.update(_worker_arrays)
+    return namespace
+
+
+def _run_point(index: int, code: str, working_directory: Optional[str]) -> Dict:
+    """Execute one variant in a worker process."""
+    import matplotlib.pyplot as plt
+    from utils.figure_transport import snapshot_figure
+    from utils.output_stream import remove_spill_files
+
+    plt.close('all')
+    # Variants don't see each other's variables nor changes to the setup values
+    _worker_executor.session_namespace = _variant_namespace()
+    start = time.perf_counter()
+    result = _worker_executor.execute(code, working_directory=working_directory, persistent=True)
+    wall_time = time.perf_counter() - start
+    # Output of a variant isn't shown, only its metrics
+    remove_spill_files(result.get('output_spill'))
+
+    figures = []
+    for figure in _worker_executor.get_all_figures():
+        try:
+            figures.append(snapshot_figure(figure))
+        except Exception as e:
+            result['stderr'] += f"\nFailed to transfer figure: {e}\n"
+    plt.close('all')
+    return {
+        'index': index,
+        'status': 'ok' if result['exception'] is None else 'error',
+        'exception': result['exception'],
+        'stdout': result['stdout'],
+        'stderr': result['stderr'],
+        'wall_time': wall_time,
+        'metrics': parse_metrics(result['stdout']),
+        'figures': figures,
+    }
+
+
+def _crash_record(index: int, error: Exception) -> Dict:
+    """Record of a variant whose worker process died or whose result couldn't be sent back."""
+    return {'index': index, 'status': 'crashed', 'exception': str(error) or type(error).__name__,
+            'stdout': '', 'stderr': '', 'wall_time': None, 'metrics': {}, 'figures': []}
+
+
+def run_sweep(code: str, namespace: Dict, working_directory: Optional[str], settings: Dict,
+              records: List[Dict], on_point: Optional[Callable[[Dict, int], None]] = None) -> None:
+    """
+    Execute the setup in a namespace and the variants in a process pool.
+
+    Args:
+        code: Script source with @sweep markers
+        namespace: Namespace for the setup
+        working_directory: Working directory of the variants
+        settings: {'mode', 'samples', 'seed', 'jobs'} (missing keys use defaults; jobs 0 - CPU count)
+        records: List receiving a record per finished variant (filled while running, so
+                 it keeps finished variants if the sweep is interrupted):
+                 {'index', 'point', 'status', 'exception', 'wall_time', 'metrics', 'figures', 'stdout', 'stderr'}
+        on_point: Callback (record, total) called when a variant finishes
+
+    A worker process that dies breaks the pool and fails every variant it was
+    running or had queued; these variants run again, each in a worker process of
+    its own, so only the variant that crashed is reported as crashed.
+
+    Raises:
+        ValueError: If the script has no @sweep parameters or its markers are invalid
+    """
+    from utils.resource_limits import unguarded_limits
+    from utils.shared_arrays import release_blocks, share_namespace_arrays
+
+    parameters = find_sweep_parameters(code)
+    if not parameters:
+        raise ValueError("No sweep parameters: mark constants with '# @sweep [values]'")
+    points = sweep_points(
+        parameters,
+        mode=settings.get('mode') or DEFAULT_SWEEP_MODE,
+        samples=settings.get('samples') or DEFAULT_SWEEP_SAMPLES,
+        seed=settings.get('seed')
+    )
+
+    setup, start_line = split_setup(code, parameters)
+    definitions, defined_names = definitions_source(setup) if setup.strip() else ('', set())
+    if setup.strip():
+        exec(setup, namespace)
+    shared, blocks = share_namespace_arrays(namespace)
+    try:
+        # Other values of the setup are pickled once per worker
+        values: Dict[str, bytes] = {}
+        for name, value in namespace.items():
+            if name.startswith('__') or name in shared or name in defined_names:
+                continue
+            try:
+                values[name] = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            except Exception:
+                # Preloaded modules are in every namespace; other unpicklable values are not available
+                continue
+
+        # Variants keep the line numbers of the script
+        variant_lines = code.splitlines()
+        variant_lines[:start_line - 1] = [''] * (start_line - 1)
+        variant_code = '\n'.join(variant_lines) + '\n'
+
+        def finish(index: int, future) -> None:
+            try:
+                record = future.result()
+            except Exception as e:
+                record = _crash_record(index, e)
+            record['point'] = points[index]
+            records.append(record)
+            if on_point is not None:
+                on_point(record, len(points))
+
+        jobs = settings.get('jobs') or os.cpu_count() or 1
+        workers = max(1, min(jobs, len(points)))
+        pool_options = {
+            # Same start method as the execution kernels
+            'mp_context': multiprocessing.get_context("spawn"),
+            'initializer': _init_worker,
+            'initargs': (definitions, values, shared, working_directory, unguarded_limits()),
+        }
+        variants = [apply_point(variant_code, parameters, point) for point in points]
+        # Child processes that are not workers of the sweep
+        other_children = {process.pid for process in multiprocessing.active_children()}
+        pools = [ProcessPoolExecutor(max_workers=workers, **pool_options)]
+        try:
+            futures = {
+                pools[0].submit(_run_point, index, variant, working_directory): index
+                for index, variant in enumerate(variants)
+            }
+            # Variants failed by a broken pool (the crashing one among them)
+            retry: List[int] = []
+            for future in as_completed(futures):
+                if isinstance(future.exception(), BrokenProcessPool):
+                    retry.append(futures[future])
+                else:
+                    finish(futures[future], future)
+
+            retry.sort()
+            running = {}
+            while retry or running:
+                while retry and len(running) < workers:
+                    index = retry.pop(0)
+                    pool = ProcessPoolExecutor(max_workers=1, **pool_options)
+                    pools.append(pool)
+                    running[pool.submit(_run_point, index, variants[index], working_directory)] = (index, pool)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, pool = running.pop(future)
+                    finish(index, future)
+                    pool.shutdown(wait=True)
+                    pools.remove(pool)
+        finally:
+            if len(records) < len(points):
+                # Stop workers at once on interruption
+                for process in multiprocessing.active_children():
+                    if process.pid not in other_children:
+                        process.terminate()
+            for pool in pools:
+                pool.shutdown(wait=True, cancel_futures=True)
+    finally:
+        release_blocks(blocks)
+
+
+def format_sweep_table(sweep: Dict) -> str:
+    """
+    Render comparison table of sweep variants.
+
+    Args:
+        sweep: {'parameters': [names], 'points': [records without figures]}
+
+    Returns:
+        Text table
+    """
+    names: List[str] = sweep['parameters']
+    points: List[Dict] = sorted(sweep['points'], key=lambda record: record['index'])
+    metrics: List[str] = []
+    for record in points:
+        for metric in record.get('metrics', {}):
+            if metric not in metrics and len(metrics) < MAX_METRIC_COLUMNS:
+                metrics.append(metric)
+
+    header = ['#'] + names + metrics + ['time', 'status']
+    rows = []
+    for record in points:
+        row = [str(record['index'] + 1)]
+        row += [repr(record['point'][name]) for name in names]
+        row += [f"{record['metrics'][metric]:.6g}" if metric in record.get('metrics', {}) else ''
+                for metric in metrics]
+        row.append(f"{record['wall_time']:.2f} s" if record.get('wall_time') is not None else '')
+        status = record['status']
+        if record.get('exception'):
+            status += f": {record['exception']}"
+        row.append(status)
+        rows.append(row)
+
+    widths = [max(len(header[i]), *(len(row[i]) for row in rows)) if rows else len(header[i])
+              for i in range(len(header))]
+    lines = [f"Sweep: {len(points)} variants"]
+    lines.append('  '.join(cell.rjust(width) for cell, width in zip(header[:-1], widths)) + '  ' + header[-1])
+    for row in rows:
+        lines.append('  '.join(cell.rjust(width) for cell, width in zip(row[:-1], widths)) + '  ' + row[-1])
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,239 @@
+"""Module for recording telemetry of code runs.
+
+Every run appends one compact JSON line to the run history (run_history.jsonl
+next to app_state.json): wall and CPU time, peak RSS, output size, figure count
+and the time of each stage of the run pipeline:
+- clear_plots - clearing the plots panel before the run (GUI);
+- reload_modules - reloading changed modules of the working directory (kernel);
+- exec - execution of the code itself (kernel);
+- render_figures - rasterizing figures with Agg (kernel);
+- transfer_figures - sending figures from the kernel (kernel);
+- display_result - rendering the output (GUI);
+- display_plots - showing the plot images (GUI).
+
+Comparing stages tells whether a slowdown comes from the code or from rendering.
+The history is bounded: when the file outgrows RUN_HISTORY_MAX_BYTES, only its last
+RUN_HISTORY_KEEP_RECORDS records are kept, and the last records are read from the end
+of the file.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# Order of stages in the summary
+STAGES = ('clear_plots', 'reload_modules', 'exec', 'render_figures', 'transfer_figures',
+          'display_result', 'display_plots')
+
+# Size of the run history file that makes it truncated (bytes) and records kept then
+RUN_HISTORY_MAX_BYTES = 4 * 1024 * 1024
+RUN_HISTORY_KEEP_RECORDS = 2000
+
+# Size of a block read from the end of the history file (bytes)
+_TAIL_BLOCK_BYTES = 64 * 1024
+
+
+class StageTimer:
+    """Measures wall time of named stages of a run."""
+
+    def __init__(self):
+        """Initialize timer."""
+        # Stage name -> seconds
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measure a stage (time of repeated stages is summed).
+
+        Args:
+            name: Stage name (see STAGES)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def add(self, timings: Optional[Dict[str, float]]) -> None:
+        """
+        Add stages measured elsewhere (e.g. 'timings' of a kernel result).
+
+        Args:
+            timings: Stage name -> seconds
+        """
+        for name, seconds in (timings or {}).items():
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+def build_run_record(result: Dict, stages: Dict[str, float], wall_time: float,
+                     file: Optional[str] = None, mode: Optional[str] = None) -> Dict:
+    """
+    Build run history record from a run result.
+
+    Args:
+        result: Result dictionary from the execution kernel
+        stages: Stage name -> seconds
+        wall_time: Time from starting the run to displaying its results (seconds)
+        file: Path of the executed file (None - unsaved code)
+        mode: Execution mode of the run
+
+    Returns:
+        Record dictionary
+    """
+    if result.get('interrupted'):
+        status = 'interrupted'
+    elif result.get('exception') is not None:
+        status = 'error'
+    else:
+        status = 'ok'
+
+    return {
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'file': file,
+        'mode': mode,
+        'status': status,
+        'wall_time': round(wall_time, 4),
+        'cpu_time': round(result['cpu_time'], 4) if result.get('cpu_time') is not None else None,
+        'peak_rss': result.get('peak_rss'),
+        'output_size': len(result.get('stdout') or '') + len(result.get('stderr') or ''),
+        'figure_count': result.get('figure_count', 0),
+        'stages': {name: round(seconds, 4) for name, seconds in stages.items()},
+    }
+
+
+def append_run_record(path: str, record: Dict, max_bytes: int = RUN_HISTORY_MAX_BYTES,
+                      keep_records: int = RUN_HISTORY_KEEP_RECORDS) -> bool:
+    """
+    Append record to the run history file, truncating the file when it grows too large.
+
+    Args:
+        path: Path to the run history (JSONL) file
+        record: Record from build_run_record
+        max_bytes: File size above which only the last records are kept
+        keep_records: Number of records kept when the file is truncated
+            (fewer if they take more than half of max_bytes)
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        if os.path.getsize(path) > max_bytes:
+            _truncate_history(path, keep_records, max_bytes // 2)
+        return True
+    except Exception as e:
+        print(f"Error saving run history: {e}")
+        return False
+
+
+def _lines_from_end(path: str):
+    """Yield lines of a file (bytes) from the last to the first, reading the file from its end."""
+    with open(path, 'rb') as f:
+        position = f.seek(0, os.SEEK_END)
+        # Beginning of the earliest line read so far (its start may be in the next block)
+        rest = b''
+        while position > 0:
+            size = min(_TAIL_BLOCK_BYTES, position)
+            position -= size
+            f.seek(position)
+            lines = (f.read(size) + rest).split(b'\n')
+            rest = lines.pop(0)
+            yield from reversed(lines)
+        yield rest
+
+
+def _truncate_history(path: str, keep_records: int, keep_bytes: int) -> None:
+    """Rewrite the history file with its last records only."""
+    kept: List[bytes] = []
+    size = 0
+    for line in _lines_from_end(path):
+        if not line.strip():
+            continue
+        if len(kept) >= keep_records or size + len(line) + 1 > keep_bytes:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    kept.reverse()
+    # The old file stays intact until the new one is complete
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f:
+        f.write(b''.join(line + b'\n' for line in kept))
+    os.replace(temporary_path, path)
+
+
+def _parse_record(line) -> Optional[Dict]:
+    """Parse one line of the history (None - damaged line)."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def load_run_history(path: str, limit: Optional[int] = None) -> List[Dict]:
+    """
+    Load records from the run history file.
+
+    Args:
+        path: Path to the run history (JSONL) file
+        limit: Return only the last records, reading them from the end of the file (None - all)
+
+    Returns:
+        Records from the oldest to the newest (damaged lines are skipped)
+    """
+    if not os.path.exists(path):
+        return []
+    records = []
+    try:
+        if limit:
+            for line in _lines_from_end(path):
+                record = _parse_record(line) if line.strip() else None
+                if record is not None:
+                    records.append(record)
+                    if len(records) >= limit:
+                        break
+            records.reverse()
+        else:
+            with open(path, 'rb') as f:
+                for line in f:
+                    record = _parse_record(line) if line.strip() else None
+                    if record is not None:
+                        records.append(record)
+    except Exception as e:
+        print(f"Error loading run history: {e}")
+    return records
+
+
+def format_run_summary(record: Dict, previous: Optional[Dict] = None) -> str:
+    """
+    Render short one-line summary of a run for the status area.
+
+    Args:
+        record: Record from build_run_record
+        previous: Previous record of the same file to compare the wall time with
+
+    Returns:
+        Summary text, e.g. "1.25 s (+12%) · exec 1.10 s · render 0.08 s · CPU 1.05 s · 120 MB · 2 figures"
+    """
+    parts = [f"{record['wall_time']:.2f} s"]
+    if previous and previous.get('wall_time'):
+        change = (record['wall_time'] - previous['wall_time']) / previous['wall_time'] * 100
+        parts[0] += f" ({change:+.0f}%)"
+
+    stages = record['stages']
+    if 'exec' in stages:
+        parts.append(f"exec {stages['exec']:.2f} s")
+    render = stages.get('display_result', 0.0) + stages.get('display_plots', 0.0)
+    parts.append(f"render {render:.2f} s")
+    if record.get('cpu_time') is not None:
+        parts.append(f"CPU {record['cpu_time']:.2f} s")
+    if record.get('peak_rss'):
+        parts.append(f"{record['peak_rss'] / (1024 * 1024):.0f} MB")
+    if record.get('figure_count'):
+        parts.append(f"{record['figure_count']} figures")
+    return " · ".join(parts)
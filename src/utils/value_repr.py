@@ -0,0 +1,102 @@
+"""Module for size-aware text of values (the last expression of a script, variable previews).
+
+The text is built from a bounded part of a value: numpy arrays are summarized
+by numpy itself (only the edge items are formatted) and shown with their shape,
+dtype and size, containers are truncated by reprlib. Displaying a huge value
+never builds its full repr.
+"""
+import reprlib
+from typing import Optional
+
+import numpy as np
+
+
+# Arrays with more items show only ARRAY_EDGE_ITEMS items at the start and end of each axis
+ARRAY_THRESHOLD = 200
+ARRAY_EDGE_ITEMS = 3
+# Items of containers shown before "..."
+MAX_CONTAINER_ITEMS = 20
+MAX_DICT_ITEMS = 10
+# Length of the whole text
+MAX_REPR_CHARS = 5000
+
+
+def format_size(size: int) -> str:
+    """Human-readable size in bytes."""
+    value = float(size)
+    for unit in ("B", "KB", "MB"):
+        if abs(value) < 1024:
+            return f"{value:.1f} {unit}" if unit != "B" else f"{int(value)} B"
+        value /= 1024
+    return f"{value:.1f} GB"
+
+
+def array_header(array: np.ndarray) -> str:
+    """Short description of an array: type, shape, dtype and size."""
+    return f"{type(array).__name__} shape={array.shape} dtype={array.dtype} nbytes={format_size(array.nbytes)}"
+
+
+class _ValueRepr(reprlib.Repr):
+    """reprlib.Repr with limits for displayed values and summarized numpy arrays."""
+
+    def __init__(self):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxlist = self.maxtuple = self.maxset = self.maxfrozenset = MAX_CONTAINER_ITEMS
+        self.maxdeque = self.maxarray = MAX_CONTAINER_ITEMS
+        self.maxdict = MAX_DICT_ITEMS
+        self.maxstring = 200
+        self.maxlong = 100
+        self.maxother = 200
+
+    def repr_ndarray(self, value: np.ndarray, level: int) -> str:
+        # Arrays inside containers are described, not printed
+        return f"<{array_header(value)}>"
+
+    def repr_int(self, value: int, level: int) -> str:
+        if value.bit_length() > 1000:
+            # Converting huge ints to decimal is slow (and limited since Python 3.11)
+            return f"<int with {value.bit_length()} bits>"
+        return super().repr_int(value, level)
+
+    def repr_instance(self, value, level: int) -> str:
+        try:
+            return super().repr_instance(value, level)
+        except Exception:
+            return f"<{type(value).__name__} object at {id(value):#x}>"
+
+
+_value_repr = _ValueRepr()
+
+
+def value_repr(value, max_chars: int = MAX_REPR_CHARS) -> str:
+    """
+    Get bounded text of a value.
+
+    Args:
+        value: Any value
+        max_chars: Maximal length of the text
+
+    Returns:
+        numpy arrays: header line and summarized items;
+        containers: truncated repr with the number of items if some are hidden;
+        other values: repr truncated to max_chars
+    """
+    if isinstance(value, np.ndarray):
+        body = np.array2string(value, threshold=ARRAY_THRESHOLD, edgeitems=ARRAY_EDGE_ITEMS, max_line_width=100)
+        text = f"{array_header(value)}\n{body}"
+    else:
+        text = _value_repr.repr(value)
+        count = _container_length(value)
+        if count is not None and count > MAX_CONTAINER_ITEMS:
+            text += f"  ({type(value).__name__} of {count} items)"
+    if len(text) > max_chars:
+        text = text[:max_chars] + f"... ({len(text) - max_chars} more characters)"
+    return text
+
+
+def _container_length(value) -> Optional[int]:
+    """Number of items of a built-in container (None for other values)."""
+    if isinstance(value, (list, tuple, dict, set, frozenset)):
+        return len(value)
+    return None
@@ -0,0 +1,180 @@
+"""Module for cheap summaries of namespace variables (variable explorer).
+
+A summary describes a value by its type, shape, dtype, length and memory
+footprint (nbytes for arrays, sys.getsizeof otherwise, i.e. without the objects it
+refers to). It never calls repr() of a value: only scalars and short strings get
+a preview. Containers, arrays and objects with attributes are expanded page by
+page: children() summarizes a slice of their items, resolve() finds a nested
+value by its path from the namespace.
+"""
+import sys
+import types
+from collections import deque
+from itertools import islice
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.value_repr import value_repr
+
+
+# Children of an expanded value sent at once
+VARIABLES_PAGE_SIZE = 100
+# Length of the preview of scalars and strings
+PREVIEW_CHARS = 80
+
+# Values described by their preview
+_SCALAR_TYPES = (type(None), bool, int, float, complex, str, bytes, np.generic)
+# Containers expanded by position
+_SEQUENCE_TYPES = (list, tuple, deque, set, frozenset)
+# Values that are not shown as variables
+_HIDDEN_TYPES = (types.ModuleType,)
+
+
+def _memory_size(value) -> Optional[int]:
+    """Memory of a value: nbytes of arrays, shallow size of other objects (None if unknown)."""
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    try:
+        return sys.getsizeof(value)
+    except Exception:
+        return None
+
+
+def _attributes(value) -> Optional[Dict]:
+    """Instance attributes of an object (None for values without them)."""
+    if isinstance(value, (type, types.FunctionType, types.BuiltinFunctionType, types.MethodType)):
+        return None
+    attributes = getattr(value, '__dict__', None)
+    return attributes if isinstance(attributes, dict) else None
+
+
+def _length(value) -> Optional[int]:
+    """Number of children of an expandable value (None if it isn't expandable)."""
+    if isinstance(value, np.ndarray):
+        return value.shape[0] if value.ndim else None
+    if isinstance(value, (dict,) + _SEQUENCE_TYPES):
+        return len(value)
+    attributes = _attributes(value)
+    return len(attributes) if attributes is not None else None
+
+
+def summarize(value) -> Dict:
+    """
+    Describe a value without converting it to text.
+
+    Args:
+        value: Any value
+
+    Returns:
+        {'type', 'shape', 'dtype', 'length', 'size', 'expandable', 'preview'}:
+        shape/dtype for arrays (and objects exposing them, e.g. pandas), length
+        for containers, size in bytes, preview only for scalars and strings
+    """
+    shape = getattr(value, 'shape', None) if not isinstance(value, _SCALAR_TYPES) else None
+    dtype = getattr(value, 'dtype', None) if shape is not None else None
+    length = _length(value)
+    preview = None
+    if isinstance(value, (str, bytes)):
+        # Slicing doesn't touch the rest of a long string
+        preview = value_repr(value[:PREVIEW_CHARS], max_chars=PREVIEW_CHARS + 3)
+        if len(value) > PREVIEW_CHARS:
+            preview += '…'
+    elif isinstance(value, _SCALAR_TYPES):
+        preview = value_repr(value, max_chars=PREVIEW_CHARS)
+    return {
+        'type': type(value).__name__,
+        'shape': tuple(shape) if isinstance(shape, tuple) else None,
+        'dtype': str(dtype) if dtype is not None else None,
+        'length': length,
+        'size': _memory_size(value),
+        'expandable': bool(length),
+        'preview': preview,
+    }
+
+
+def summarize_namespace(namespace: Dict, preloaded: Optional[Dict] = None) -> List[Dict]:
+    """
+    Describe variables of a namespace.
+
+    Args:
+        namespace: Namespace of executed code
+        preloaded: Names available in every namespace (hidden while they keep their values)
+
+    Returns:
+        Summaries with 'name', sorted by name; private dunder names and modules are skipped
+    """
+    preloaded = preloaded or {}
+    variables = []
+    for name, value in list(namespace.items()):
+        if name.startswith('__') or isinstance(value, _HIDDEN_TYPES):
+            continue
+        if name in preloaded and preloaded[name] is value:
+            continue
+        variables.append(dict(summarize(value), name=name))
+    variables.sort(key=lambda variable: variable['name'].lower())
+    return variables
+
+
+def _child(value, key):
+    """Get a child of a value by its key from children()."""
+    if isinstance(value, (np.ndarray, list, tuple, deque)):
+        return value[key]
+    if isinstance(value, dict):
+        # Dict keys may be any objects: children are addressed by position
+        return next(islice(value.values(), key, None))
+    if isinstance(value, (set, frozenset)):
+        return next(islice(value, key, None))
+    return _attributes(value)[key]
+
+
+def resolve(namespace: Dict, path: List):
+    """
+    Find a nested value.
+
+    Args:
+        namespace: Namespace of executed code
+        path: Variable name followed by child keys from children()
+
+    Returns:
+        The value
+
+    Raises:
+        KeyError, IndexError, StopIteration, TypeError: If the path no longer exists
+    """
+    value = namespace[path[0]]
+    for key in path[1:]:
+        value = _child(value, key)
+    return value
+
+
+def children(value, start: int = 0, count: int = VARIABLES_PAGE_SIZE) -> Dict:
+    """
+    Summarize a page of children of an expandable value.
+
+    Args:
+        value: Array, container or object with attributes
+        start: Index of the first child
+        count: Number of children
+
+    Returns:
+        {'total': int, 'items': [summary with 'name' (label) and 'key' (for resolve)]}
+    """
+    total = _length(value) or 0
+    stop = min(total, start + count)
+    items = []
+    if isinstance(value, np.ndarray):
+        for index in range(start, stop):
+            items.append(dict(summarize(value[index]), name=f"[{index}]", key=index))
+    elif isinstance(value, dict):
+        for index, (key, item) in enumerate(islice(value.items(), start, stop), start=start):
+            label = key if isinstance(key, str) else value_repr(key, max_chars=PREVIEW_CHARS)
+            items.append(dict(summarize(item), name=label, key=index))
+    elif isinstance(value, _SEQUENCE_TYPES):
+        for index, item in enumerate(islice(value, start, stop), start=start):
+            items.append(dict(summarize(item), name=f"[{index}]", key=index))
+    else:
+        attributes = _attributes(value) or {}
+        for name in islice(attributes, start, stop):
+            items.append(dict(summarize(attributes[name]), name=name, key=name))
+    return {'total': total, 'items': items}
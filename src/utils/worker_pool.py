@@ -0,0 +1,101 @@
+"""Module for keeping a pool of pre-started execution kernels.
+
+Starting a kernel means starting Python and importing numpy and matplotlib, which
+takes a noticeable time. The pool starts workers in advance (when the app starts and
+after each recycled worker), so an isolated run gets an already warm process.
+"""
+from typing import List, Optional
+
+from utils.execution_kernel import ExecutionKernel
+
+
+# Default pool settings
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_RUNS = 1
+DEFAULT_MAX_RSS_MB = 2048
+
+
+class WorkerPool:
+    """Pool of warm execution kernels with a recycling policy."""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, max_runs: int = DEFAULT_MAX_RUNS,
+                 max_rss_mb: Optional[int] = DEFAULT_MAX_RSS_MB):
+        """
+        Initialize pool (workers are started by start()).
+
+        Args:
+            size: Number of idle workers kept ready
+            max_runs: Runs after which a worker is replaced (1 - every run gets a fresh process)
+            max_rss_mb: RSS in megabytes above which a worker is replaced (None - no limit)
+        """
+        self.size = max(1, size)
+        self.max_runs = max(1, max_runs)
+        self.max_rss_mb = max_rss_mb
+        self._idle: List[ExecutionKernel] = []
+
+    def start(self) -> None:
+        """Start workers until the pool is full."""
+        self._idle = [kernel for kernel in self._idle if kernel.is_alive()]
+        while len(self._idle) < self.size:
+            kernel = ExecutionKernel()
+            kernel.start()
+            self._idle.append(kernel)
+
+    def acquire(self) -> ExecutionKernel:
+        """
+        Take a worker from the pool, preferring one that finished warm-up.
+
+        If the worker will be recycled after this run, a replacement is started
+        right away, so the next acquire finds a warm worker too.
+
+        Returns:
+            Running execution kernel owned by the caller until release()
+        """
+        self.maintain()
+        ready = [kernel for kernel in self._idle if kernel.ready]
+        kernel = ready[0] if ready else (self._idle[0] if self._idle else None)
+        if kernel is None:
+            kernel = ExecutionKernel()
+            kernel.start()
+        else:
+            self._idle.remove(kernel)
+
+        if kernel.run_count + 1 >= self.max_runs:
+            self.start()
+        return kernel
+
+    def release(self, kernel: ExecutionKernel) -> None:
+        """
+        Return a worker after its run, recycling it according to the pool policy.
+
+        Args:
+            kernel: Kernel previously returned by acquire()
+        """
+        if self._should_recycle(kernel) or len(self._idle) >= self.size:
+            kernel.shutdown(wait=False)
+        else:
+            self._idle.append(kernel)
+        self.start()
+
+    def maintain(self) -> None:
+        """Process 'ready' events of idle workers and replace workers that died."""
+        for kernel in list(self._idle):
+            kernel.poll()
+            if not kernel.is_alive():
+                self._idle.remove(kernel)
+                kernel.shutdown(wait=False)
+        self.start()
+
+    def shutdown(self) -> None:
+        """Stop all idle workers."""
+        for kernel in self._idle:
+            kernel.shutdown()
+        self._idle = []
+
+    def _should_recycle(self, kernel: ExecutionKernel) -> bool:
+        """Check whether a worker has reached the run count or memory limit."""
+        if not kernel.is_alive() or kernel.run_count >= self.max_runs:
+            return True
+        if self.max_rss_mb is not None and kernel.last_rss is not None:
+            return kernel.last_rss > self.max_rss_mb * 1024 * 1024
+        return False